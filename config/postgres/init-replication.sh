@@ -0,0 +1,10 @@
+#!/bin/bash
+# Runs once on the primary's first start: lets the replica stream WAL.
+set -e
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-SQL
+    CREATE ROLE replicator WITH REPLICATION LOGIN PASSWORD '${REPLICATION_PASSWORD:-replicator}';
+    SELECT pg_create_physical_replication_slot('replica');
+SQL
+
+echo "host replication replicator all scram-sha-256" >> "$PGDATA/pg_hba.conf"
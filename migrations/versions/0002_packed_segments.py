@@ -0,0 +1,28 @@
+"""packed segment storage
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable columns without defaults: a metadata-only change, no table rewrite
+    op.add_column('transcriptions', sa.Column('packed_segments', sa.LargeBinary(), nullable=True))
+    op.add_column('diarizations', sa.Column('packed_segments', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    # Packed segments have no row copy; unpack them (save with rows storage) before downgrading
+    op.drop_column('diarizations', 'packed_segments')
+    op.drop_column('transcriptions', 'packed_segments')
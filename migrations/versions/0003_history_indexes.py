@@ -0,0 +1,45 @@
+"""history keyset pagination indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+HISTORY_TABLES = ('transcriptions', 'diarizations', 'exports')
+
+
+def upgrade() -> None:
+    # Keyset cursors compare (created_at, id), so created_at can no longer be NULL
+    for table in HISTORY_TABLES:
+        op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+    # Build without blocking writes on large tables; CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for table in HISTORY_TABLES:
+            op.create_index(
+                f'ix_{table}_user_history',
+                table,
+                ['user_id', 'created_at', 'id'],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in HISTORY_TABLES:
+            op.drop_index(f'ix_{table}_user_history', table_name=table, postgresql_concurrently=True)
+
+    for table in HISTORY_TABLES:
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(), nullable=True)
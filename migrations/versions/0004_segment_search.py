@@ -0,0 +1,65 @@
+"""full-text search over transcription segments
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of models.SEARCH_VECTOR_EXPRESSION at this revision
+SEARCH_VECTOR_EXPRESSION = (
+    "to_tsvector(CASE language WHEN 'ru' THEN 'russian'::regconfig WHEN 'en' THEN 'english'::regconfig "
+    "ELSE 'simple'::regconfig END, text)"
+)
+
+
+def upgrade() -> None:
+    op.add_column('transcription_segments', sa.Column('language', sa.String(length=10), nullable=True))
+    op.execute(
+        "UPDATE transcription_segments AS s SET language = t.language "
+        "FROM transcriptions AS t WHERE t.id = s.transcription_id AND t.language IS NOT NULL"
+    )
+    # Stored generated column: rewrites the table once, then stays in sync with text and language
+    op.add_column(
+        'transcription_segments',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transcription_segments_transcription_start',
+            'transcription_segments',
+            ['transcription_id', 'start_time'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_transcription_segments_search',
+            'transcription_segments',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_transcription_segments_search', table_name='transcription_segments', postgresql_concurrently=True)
+        op.drop_index(
+            'ix_transcription_segments_transcription_start',
+            table_name='transcription_segments',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('transcription_segments', 'search_vector')
+    op.drop_column('transcription_segments', 'language')
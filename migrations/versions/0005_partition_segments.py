@@ -0,0 +1,121 @@
+"""partition segment tables by month
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 12:00:00.000000
+
+Rebuilds transcription_segments and speaker_segments as tables range
+partitioned on created_at, one partition per month plus a default one.
+Existing rows are copied with the created_at of their transcription or
+diarization, which new segment rows inherit too, so run it in a
+maintenance window. Later
+partitions are created by the retention job
+(infrastructure.database.partitions).
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 2
+
+SEGMENT_TABLES = {
+    'transcription_segments': {
+        'parent': ('transcription_id', 'transcriptions'),
+        'columns': 'id, transcription_id, start_time, end_time, text, confidence, language, created_at',
+        'indexes': [
+            "CREATE INDEX ix_transcription_segments_transcription_start "
+            "ON transcription_segments (transcription_id, start_time)",
+            "CREATE INDEX ix_transcription_segments_search ON transcription_segments USING gin (search_vector)",
+        ],
+    },
+    'speaker_segments': {
+        'parent': ('diarization_id', 'diarizations'),
+        'columns': 'id, diarization_id, speaker_id, start_time, end_time, confidence, created_at',
+        'indexes': [
+            "CREATE INDEX ix_speaker_segments_diarization_start ON speaker_segments (diarization_id, start_time)",
+        ],
+    },
+}
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _months(first: datetime, last: datetime):
+    month = datetime(first.year, first.month, 1)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    now = datetime.utcnow()
+
+    for table, spec in SEGMENT_TABLES.items():
+        parent_column, parent_table = spec['parent']
+        op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned")
+        # The partition key has to be part of the primary key
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED, "
+            f"PRIMARY KEY (id, created_at), "
+            f"FOREIGN KEY ({parent_column}) REFERENCES {parent_table} (id) ON DELETE CASCADE) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+
+        # Segments take the created_at of their parent
+        created_at = "coalesce(parent.created_at, segment.created_at)"
+        source = (
+            f"{table}_unpartitioned segment "
+            f"LEFT JOIN {parent_table} parent ON parent.id = segment.{parent_column}"
+        )
+        oldest = connection.execute(sa.text(f"SELECT min({created_at}) FROM {source}")).scalar() or now
+        for month in _months(oldest, _add_months(datetime(now.year, now.month, 1), MONTHS_AHEAD)):
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+            )
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+        values = ", ".join(
+            created_at if column == "created_at" else f"segment.{column}"
+            for column in spec['columns'].split(", ")
+        )
+        op.execute(f"INSERT INTO {table} ({spec['columns']}) SELECT {values} FROM {source}")
+        op.execute(f"DROP TABLE {table}_unpartitioned")
+        # Indexes on the parent cascade to every partition, present and future
+        for statement in spec['indexes']:
+            op.execute(statement)
+
+    op.create_index('ix_audio_files_created_at', 'audio_files', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audio_files_created_at', table_name='audio_files')
+
+    for table, spec in SEGMENT_TABLES.items():
+        parent_column, parent_table = spec['parent']
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_partitioned")
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {table}_partitioned INCLUDING DEFAULTS INCLUDING GENERATED, "
+            f"PRIMARY KEY (id), "
+            f"FOREIGN KEY ({parent_column}) REFERENCES {parent_table} (id) ON DELETE CASCADE)"
+        )
+        op.execute(
+            f"INSERT INTO {table} ({spec['columns']}) SELECT {spec['columns']} FROM {table}_partitioned"
+        )
+        op.execute(f"DROP TABLE {table}_partitioned CASCADE")
+        for statement in spec['indexes']:
+            op.execute(statement)
@@ -1,7 +1,13 @@
+from typing import Optional
+
 from aiogram import Dispatcher
 
+from src.application.services.users import UserUpsertBuffer
 from .logging import LoggingMiddleware
+from .users import UserSyncMiddleware
 
-def register_middlewares(dp: Dispatcher):
-    """Register all dialogs."""
-    dp.update.middleware(LoggingMiddleware())
\ No newline at end of file
+def register_middlewares(dp: Dispatcher, user_buffer: Optional[UserUpsertBuffer] = None):
+    """Register all middlewares."""
+    dp.update.middleware(LoggingMiddleware())
+    if user_buffer is not None:
+        dp.update.middleware(UserSyncMiddleware(user_buffer))
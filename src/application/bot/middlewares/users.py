@@ -0,0 +1,32 @@
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User
+
+from src.application.services.users import UserUpsertBuffer
+from src.domains.user.entities import User as UserEntity
+
+
+class UserSyncMiddleware(BaseMiddleware):
+    """Middleware keeping the users table current without a write per update."""
+
+    def __init__(self, buffer: UserUpsertBuffer):
+        self.buffer = buffer
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any]
+    ) -> Any:
+        user = data.get("event_from_user", None)
+        if user and isinstance(user, User) and not user.is_bot:
+            self.buffer.add(UserEntity(
+                id=user.id,
+                username=user.username,
+                first_name=user.first_name,
+                last_name=user.last_name,
+                language_code=user.language_code,
+                is_premium=bool(user.is_premium),
+            ))
+
+        return await handler(event, data)
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from src.domains.diarization.entities import Diarization
+from src.domains.diarization.repositories import DiarizationRepository
+from src.domains.export.cache import export_cache_key
+from src.domains.export.entities import Export, ExportFormat, ExportStatus
+from src.domains.export.exceptions import ExportFormatGenerationError, ExportTaskCreationError
+from src.domains.export.repositories import ExportRepository
+from src.domains.export.writers import get_writer, label_segments, write_many
+from src.domains.transcription.entities import Transcription
+from src.domains.transcription.repositories import TranscriptionRepository
+from src.infrastructure.storage.object_storage import ObjectStorage
+
+logger = logging.getLogger(__name__)
+
+# Rendered exports stay in memory up to this size and spill to disk beyond it
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class BatchExportService:
+    """Generates several export formats of one transcription in a single pass.
+
+    Completed exports are content-addressed by ``export_cache_key``; formats
+    whose key already has a stored file are returned without re-rendering,
+    and without loading any segments when every format is cached.
+    """
+
+    def __init__(
+        self,
+        transcription_repository: TranscriptionRepository,
+        diarization_repository: DiarizationRepository,
+        export_repository: ExportRepository,
+        storage: ObjectStorage,
+    ):
+        self.transcription_repository = transcription_repository
+        self.diarization_repository = diarization_repository
+        self.export_repository = export_repository
+        self.storage = storage
+
+    async def export_many(
+        self,
+        user_id: int,
+        formats: List[ExportFormat],
+        transcription_id: str,
+        diarization_id: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> List[Export]:
+        """Load and merge the transcription once, then render and upload every format."""
+        formats = list(dict.fromkeys(formats))
+        # Cache keys only need ids and revisions; segments are loaded once a format is missing
+        transcription, diarization = await self._load(user_id, transcription_id, diarization_id, False)
+        cache_keys = {
+            format: export_cache_key(transcription, format, diarization, options)
+            for format in formats
+        }
+        cached = {
+            export.cache_key: export
+            for export in await self.export_repository.get_by_cache_keys(list(cache_keys.values()))
+        }
+        missing = [format for format in formats if cache_keys[format] not in cached]
+        if not missing:
+            return [cached[cache_keys[format]] for format in formats]
+
+        transcription, diarization = await self._load(user_id, transcription_id, diarization_id, True)
+        # The revisions may have moved on since the keys were computed
+        for format in missing:
+            cache_keys[format] = export_cache_key(transcription, format, diarization, options)
+
+        writers = [get_writer(format, options) for format in missing]
+        sinks = [tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) for _ in writers]
+        try:
+            try:
+                # Rendering is CPU-bound; keep it off the event loop
+                await asyncio.to_thread(
+                    write_many,
+                    label_segments(transcription.segments or (), diarization.segments if diarization else None),
+                    list(zip(writers, sinks)),
+                )
+            except Exception as e:
+                raise ExportFormatGenerationError(
+                    f"Failed to render exports: {e}",
+                    transcription_id=transcription_id,
+                    diarization_id=diarization_id,
+                ) from e
+
+            exports = [
+                Export(
+                    id=str(uuid4()),
+                    user_id=user_id,
+                    transcription_id=transcription_id,
+                    diarization_id=diarization_id,
+                    format=writer.format,
+                    status=ExportStatus.COMPLETED,
+                    options=options,
+                    cache_key=cache_keys[writer.format],
+                )
+                for writer in writers
+            ]
+            for export, writer, sink in zip(exports, writers, sinks):
+                export.file_path = f"exports/{export.cache_key}.{writer.extension}"
+                sink.seek(0)
+
+            urls = await asyncio.gather(*(
+                self.storage.upload_fileobj(sink, export.file_path)
+                for export, sink in zip(exports, sinks)
+            ))
+            for export, url in zip(exports, urls):
+                export.file_url = url
+        finally:
+            for sink in sinks:
+                sink.close()
+
+        await self.export_repository.save_many(exports)
+        logger.info(f"Exported transcription {transcription_id} to {', '.join(f.value for f in missing)}")
+        created = {export.format: export for export in exports}
+        return [cached.get(cache_keys[format]) or created[format] for format in formats]
+
+    async def _load(
+        self, user_id: int, transcription_id: str, diarization_id: Optional[str], include_segments: bool
+    ) -> Tuple[Transcription, Optional[Diarization]]:
+        transcription = await self.transcription_repository.get_by_id(transcription_id, include_segments)
+        if transcription is None:
+            raise ExportTaskCreationError(
+                f"Transcription {transcription_id} not found",
+                user_id=user_id,
+                transcription_id=transcription_id,
+                diarization_id=diarization_id,
+            )
+
+        diarization = None
+        if diarization_id:
+            diarization = await self.diarization_repository.get_by_id(diarization_id, include_segments)
+            if diarization is None:
+                raise ExportTaskCreationError(
+                    f"Diarization {diarization_id} not found",
+                    user_id=user_id,
+                    transcription_id=transcription_id,
+                    diarization_id=diarization_id,
+                )
+        return transcription, diarization
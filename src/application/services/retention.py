@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from src.config.settings import config
+from src.domains.audio.entities import AudioFile
+from src.infrastructure.database.partitions import PARTITIONED_TABLES, ensure_partitions
+from src.infrastructure.database.repositories import SQLAlchemyAudioRepository
+from src.infrastructure.database.session import Database
+from src.infrastructure.storage.object_storage import ObjectStorage
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionService:
+    """Deletes expired user audio and everything derived from it.
+
+    Expired audio files are purged in small batches, with a pause in between
+    so replication and autovacuum keep up and no long-held locks pile up.
+    The stored objects of a file are deleted before its rows; a file whose
+    objects could not be deleted stays for the next run. The segment rows of
+    a batch are deleted ``segment_batch_size`` at a time, each chunk in its
+    own short transaction, before the files themselves. Segment partitions
+    are created ahead of time.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        storage: ObjectStorage,
+        batch_size: Optional[int] = None,
+        batch_pause: Optional[float] = None,
+        segment_batch_size: Optional[int] = None,
+    ):
+        self.database = database
+        self.storage = storage
+        self.batch_size = batch_size or config.get("RETENTION_BATCH_SIZE", 100)
+        self.batch_pause = batch_pause if batch_pause is not None else config.get("RETENTION_BATCH_PAUSE", 0.5)
+        self.segment_batch_size = segment_batch_size or config.get("RETENTION_SEGMENT_BATCH_SIZE", 5000)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _delete_objects(self, audio_files: List[AudioFile]) -> List[str]:
+        """Delete stored objects of the files; return ids of files fully cleaned up."""
+        object_names = [
+            [str(path) for path in (audio_file.path, audio_file.processed_path) if path]
+            for audio_file in audio_files
+        ]
+        results = await asyncio.gather(
+            *(self.storage.delete_object(name) for names in object_names for name in names),
+            return_exceptions=True,
+        )
+
+        cleaned, position = [], 0
+        for audio_file, names in zip(audio_files, object_names):
+            errors = [result for result in results[position:position + len(names)] if isinstance(result, Exception)]
+            position += len(names)
+            if errors:
+                logger.error(f"Keeping audio file {audio_file.id}, failed to delete its objects: {errors[0]}")
+            else:
+                cleaned.append(audio_file.id)
+        return cleaned
+
+    async def purge_expired_audio(self, now: Optional[datetime] = None) -> int:
+        """Delete audio files older than the auto-delete timeout, batch by batch."""
+        now = now or datetime.utcnow()
+        created_before = now - timedelta(hours=config.get("AUTO_DELETE_TIMEOUT_HOURS", 24))
+        default_auto_delete = config.get("AUTO_DELETE_FILES", True)
+
+        purged = 0
+        while True:
+            async with self.database.unit_of_work() as session:
+                expired = await SQLAlchemyAudioRepository(session).get_expired(
+                    created_before, self.batch_size, default_auto_delete
+                )
+                cleaned = await self._delete_objects(expired)
+            # The rows are no longer locked from here on; a concurrent purge
+            # picking the same files again only repeats idempotent deletes
+            if cleaned:
+                await self._delete_segments(cleaned)
+                async with self.database.unit_of_work() as session:
+                    await SQLAlchemyAudioRepository(session).delete_many(cleaned)
+            purged += len(cleaned)
+
+            if len(expired) < self.batch_size or not cleaned:
+                break
+            await asyncio.sleep(self.batch_pause)
+
+        if purged:
+            logger.info(f"Purged {purged} expired audio files")
+        return purged
+
+    async def _delete_segments(self, file_ids: List[str]) -> None:
+        while True:
+            async with self.database.unit_of_work() as session:
+                deleted = await SQLAlchemyAudioRepository(session).delete_segments(file_ids, self.segment_batch_size)
+            if deleted < self.segment_batch_size:
+                return
+            await asyncio.sleep(self.batch_pause)
+
+    async def maintain_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """Create upcoming segment partitions; return the names of those created."""
+        now = now or datetime.utcnow()
+        created = []
+        async with self.database.engine.connect() as connection:
+            for table in PARTITIONED_TABLES:
+                created += await ensure_partitions(
+                    connection,
+                    table,
+                    now,
+                    config.get("SEGMENT_PARTITION_MONTHS_AHEAD", 2),
+                    config.get("SEGMENT_PARTITION_LOCK_TIMEOUT_MS", 5000),
+                )
+        return created
+
+    async def run(self, interval: Optional[float] = None) -> None:
+        """Run maintenance forever, every ``interval`` seconds.
+
+        A failing step is logged and does not keep the other one from running.
+        """
+        interval = interval or config.get("RETENTION_INTERVAL_MINUTES", 15) * 60
+        while True:
+            try:
+                await self.maintain_partitions()
+            except Exception as e:
+                logger.error(f"Segment partition maintenance failed: {e}")
+            try:
+                await self.purge_expired_audio()
+            except Exception as e:
+                logger.error(f"Expired audio purge failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the background task; a batch in progress is rolled back and retried next run."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.settings import config
+from src.domains.user.entities import User
+from src.infrastructure.monitoring.metrics import USER_UPSERT_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+UserWriter = Callable[[List[User]], Awaitable[None]]
+
+# Recently written profiles remembered to skip unchanged users
+WRITTEN_CACHE_SIZE = 10_000
+
+
+def _profile(user: User) -> Tuple:
+    return user.username, user.first_name, user.last_name, user.language_code, user.is_premium
+
+
+class UserUpsertBuffer:
+    """Write-behind buffer of Telegram user profiles.
+
+    ``add`` only records the latest profile per user id. A background task
+    writes the pending profiles every ``interval`` seconds, or as soon as
+    ``max_batch`` users are pending, in upserts of at most ``max_batch``
+    users. Profiles identical to the last one written are dropped, so
+    steady chat traffic causes no writes at all. While writes fail, at most
+    ``max_pending`` profiles are kept and the oldest ones are dropped.
+    """
+
+    def __init__(
+        self,
+        writer: UserWriter,
+        interval: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.writer = writer
+        self.interval = interval or config.get("USER_SYNC_FLUSH_INTERVAL", 2.0)
+        self.max_batch = max_batch or config.get("USER_SYNC_MAX_BATCH", 500)
+        self.max_pending = max_pending or 10 * self.max_batch
+        self._pending: Dict[int, User] = {}
+        self._written: "OrderedDict[int, Tuple]" = OrderedDict()
+        self._in_flight: Dict[int, User] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, user: User) -> None:
+        profile = _profile(user)
+        if self._written.get(user.id) == profile and user.id not in self._in_flight:
+            # A change that has not been written yet is undone by this one
+            self._pending.pop(user.id, None)
+            self._written.move_to_end(user.id)
+            return
+        self._pending[user.id] = user
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write all pending users now, ``max_batch`` at a time."""
+        while self._pending:
+            user_ids = list(self._pending)[:self.max_batch]
+            batch = {user_id: self._pending.pop(user_id) for user_id in user_ids}
+            self._in_flight = batch
+            try:
+                await self.writer(list(batch.values()))
+            except asyncio.CancelledError:
+                self._requeue(batch)
+                raise
+            except Exception as e:
+                logger.error(f"Failed to upsert {len(batch)} users: {e}")
+                self._requeue(batch)
+                return
+            finally:
+                self._in_flight = {}
+            self._mark_written(batch)
+
+    def _requeue(self, batch: Dict[int, User]) -> None:
+        # Keep them for the next flush unless a newer profile arrived meanwhile
+        self._pending = {**batch, **self._pending}
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            for user_id in list(self._pending)[:overflow]:
+                del self._pending[user_id]
+            logger.warning(f"Dropped {overflow} pending user profiles, upserts keep failing")
+
+    def _mark_written(self, batch: Dict[int, User]) -> None:
+        USER_UPSERT_BATCH_SIZE.observe(len(batch))
+        for user_id, user in batch.items():
+            self._written[user_id] = _profile(user)
+            self._written.move_to_end(user_id)
+        while len(self._written) > WRITTEN_CACHE_SIZE:
+            self._written.popitem(last=False)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and write whatever is still pending.
+
+        A flush in progress is finished rather than cancelled.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
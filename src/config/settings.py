@@ -20,20 +20,52 @@ settings = Dynaconf(
 class Settings:
     # Database
     DATABASE_URL: str
+    DATABASE_REPLICA_URL: Optional[str] = None  # read replica; reads use the primary when unset
+    DB_READ_YOUR_WRITES_SECONDS: float = 5  # reads stick to the primary this long after a user's write
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "transcription_db"
     POSTGRES_HOST: str = "postgres"
     POSTGRES_PORT: int = 5432
+    SEGMENT_STORAGE: str = "rows"  # rows, packed
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_POOL_PRE_PING: bool = True
+    DB_QUERY_CACHE_SIZE: int = 1200  # compiled SQL statements cached per engine
+    DB_PREPARE_THRESHOLD: Optional[int] = 5  # None disables server-side prepared statements
 
     # Redis
     REDIS_URL: str
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
+    CACHE_TRANSCRIPTION_TTL: int = 600  # seconds
+    CACHE_USER_SETTINGS_TTL: int = 3600  # seconds
 
     # NATS
     NATS_URL: str
+    EVENT_BUS: str = "nats"  # nats, in_process (single node, no broker)
     NATS_JETSTREAM_ENABLED: bool = True
+    NATS_MAX_RECONNECT_ATTEMPTS: int = -1  # -1 retries forever
+    NATS_RECONNECT_TIME_WAIT: float = 2  # seconds between reconnect attempts
+    NATS_CODEC: str = "json"  # json, msgpack; switch only after all consumers can decode it
+    PROGRESS_PUBLISH_INTERVAL: float = 1.0  # seconds between progress events per job
+    PROGRESS_FINISHED_TTL: float = 300  # seconds progress is dropped after a job's terminal event
+    RPC_TIMEOUT: float = 10  # seconds for a call including retries
+    RPC_ATTEMPT_TIMEOUT: float = 3  # seconds before a call is retried on another worker
+    RPC_RETRIES: int = 2
+    RPC_CONCURRENCY: int = 8  # requests served at once per method
+    NATS_EVENTS_STREAM: str = "EVENTS"  # work-queue stream holding all events
+    NATS_EVENTS_MAX_AGE: float = 604800  # seconds an event is kept; older ones are discarded
+    NATS_EVENTS_MAX_BYTES: int = 1073741824  # stream size cap; oldest events are discarded past it
+    NATS_EVENTS_MAX_MSGS: int = 1000000  # stream event count cap
+    NATS_CONSUMER_CONCURRENCY: int = 4  # handlers running at once per event type
+    NATS_CONSUMER_FETCH_BATCH: int = 10  # messages pulled per fetch
+    NATS_CONSUMER_ACK_WAIT: float = 60  # seconds before an unacked event is redelivered
+    NATS_CONSUMER_MAX_DELIVER: int = 5  # delivery attempts before an event is dropped
+    NATS_CONSUMER_BACKOFF_BASE: float = 1.0  # seconds; doubles with every failed attempt
+    NATS_CONSUMER_BACKOFF_MAX: float = 60.0  # seconds
 
     # Telegram
     BOT_TOKEN: str
@@ -66,6 +98,8 @@ class Settings:
     # Limits
     MAX_FILE_SIZE_MB: int = 200
     MAX_CONCURRENT_TASKS: int = 5
+    USER_SYNC_FLUSH_INTERVAL: float = 2.0  # seconds between user profile upserts
+    USER_SYNC_MAX_BATCH: int = 500
 
     # Features
     ENABLE_DIARIZATION: bool = True
@@ -73,6 +107,15 @@ class Settings:
     AUTO_DELETE_FILES: bool = True
     AUTO_DELETE_TIMEOUT_HOURS: int = 24
 
+    # Retention
+    RETENTION_ENABLED: bool = True  # run retention in this bot process; keep it on in one of them
+    RETENTION_INTERVAL_MINUTES: int = 15
+    RETENTION_BATCH_SIZE: int = 100  # audio files deleted per transaction
+    RETENTION_BATCH_PAUSE: float = 0.5  # seconds between batches
+    RETENTION_SEGMENT_BATCH_SIZE: int = 5000  # segment rows deleted per transaction
+    SEGMENT_PARTITION_MONTHS_AHEAD: int = 2
+    SEGMENT_PARTITION_LOCK_TIMEOUT_MS: int = 5000  # give up creating a partition after this
+
 
 # Экспорт настроек
 config = settings
@@ -12,7 +12,7 @@ class AudioFormat(str, Enum):
     WEBM = "webm"
 
 
-@dataclass
+@dataclass(slots=True)
 class AudioFile:
     id: str
     user_id: int
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
 from .entities import AudioFile
 
@@ -19,4 +20,18 @@ class AudioRepository(ABC):
 
     @abstractmethod
     async def delete(self, file_id: str) -> None:
+        pass
+
+    @abstractmethod
+    async def get_expired(
+        self, created_before: datetime, limit: int, default_auto_delete: bool = True
+    ) -> List[AudioFile]:
+        pass
+
+    @abstractmethod
+    async def delete_segments(self, file_ids: List[str], limit: int) -> int:
+        pass
+
+    @abstractmethod
+    async def delete_many(self, file_ids: List[str]) -> None:
         pass
\ No newline at end of file
@@ -1,6 +1,9 @@
+from array import array
 from dataclasses import dataclass
+from hashlib import blake2b
+from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Iterable, Iterator, Optional, Union, overload
 
 
 class DiarizationStatus(str, Enum):
@@ -10,7 +13,7 @@ class DiarizationStatus(str, Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SpeakerSegment:
     speaker_id: int
     start_time: float  # in seconds
@@ -18,12 +21,131 @@ class SpeakerSegment:
     confidence: float
 
 
-@dataclass
+class SpeakerSegments:
+    """Columnar container of speaker segments.
+
+    Stores speaker ids, timings and confidences in parallel arrays and
+    materializes ``SpeakerSegment`` objects only when iterated or indexed.
+    Those are frozen copies; assign a new segment to change one.
+    """
+
+    __slots__ = ("speaker_ids", "start_times", "end_times", "confidences")
+
+    def __init__(self, segments: Iterable[SpeakerSegment] = ()):
+        self.speaker_ids = array("i")
+        self.start_times = array("d")
+        self.end_times = array("d")
+        self.confidences = array("d")
+        self.extend(segments)
+
+    @classmethod
+    def from_columns(
+        cls,
+        speaker_ids: Iterable[int],
+        start_times: Iterable[float],
+        end_times: Iterable[float],
+        confidences: Iterable[float],
+    ) -> "SpeakerSegments":
+        """Build a container directly from column values."""
+        segments = cls()
+        segments.speaker_ids.extend(speaker_ids)
+        segments.start_times.extend(start_times)
+        segments.end_times.extend(end_times)
+        segments.confidences.extend(confidences)
+        if not (
+            len(segments.speaker_ids) == len(segments.start_times)
+            == len(segments.end_times) == len(segments.confidences)
+        ):
+            raise ValueError("Segment columns must have equal length")
+        return segments
+
+    def append(self, segment: SpeakerSegment) -> None:
+        self.speaker_ids.append(segment.speaker_id)
+        self.start_times.append(segment.start_time)
+        self.end_times.append(segment.end_time)
+        self.confidences.append(segment.confidence)
+
+    def extend(self, segments: Iterable[SpeakerSegment]) -> None:
+        for segment in segments:
+            self.append(segment)
+
+    @overload
+    def __getitem__(self, index: int) -> SpeakerSegment: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "SpeakerSegments": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SpeakerSegment, "SpeakerSegments"]:
+        if isinstance(index, slice):
+            return SpeakerSegments.from_columns(
+                self.speaker_ids[index],
+                self.start_times[index],
+                self.end_times[index],
+                self.confidences[index],
+            )
+        return SpeakerSegment(
+            speaker_id=self.speaker_ids[index],
+            start_time=self.start_times[index],
+            end_time=self.end_times[index],
+            confidence=self.confidences[index],
+        )
+
+    def __setitem__(self, index: int, segment: SpeakerSegment) -> None:
+        """Replace one segment in place."""
+        self.speaker_ids[index] = segment.speaker_id
+        self.start_times[index] = segment.start_time
+        self.end_times[index] = segment.end_time
+        self.confidences[index] = segment.confidence
+
+    def __len__(self) -> int:
+        return len(self.speaker_ids)
+
+    def __iter__(self) -> Iterator[SpeakerSegment]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SpeakerSegments):
+            return (
+                self.speaker_ids == other.speaker_ids
+                and self.start_times == other.start_times
+                and self.end_times == other.end_times
+                and self.confidences == other.confidences
+            )
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SpeakerSegments(<{len(self)} segments>)"
+
+    def fingerprint(self) -> bytes:
+        """Digest of the content, for cheap change detection."""
+        digest = blake2b(len(self).to_bytes(8, "little"), digest_size=16)
+        for column in (self.speaker_ids, self.start_times, self.end_times, self.confidences):
+            digest.update(column.tobytes())
+        return digest.digest()
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the column buffers."""
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.speaker_ids, self.start_times, self.end_times, self.confidences)
+        )
+
+
+@dataclass(slots=True)
 class Diarization:
     id: str
     audio_file_id: str
     user_id: int
     status: DiarizationStatus
     num_speakers: Optional[int] = None
-    segments: List[SpeakerSegment] = None
-    error_message: Optional[str] = None
\ No newline at end of file
+    segments: Optional[SpeakerSegments] = None
+    error_message: Optional[str] = None
+    revision: int = 0  # bumped whenever segments change
+    created_at: Optional[datetime] = None
+
+    def __post_init__(self):
+        if self.segments is not None and not isinstance(self.segments, SpeakerSegments):
+            self.segments = SpeakerSegments(self.segments)
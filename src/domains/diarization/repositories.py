@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Optional, List
 
-from .entities import Diarization
+from ..pagination import DEFAULT_PAGE_SIZE, Page
+from .entities import Diarization, DiarizationStatus
 
 
 class DiarizationRepository(ABC):
@@ -10,21 +11,37 @@ class DiarizationRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_by_id(self, diarization_id: str) -> Optional[Diarization]:
+    async def get_by_id(self, diarization_id: str, include_segments: bool = True) -> Optional[Diarization]:
         pass
 
     @abstractmethod
-    async def get_by_audio_file_id(self, audio_file_id: str) -> List[Diarization]:
+    async def get_by_audio_file_id(self, audio_file_id: str, include_segments: bool = True) -> List[Diarization]:
         pass
 
     @abstractmethod
-    async def get_by_user_id(self, user_id: int) -> List[Diarization]:
+    async def get_by_user_id(self, user_id: int, include_segments: bool = True) -> List[Diarization]:
+        pass
+
+    @abstractmethod
+    async def get_page_by_user_id(
+        self,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        include_segments: bool = False
+    ) -> Page[Diarization]:
         pass
 
     @abstractmethod
     async def update(self, diarization: Diarization) -> Diarization:
         pass
 
+    @abstractmethod
+    async def update_status(
+        self, diarization_id: str, status: DiarizationStatus, error_message: Optional[str] = None
+    ) -> None:
+        pass
+
     @abstractmethod
     async def delete(self, diarization_id: str) -> None:
         pass
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""Compact columnar binary encoding of transcript segments.
+
+Layout (all integers little-endian)::
+
+    magic  b"STSG"
+    u8     format version
+    u8     flags (bit 0: body is zlib-compressed)
+    u16    reserved
+    body   sequence of sections: 4-byte tag, u32 payload length, payload
+
+Sections:
+
+* ``SEGS`` - u32 count ``n``, then f64 start times[n], f64 end times[n],
+  f64 confidences[n], u64 text offsets[n + 1] and the UTF-8 text buffer.
+* ``SPKS`` - i32 speaker id per segment, ``-1`` when unattributed.
+* ``NAME`` - JSON object mapping speaker id to display name.
+* ``META`` - JSON object with free-form metadata.
+* ``SPSG`` - diarization payloads only: u32 count ``n``, then i32 speaker
+  ids[n], f64 start times[n], f64 end times[n], f64 confidences[n].
+
+Decoders skip unknown sections, so new ones (e.g. word timings) can be
+added without bumping the format version.
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..diarization.entities import SpeakerSegments
+from ..transcription.entities import TranscriptionSegments
+
+MAGIC = b"STSG"
+VERSION = 1
+FLAG_COMPRESSED = 0x01
+NO_SPEAKER = -1
+
+_HEADER = struct.Struct("<4sBBH")
+_SECTION = struct.Struct("<4sI")
+_COUNT = struct.Struct("<I")
+
+
+@dataclass(slots=True)
+class SegmentPayload:
+    """Decoded content of a binary segment payload."""
+    segments: TranscriptionSegments
+    speaker_ids: Optional[array] = None  # per segment, NO_SPEAKER when unknown
+    speaker_names: Dict[int, str] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def speaker_at(self, index: int) -> Optional[int]:
+        if self.speaker_ids is None:
+            return None
+        speaker_id = self.speaker_ids[index]
+        return None if speaker_id == NO_SPEAKER else speaker_id
+
+
+def _le_bytes(column: array) -> bytes:
+    if sys.byteorder == "little":
+        return column.tobytes()
+    swapped = array(column.typecode, column)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def _le_array(typecode: str, data: bytes) -> array:
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column
+
+
+def _section(tag: bytes, payload: bytes) -> bytes:
+    return _SECTION.pack(tag, len(payload)) + payload
+
+
+def encode_segments(
+    segments: TranscriptionSegments,
+    speaker_ids: Optional[array] = None,
+    speaker_names: Optional[Dict[int, str]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    compress: bool = True,
+) -> bytes:
+    """Encode segments (and optional per-segment speakers) into a binary payload."""
+    if speaker_ids is not None and len(speaker_ids) != len(segments):
+        raise ValueError("speaker_ids must have one entry per segment")
+
+    text = segments.text_buffer()
+    sections: List[bytes] = [
+        _section(
+            b"SEGS",
+            b"".join((
+                _COUNT.pack(len(segments)),
+                _le_bytes(segments.start_times),
+                _le_bytes(segments.end_times),
+                _le_bytes(segments.confidences),
+                _le_bytes(segments.text_offsets()),
+                text,
+            )),
+        )
+    ]
+    if speaker_ids is not None:
+        sections.append(_section(b"SPKS", _le_bytes(array("i", speaker_ids))))
+    if speaker_names:
+        names = {str(k): v for k, v in speaker_names.items()}
+        sections.append(_section(b"NAME", json.dumps(names, ensure_ascii=False).encode("utf-8")))
+    if metadata:
+        sections.append(_section(b"META", json.dumps(metadata, ensure_ascii=False, default=str).encode("utf-8")))
+
+    return _pack(sections, compress)
+
+
+def _pack(sections: List[bytes], compress: bool) -> bytes:
+    body = b"".join(sections)
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 6)
+        flags |= FLAG_COMPRESSED
+    return _HEADER.pack(MAGIC, VERSION, flags, 0) + body
+
+
+def _unpack(data: bytes) -> memoryview:
+    if len(data) < _HEADER.size:
+        raise ValueError("Payload is too short")
+    magic, version, flags, _ = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a binary segment payload")
+    if version > VERSION:
+        raise ValueError(f"Unsupported payload version {version}")
+
+    body = memoryview(data)[_HEADER.size:]
+    if flags & FLAG_COMPRESSED:
+        body = memoryview(zlib.decompress(body))
+    return body
+
+
+def _iter_sections(body: memoryview) -> Iterator[Tuple[bytes, memoryview]]:
+    position = 0
+    while position < len(body):
+        if position + _SECTION.size > len(body):
+            raise ValueError("Truncated section header")
+        tag, length = _SECTION.unpack_from(body, position)
+        position += _SECTION.size
+        if position + length > len(body):
+            raise ValueError(f"Truncated section {tag!r}")
+        yield tag, body[position:position + length]
+        position += length
+
+
+def _decode_segments_section(payload: memoryview) -> TranscriptionSegments:
+    (count,) = _COUNT.unpack_from(payload, 0)
+    position = _COUNT.size
+    columns = []
+    for typecode, size in (("d", count), ("d", count), ("d", count), ("Q", count + 1)):
+        nbytes = array(typecode).itemsize * size
+        columns.append(_le_array(typecode, payload[position:position + nbytes].tobytes()))
+        position += nbytes
+    start_times, end_times, confidences, offsets = columns
+    return TranscriptionSegments.from_buffers(
+        start_times, end_times, confidences, payload[position:].tobytes(), offsets
+    )
+
+
+def decode_segments(data: bytes) -> SegmentPayload:
+    """Decode a payload produced by ``encode_segments``."""
+    body = _unpack(data)
+
+    payload: Optional[SegmentPayload] = None
+    speaker_ids = None
+    speaker_names: Dict[int, str] = {}
+    metadata: Dict[str, Any] = {}
+    for tag, section in _iter_sections(body):
+        if tag == b"SEGS":
+            payload = SegmentPayload(segments=_decode_segments_section(section))
+        elif tag == b"SPKS":
+            speaker_ids = _le_array("i", section.tobytes())
+        elif tag == b"NAME":
+            speaker_names = {int(k): v for k, v in json.loads(bytes(section)).items()}
+        elif tag == b"META":
+            metadata = json.loads(bytes(section))
+
+    if payload is None:
+        raise ValueError("Payload has no segments section")
+    if speaker_ids is not None and len(speaker_ids) != len(payload.segments):
+        raise ValueError("Speaker section does not match segment count")
+    payload.speaker_ids = speaker_ids
+    payload.speaker_names = speaker_names
+    payload.metadata = metadata
+    return payload
+
+
+def encode_speaker_segments(segments: SpeakerSegments, compress: bool = True) -> bytes:
+    """Encode diarization segments into a binary payload."""
+    return _pack(
+        [
+            _section(
+                b"SPSG",
+                b"".join((
+                    _COUNT.pack(len(segments)),
+                    _le_bytes(segments.speaker_ids),
+                    _le_bytes(segments.start_times),
+                    _le_bytes(segments.end_times),
+                    _le_bytes(segments.confidences),
+                )),
+            )
+        ],
+        compress,
+    )
+
+
+def decode_speaker_segments(data: bytes) -> SpeakerSegments:
+    """Decode a payload produced by ``encode_speaker_segments``."""
+    for tag, section in _iter_sections(_unpack(data)):
+        if tag != b"SPSG":
+            continue
+        (count,) = _COUNT.unpack_from(section, 0)
+        position = _COUNT.size
+        columns = []
+        for typecode in ("i", "d", "d", "d"):
+            nbytes = array(typecode).itemsize * count
+            columns.append(_le_array(typecode, section[position:position + nbytes].tobytes()))
+            position += nbytes
+        return SpeakerSegments.from_columns(*columns)
+    raise ValueError("Payload has no speaker segments section")
@@ -0,0 +1,39 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from src.domains.diarization.entities import Diarization
+from src.domains.transcription.entities import Transcription
+
+from .entities import ExportFormat
+
+# Bump when writer output changes so previously cached files are not reused
+EXPORT_CACHE_VERSION = 1
+
+
+def canonicalize_options(options: Optional[Dict[str, Any]]) -> str:
+    """Serialize options so that equal option sets produce identical strings."""
+    return json.dumps(options or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def export_cache_key(
+    transcription: Transcription,
+    format: ExportFormat,
+    diarization: Optional[Diarization] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Content address of an export.
+
+    Covers the revisions of the source transcription and diarization, so
+    any segment edit yields a new key and stale files are never reused.
+    """
+    parts = [
+        str(EXPORT_CACHE_VERSION),
+        transcription.id,
+        str(transcription.revision),
+        diarization.id if diarization else "",
+        str(diarization.revision) if diarization else "",
+        format.value,
+        canonicalize_options(options),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
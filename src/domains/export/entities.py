@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from datetime import datetime
 from enum import Enum
 from typing import Optional, Dict, Any
 
@@ -9,6 +10,7 @@ class ExportFormat(str, Enum):
     SRT = "srt"
     VTT = "vtt"
     JSON = "json"
+    BINARY = "bin"  # compact columnar segments, see export.binary
 
 
 class ExportStatus(str, Enum):
@@ -18,7 +20,7 @@ class ExportStatus(str, Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class Export:
     id: str
     user_id: int
@@ -29,4 +31,6 @@ class Export:
     file_path: Optional[str] = None
     file_url: Optional[str] = None
     options: Optional[Dict[str, Any]] = None
-    error_message: Optional[str] = None
\ No newline at end of file
+    error_message: Optional[str] = None
+    cache_key: Optional[str] = None
+    created_at: Optional[datetime] = None
\ No newline at end of file
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Optional, List
 
+from ..pagination import DEFAULT_PAGE_SIZE, Page
 from .entities import Export, ExportFormat
 
 
@@ -9,14 +10,28 @@ class ExportRepository(ABC):
     async def save(self, export: Export) -> Export:
         pass
 
+    @abstractmethod
+    async def save_many(self, exports: List[Export]) -> List[Export]:
+        pass
+
     @abstractmethod
     async def get_by_id(self, export_id: str) -> Optional[Export]:
         pass
 
+    @abstractmethod
+    async def get_by_cache_keys(self, cache_keys: List[str]) -> List[Export]:
+        pass
+
     @abstractmethod
     async def get_by_user_id(self, user_id: int) -> List[Export]:
         pass
 
+    @abstractmethod
+    async def get_page_by_user_id(
+        self, user_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ) -> Page[Export]:
+        pass
+
     @abstractmethod
     async def get_by_transcription_id(self, transcription_id: str) -> List[Export]:
         pass
@@ -0,0 +1,480 @@
+import json
+import re
+import zipfile
+from abc import ABC, abstractmethod
+from array import array
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+from xml.sax.saxutils import escape
+
+from src.domains.diarization.entities import SpeakerSegment
+from src.domains.transcription.entities import TranscriptionSegment, TranscriptionSegments
+
+from .binary import NO_SPEAKER, SegmentPayload, encode_segments
+from .entities import ExportFormat
+from .exceptions import ExportFormatGenerationError
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(slots=True)
+class ExportSegment:
+    """Transcription segment with the speaker attributed to it, if any."""
+    start_time: float
+    end_time: float
+    text: str
+    confidence: float
+    speaker_id: Optional[int] = None
+
+
+def label_segments(
+    segments: Iterable[TranscriptionSegment],
+    speaker_segments: Optional[Iterable[SpeakerSegment]] = None,
+) -> Iterator[ExportSegment]:
+    """Attribute each transcription segment to the speaker with the largest overlap.
+
+    Both inputs must be ordered by start time; they are walked in a single
+    pass, so memory use does not depend on the number of segments.
+    """
+    speakers = iter(speaker_segments or ())
+    window: List[SpeakerSegment] = []
+    pending = next(speakers, None)
+
+    for segment in segments:
+        while pending is not None and pending.start_time < segment.end_time:
+            window.append(pending)
+            pending = next(speakers, None)
+        window = [speaker for speaker in window if speaker.end_time > segment.start_time]
+
+        speaker_id = None
+        best_overlap = 0.0
+        for speaker in window:
+            overlap = min(speaker.end_time, segment.end_time) - max(speaker.start_time, segment.start_time)
+            if overlap > best_overlap:
+                best_overlap = overlap
+                speaker_id = speaker.speaker_id
+
+        yield ExportSegment(
+            start_time=segment.start_time,
+            end_time=segment.end_time,
+            text=segment.text,
+            confidence=segment.confidence,
+            speaker_id=speaker_id,
+        )
+
+
+def format_clock(seconds: float, separator: str = ",") -> str:
+    """Format seconds as HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (VTT)."""
+    total_ms = int(round(seconds * 1000))
+    hours, rest = divmod(total_ms, 3_600_000)
+    minutes, rest = divmod(rest, 60_000)
+    secs, ms = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{ms:03d}"
+
+
+def format_short_clock(seconds: float) -> str:
+    """Format seconds as MM:SS."""
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+class _ChunkBuffer:
+    """Write-only sink that collects bytes until they are drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+class SegmentWriter(ABC):
+    """Incremental exporter writing one segment at a time into a binary sink.
+
+    Subclasses render the header, each segment and the footer; the base
+    class takes care of encoding and of the push (``open``/``write``/
+    ``close``) and pull (``iter_chunks``) interfaces.
+
+    Supported options: ``include_timestamps`` (default ``True``),
+    ``include_speakers`` (default ``True``) and ``speaker_names``, a mapping
+    of speaker id to display name.
+    """
+
+    format: ExportFormat
+    extension: str
+    content_type: str
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.options = options or {}
+        self.include_timestamps = self.options.get("include_timestamps", True)
+        self.include_speakers = self.options.get("include_speakers", True)
+        self.speaker_names = {int(k): v for k, v in (self.options.get("speaker_names") or {}).items()}
+        self._sink: Optional[BinaryIO] = None
+        self._count = 0
+
+    def speaker_label(self, speaker_id: int) -> str:
+        return self.speaker_names.get(speaker_id, f"Спикер {speaker_id + 1}")
+
+    def header(self) -> str:
+        return ""
+
+    @abstractmethod
+    def render(self, index: int, segment: ExportSegment) -> str:
+        """Render a single segment; ``index`` starts at 1"""
+        pass
+
+    def footer(self) -> str:
+        return ""
+
+    def _emit(self, text: str) -> None:
+        if text:
+            self._sink.write(text.encode("utf-8"))
+
+    def open(self, sink: BinaryIO) -> None:
+        self._sink = sink
+        self._count = 0
+        self._emit(self.header())
+
+    def write(self, segment: ExportSegment) -> None:
+        self._count += 1
+        self._emit(self.render(self._count, segment))
+
+    def close(self) -> None:
+        self._emit(self.footer())
+        self._sink.flush()
+        self._sink = None
+
+    def write_all(self, segments: Iterable[ExportSegment], sink: BinaryIO) -> None:
+        self.open(sink)
+        for segment in segments:
+            self.write(segment)
+        self.close()
+
+    def iter_chunks(self, segments: Iterable[ExportSegment], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield the encoded document in chunks of roughly ``chunk_size`` bytes.
+
+        Suitable for ``ObjectStorage.upload_stream`` or an HTTP streaming
+        response; only one chunk is held in memory at a time.
+        """
+        buffer = _ChunkBuffer()
+        self.open(buffer)
+        for segment in segments:
+            self.write(segment)
+            if buffer.size >= chunk_size:
+                yield buffer.drain()
+        self.close()
+        tail = buffer.drain()
+        if tail:
+            yield tail
+
+
+class TxtWriter(SegmentWriter):
+    format = ExportFormat.TXT
+    extension = "txt"
+    content_type = "text/plain; charset=utf-8"
+
+    def render(self, index: int, segment: ExportSegment) -> str:
+        line = segment.text
+        if self.include_speakers and segment.speaker_id is not None:
+            line = f"{self.speaker_label(segment.speaker_id)}: {line}"
+        if self.include_timestamps:
+            line = f"[{format_short_clock(segment.start_time)} - {format_short_clock(segment.end_time)}] {line}"
+        return f"{line}\n"
+
+
+class SrtWriter(SegmentWriter):
+    format = ExportFormat.SRT
+    extension = "srt"
+    content_type = "application/x-subrip; charset=utf-8"
+
+    def render(self, index: int, segment: ExportSegment) -> str:
+        text = segment.text
+        if self.include_speakers and segment.speaker_id is not None:
+            text = f"{self.speaker_label(segment.speaker_id)}: {text}"
+        return (
+            f"{index}\n"
+            f"{format_clock(segment.start_time)} --> {format_clock(segment.end_time)}\n"
+            f"{text}\n\n"
+        )
+
+
+class VttWriter(SegmentWriter):
+    format = ExportFormat.VTT
+    extension = "vtt"
+    content_type = "text/vtt; charset=utf-8"
+
+    def header(self) -> str:
+        return "WEBVTT\n\n"
+
+    def render(self, index: int, segment: ExportSegment) -> str:
+        text = segment.text
+        if self.include_speakers and segment.speaker_id is not None:
+            text = f"<v {self.speaker_label(segment.speaker_id)}>{text}"
+        return (
+            f"{format_clock(segment.start_time, '.')} --> {format_clock(segment.end_time, '.')}\n"
+            f"{text}\n\n"
+        )
+
+
+class JsonWriter(SegmentWriter):
+    """Writes ``{"metadata": {...}, "segments": [...]}``; extra option: ``metadata``."""
+
+    format = ExportFormat.JSON
+    extension = "json"
+    content_type = "application/json"
+
+    def header(self) -> str:
+        metadata = json.dumps(self.options.get("metadata") or {}, ensure_ascii=False, default=str)
+        return f'{{"metadata": {metadata}, "segments": ['
+
+    def render(self, index: int, segment: ExportSegment) -> str:
+        item = {
+            "start": segment.start_time,
+            "end": segment.end_time,
+            "text": segment.text,
+            "confidence": segment.confidence,
+        }
+        if self.include_speakers:
+            item["speaker"] = segment.speaker_id
+        prefix = "\n" if index == 1 else ",\n"
+        return prefix + json.dumps(item, ensure_ascii=False)
+
+    def footer(self) -> str:
+        return "\n]}\n"
+
+
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>'
+)
+
+_DOCX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+_DOCX_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+_W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+# Speaker colours, cycled when there are more speakers than colours
+SPEAKER_COLORS = (
+    "0070C0", "FF0000", "00B050", "7030A0", "FFC000",
+    "5B9BD5", "FF8000", "92D050", "C00000", "002060",
+)
+
+
+def _xml_text(text: str) -> str:
+    return escape(_INVALID_XML_CHARS.sub("", text))
+
+
+class DocxWriter(SegmentWriter):
+    """Writes WordprocessingML parts straight into a zip stream.
+
+    Paragraphs are rendered from string templates instead of a document
+    object model, so memory stays bounded by the zip compressor buffers.
+    Extra option: ``title`` (defaults to "Транскрипция").
+    """
+
+    format = ExportFormat.DOCX
+    extension = "docx"
+    content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        super().__init__(options)
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._outer: Optional[BinaryIO] = None
+
+    def _styles(self) -> str:
+        speaker_styles = "".join(
+            f'<w:style w:type="character" w:customStyle="1" w:styleId="Speaker{index}">'
+            f'<w:name w:val="Speaker {index}"/><w:rPr><w:b/><w:color w:val="{color}"/></w:rPr></w:style>'
+            for index, color in enumerate(SPEAKER_COLORS)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<w:styles {_W_NS}>'
+            '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/>'
+            '<w:rPr><w:sz w:val="22"/></w:rPr></w:style>'
+            '<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/>'
+            '<w:pPr><w:jc w:val="center"/></w:pPr><w:rPr><w:b/><w:sz w:val="32"/></w:rPr></w:style>'
+            '<w:style w:type="character" w:customStyle="1" w:styleId="Timestamp"><w:name w:val="Timestamp"/>'
+            '<w:rPr><w:color w:val="808080"/><w:sz w:val="16"/></w:rPr></w:style>'
+            f'{speaker_styles}'
+            '</w:styles>'
+        )
+
+    def header(self) -> str:
+        title = _xml_text(str(self.options.get("title", "Транскрипция")))
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<w:document {_W_NS}><w:body>'
+            f'<w:p><w:pPr><w:pStyle w:val="Title"/></w:pPr><w:r><w:t xml:space="preserve">{title}</w:t></w:r></w:p>'
+        )
+
+    def render(self, index: int, segment: ExportSegment) -> str:
+        runs = []
+        if self.include_timestamps:
+            runs.append(
+                '<w:r><w:rPr><w:rStyle w:val="Timestamp"/></w:rPr><w:t xml:space="preserve">'
+                f'[{format_short_clock(segment.start_time)} - {format_short_clock(segment.end_time)}] </w:t></w:r>'
+            )
+        if self.include_speakers and segment.speaker_id is not None:
+            style = f"Speaker{segment.speaker_id % len(SPEAKER_COLORS)}"
+            runs.append(
+                f'<w:r><w:rPr><w:rStyle w:val="{style}"/></w:rPr><w:t xml:space="preserve">'
+                f'{_xml_text(self.speaker_label(segment.speaker_id))}: </w:t></w:r>'
+            )
+        runs.append(f'<w:r><w:t xml:space="preserve">{_xml_text(segment.text)}</w:t></w:r>')
+        return f'<w:p>{"".join(runs)}</w:p>'
+
+    def footer(self) -> str:
+        return (
+            '<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+            '<w:pgMar w:top="1134" w:right="850" w:bottom="1134" w:left="1701" '
+            'w:header="708" w:footer="708" w:gutter="0"/></w:sectPr>'
+            '</w:body></w:document>'
+        )
+
+    def open(self, sink: BinaryIO) -> None:
+        self._outer = sink
+        self._zip = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+        self._zip.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _DOCX_ROOT_RELS)
+        self._zip.writestr("word/_rels/document.xml.rels", _DOCX_DOCUMENT_RELS)
+        self._zip.writestr("word/styles.xml", self._styles())
+        super().open(self._zip.open("word/document.xml", "w"))
+
+    def close(self) -> None:
+        self._emit(self.footer())
+        self._sink.close()
+        self._sink = None
+        self._zip.close()
+        self._zip = None
+        self._outer.flush()
+        self._outer = None
+
+
+class BinaryWriter(SegmentWriter):
+    """Collects segments into columns and writes them with ``encode_segments``.
+
+    The columnar layout needs every segment before it can be written, so
+    memory grows with the transcript, but only by the compact column size.
+    Extra options: ``metadata`` and ``compress`` (default ``True``).
+    """
+
+    format = ExportFormat.BINARY
+    extension = "bin"
+    content_type = "application/octet-stream"
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        super().__init__(options)
+        self._segments = TranscriptionSegments()
+        self._speaker_ids = array("i")
+        self._has_speakers = False
+
+    def render(self, index: int, segment: ExportSegment) -> str:
+        return ""
+
+    def open(self, sink: BinaryIO) -> None:
+        self._sink = sink
+        self._segments = TranscriptionSegments()
+        self._speaker_ids = array("i")
+        self._has_speakers = False
+
+    def write(self, segment: ExportSegment) -> None:
+        self._segments.append(
+            TranscriptionSegment(segment.start_time, segment.end_time, segment.text, segment.confidence)
+        )
+        if self.include_speakers and segment.speaker_id is not None:
+            self._has_speakers = True
+            self._speaker_ids.append(segment.speaker_id)
+        else:
+            self._speaker_ids.append(NO_SPEAKER)
+
+    def close(self) -> None:
+        self._sink.write(encode_segments(
+            self._segments,
+            speaker_ids=self._speaker_ids if self._has_speakers else None,
+            speaker_names=self.speaker_names,
+            metadata=self.options.get("metadata"),
+            compress=self.options.get("compress", True),
+        ))
+        self._sink.flush()
+        self._sink = None
+        self._segments = TranscriptionSegments()
+        self._speaker_ids = array("i")
+
+
+def payload_segments(payload: SegmentPayload) -> Iterator[ExportSegment]:
+    """Iterate a decoded binary payload as export segments."""
+    segments = payload.segments
+    for index in range(len(segments)):
+        yield ExportSegment(
+            start_time=segments.start_times[index],
+            end_time=segments.end_times[index],
+            text=segments.text_at(index),
+            confidence=segments.confidences[index],
+            speaker_id=payload.speaker_at(index),
+        )
+
+
+WRITERS: Dict[ExportFormat, Type[SegmentWriter]] = {
+    ExportFormat.DOCX: DocxWriter,
+    ExportFormat.BINARY: BinaryWriter,
+    ExportFormat.TXT: TxtWriter,
+    ExportFormat.SRT: SrtWriter,
+    ExportFormat.VTT: VttWriter,
+    ExportFormat.JSON: JsonWriter,
+}
+
+
+def write_many(segments: Iterable[ExportSegment], targets: Sequence[Tuple[SegmentWriter, BinaryIO]]) -> None:
+    """Render several formats in a single pass over the segments."""
+    for writer, sink in targets:
+        writer.open(sink)
+    for segment in segments:
+        for writer, _ in targets:
+            writer.write(segment)
+    for writer, _ in targets:
+        writer.close()
+
+
+def get_writer(format: ExportFormat, options: Optional[Dict[str, Any]] = None) -> SegmentWriter:
+    """Create the streaming writer for an export format."""
+    writer_cls = WRITERS.get(format)
+    if writer_cls is None:
+        raise ExportFormatGenerationError(f"No streaming writer for format {format}", format=format)
+    return writer_cls(options)
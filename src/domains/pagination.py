@@ -0,0 +1,44 @@
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+@dataclass(frozen=True, slots=True)
+class Cursor:
+    """Position after the last item of a history page, newest first.
+
+    Pages are ordered by ``(created_at, id)`` descending, so the next page
+    starts strictly below this pair. Clients get it as an opaque token.
+    """
+    created_at: datetime
+    id: str
+
+    def encode(self) -> str:
+        raw = f"{self.created_at.isoformat()}|{self.id}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+            created_at, id = raw.split("|", 1)
+            return cls(created_at=datetime.fromisoformat(created_at), id=id)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f"Invalid page cursor: {token!r}") from e
+
+
+@dataclass(slots=True)
+class Page(Generic[T]):
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None  # None on the last page
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
@@ -1,6 +1,9 @@
+from array import array
 from dataclasses import dataclass
+from hashlib import blake2b
+from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Iterable, Iterator, Optional, Union, overload
 
 
 class TranscriptionModel(str, Enum):
@@ -15,7 +18,7 @@ class TranscriptionStatus(str, Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TranscriptionSegment:
     start_time: float  # in seconds
     end_time: float  # in seconds
@@ -23,7 +26,199 @@ class TranscriptionSegment:
     confidence: float
 
 
-@dataclass
+class TranscriptionSegments:
+    """Columnar container of transcription segments.
+
+    Timings and confidences live in parallel ``array('d')`` columns and all
+    texts share one UTF-8 buffer addressed by offsets, so a long transcript
+    costs a few machine words per segment instead of one object per segment.
+    Iteration and indexing materialize ``TranscriptionSegment`` objects on
+    demand; they are frozen copies, so edit a segment by assigning a new
+    one, e.g. ``segments[i] = replace(segments[i], text=...)``.
+    """
+
+    __slots__ = ("start_times", "end_times", "confidences", "_text", "_offsets")
+
+    def __init__(self, segments: Iterable[TranscriptionSegment] = ()):
+        self.start_times = array("d")
+        self.end_times = array("d")
+        self.confidences = array("d")
+        self._text = bytearray()
+        self._offsets = array("Q", [0])
+        self.extend(segments)
+
+    @classmethod
+    def from_columns(
+        cls,
+        start_times: Iterable[float],
+        end_times: Iterable[float],
+        confidences: Iterable[float],
+        texts: Iterable[str],
+    ) -> "TranscriptionSegments":
+        """Build a container directly from column values."""
+        segments = cls()
+        segments.start_times.extend(start_times)
+        segments.end_times.extend(end_times)
+        segments.confidences.extend(confidences)
+        for text in texts:
+            segments._append_text(text)
+        if not (
+            len(segments.start_times) == len(segments.end_times)
+            == len(segments.confidences) == len(segments._offsets) - 1
+        ):
+            raise ValueError("Segment columns must have equal length")
+        return segments
+
+    @classmethod
+    def from_buffers(
+        cls,
+        start_times: array,
+        end_times: array,
+        confidences: array,
+        text: bytes,
+        offsets: array,
+    ) -> "TranscriptionSegments":
+        """Adopt ready-made column buffers, e.g. decoded from a binary payload.
+
+        ``offsets`` holds ``len + 1`` byte offsets into the UTF-8 ``text``
+        buffer, starting at 0.
+        """
+        segments = cls()
+        segments.start_times = array("d", start_times)
+        segments.end_times = array("d", end_times)
+        segments.confidences = array("d", confidences)
+        segments._text = bytearray(text)
+        segments._offsets = array("Q", offsets)
+        if not (
+            len(segments.start_times) == len(segments.end_times)
+            == len(segments.confidences) == len(segments._offsets) - 1
+        ) or segments._offsets[0] != 0 or segments._offsets[-1] != len(segments._text):
+            raise ValueError("Segment buffers are inconsistent")
+        return segments
+
+    def text_buffer(self) -> bytes:
+        """UTF-8 text of all segments, addressed by ``text_offsets``."""
+        return bytes(self._text)
+
+    def text_offsets(self) -> array:
+        return array("Q", self._offsets)
+
+    def _append_text(self, text: str) -> None:
+        self._text += text.encode("utf-8")
+        self._offsets.append(len(self._text))
+
+    def append(self, segment: TranscriptionSegment) -> None:
+        self.start_times.append(segment.start_time)
+        self.end_times.append(segment.end_time)
+        self.confidences.append(segment.confidence)
+        self._append_text(segment.text)
+
+    def extend(self, segments: Iterable[TranscriptionSegment]) -> None:
+        for segment in segments:
+            self.append(segment)
+
+    def text_at(self, index: int) -> str:
+        """Decode the text of a single segment without building the segment."""
+        index = self._normalize_index(index)
+        return self._text[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+    def texts(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self.text_at(index)
+
+    def _normalize_index(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("segment index out of range")
+        return index
+
+    @overload
+    def __getitem__(self, index: int) -> TranscriptionSegment: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TranscriptionSegments": ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[TranscriptionSegment, "TranscriptionSegments"]:
+        if isinstance(index, slice):
+            return TranscriptionSegments(self[i] for i in range(*index.indices(len(self))))
+        index = self._normalize_index(index)
+        return TranscriptionSegment(
+            start_time=self.start_times[index],
+            end_time=self.end_times[index],
+            text=self.text_at(index),
+            confidence=self.confidences[index],
+        )
+
+    def __setitem__(self, index: int, segment: TranscriptionSegment) -> None:
+        """Replace one segment in place."""
+        index = self._normalize_index(index)
+        self.start_times[index] = segment.start_time
+        self.end_times[index] = segment.end_time
+        self.confidences[index] = segment.confidence
+        start, end = self._offsets[index], self._offsets[index + 1]
+        encoded = segment.text.encode("utf-8")
+        self._text[start:end] = encoded
+        shift = len(encoded) - (end - start)
+        if shift:
+            for i in range(index + 1, len(self._offsets)):
+                self._offsets[i] += shift
+
+    def __len__(self) -> int:
+        return len(self.start_times)
+
+    def __iter__(self) -> Iterator[TranscriptionSegment]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TranscriptionSegments):
+            return (
+                self.start_times == other.start_times
+                and self.end_times == other.end_times
+                and self.confidences == other.confidences
+                and self._offsets == other._offsets
+                and self._text == other._text
+            )
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TranscriptionSegments(<{len(self)} segments>)"
+
+    def fingerprint(self) -> bytes:
+        """Digest of the content, for cheap change detection."""
+        digest = blake2b(len(self).to_bytes(8, "little"), digest_size=16)
+        for column in (self.start_times, self.end_times, self.confidences, self._offsets):
+            digest.update(column.tobytes())
+        digest.update(self._text)
+        return digest.digest()
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the column buffers."""
+        return (
+            self.start_times.itemsize * len(self.start_times)
+            + self.end_times.itemsize * len(self.end_times)
+            + self.confidences.itemsize * len(self.confidences)
+            + self._offsets.itemsize * len(self._offsets)
+            + len(self._text)
+        )
+
+
+@dataclass(slots=True)
+class SegmentSearchHit:
+    transcription_id: str
+    start_time: float  # in seconds
+    end_time: float  # in seconds
+    text: str
+    rank: float
+
+
+@dataclass(slots=True)
 class Transcription:
     id: str
     audio_file_id: str
@@ -31,5 +226,11 @@ class Transcription:
     model: TranscriptionModel
     status: TranscriptionStatus
     language: Optional[str] = None
-    segments: List[TranscriptionSegment] = None
-    error_message: Optional[str] = None
\ No newline at end of file
+    segments: Optional[TranscriptionSegments] = None
+    error_message: Optional[str] = None
+    revision: int = 0  # bumped whenever segments change
+    created_at: Optional[datetime] = None
+
+    def __post_init__(self):
+        if self.segments is not None and not isinstance(self.segments, TranscriptionSegments):
+            self.segments = TranscriptionSegments(self.segments)
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Optional, List
 
-from .entities import Transcription
+from ..pagination import DEFAULT_PAGE_SIZE, Page
+from .entities import SegmentSearchHit, Transcription, TranscriptionStatus
 
 
 class TranscriptionRepository(ABC):
@@ -10,21 +11,43 @@ class TranscriptionRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_by_id(self, transcription_id: str) -> Optional[Transcription]:
+    async def get_by_id(self, transcription_id: str, include_segments: bool = True) -> Optional[Transcription]:
         pass
 
     @abstractmethod
-    async def get_by_audio_file_id(self, audio_file_id: str) -> List[Transcription]:
+    async def get_by_audio_file_id(self, audio_file_id: str, include_segments: bool = True) -> List[Transcription]:
         pass
 
     @abstractmethod
-    async def get_by_user_id(self, user_id: int) -> List[Transcription]:
+    async def get_by_user_id(self, user_id: int, include_segments: bool = True) -> List[Transcription]:
+        pass
+
+    @abstractmethod
+    async def get_page_by_user_id(
+        self,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        include_segments: bool = False
+    ) -> Page[Transcription]:
+        pass
+
+    @abstractmethod
+    async def search_segments(
+        self, user_id: int, query: str, language: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[SegmentSearchHit]:
         pass
 
     @abstractmethod
     async def update(self, transcription: Transcription) -> Transcription:
         pass
 
+    @abstractmethod
+    async def update_status(
+        self, transcription_id: str, status: TranscriptionStatus, error_message: Optional[str] = None
+    ) -> None:
+        pass
+
     @abstractmethod
     async def delete(self, transcription_id: str) -> None:
         pass
\ No newline at end of file
@@ -17,7 +17,7 @@ class TranscriptionModel(str, Enum):
     WHISPER_TURBO = "whisper-turbo"
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: int
     username: Optional[str] = None
@@ -29,7 +29,7 @@ class User:
     updated_at: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class UserSettings:
     user_id: int
     preferred_model: TranscriptionModel = TranscriptionModel.WHISPER_LARGE_V3
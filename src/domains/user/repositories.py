@@ -9,6 +9,10 @@ class UserRepository(ABC):
     async def save(self, user: User) -> User:
         pass
 
+    @abstractmethod
+    async def upsert_many(self, users: List[User]) -> None:
+        pass
+
     @abstractmethod
     async def get_by_id(self, user_id: int) -> Optional[User]:
         pass
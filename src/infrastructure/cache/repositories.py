@@ -0,0 +1,290 @@
+import json
+import logging
+from dataclasses import asdict
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import config
+from src.domains.export.binary import decode_segments, encode_segments
+from src.domains.pagination import DEFAULT_PAGE_SIZE, Page
+from src.domains.transcription.entities import (
+    SegmentSearchHit,
+    Transcription,
+    TranscriptionModel,
+    TranscriptionSegments,
+    TranscriptionStatus,
+)
+from src.domains.transcription.repositories import TranscriptionRepository
+from src.domains.user.entities import ExportFormat, UserSettings
+from src.domains.user.entities import TranscriptionModel as PreferredModel
+from src.domains.user.repositories import UserSettingsRepository
+from src.infrastructure.database.session import after_commit, use_primary
+from src.infrastructure.monitoring.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached representation changes; old entries are then simply never read
+CACHE_VERSION = 2
+# Lifetime of per-id version counters; must exceed the TTL of every cached entry
+VERSION_TTL = 24 * 3600
+# Stored for users without settings, so defaults are not looked up on every render
+_MISSING = b"-"
+
+
+class RedisCache:
+    """Thin fail-open wrapper over Redis for cached entities.
+
+    Keys look like ``stt:v2:<kind>:<id>``. Each id has a version counter
+    under ``<key>:version`` that ``delete`` increments, and entries are
+    stored with the version read before the database was queried. ``get``
+    ignores entries of an older version, so a reader that loaded a row
+    before a concurrent write cannot put the old row back in the cache.
+    Redis errors are logged and treated as misses, so an unavailable cache
+    only costs latency.
+    """
+
+    def __init__(self, redis: Redis, prefix: str = "stt"):
+        self.redis = redis
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: Optional[str] = None) -> "RedisCache":
+        return cls(Redis.from_url(url or config.REDIS_URL))
+
+    def key(self, kind: str, id: Any) -> str:
+        return f"{self.prefix}:v{CACHE_VERSION}:{kind}:{id}"
+
+    async def get(self, kind: str, id: Any) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """Return the cached entry, if any, and the version to ``set`` a fresh one with."""
+        key = self.key(kind, id)
+        try:
+            data, version = await self.redis.mget(key, f"{key}:version")
+        except RedisError as e:
+            logger.warning(f"Cache read of {kind} {id} failed: {e}")
+            data = version = None
+        else:
+            version = version or b"0"
+            if data is not None:
+                stamp, _, data = data.partition(b":")
+                if stamp != version:
+                    data = None
+        CACHE_REQUESTS.labels(kind, "hit" if data is not None else "miss").inc()
+        return data, version
+
+    async def set(self, kind: str, id: Any, data: bytes, ttl: int, version: Optional[bytes]) -> None:
+        if version is None:
+            # The read failed, so the entry could not be told apart from a stale one
+            return
+        try:
+            await self.redis.set(self.key(kind, id), version + b":" + data, ex=ttl)
+        except RedisError as e:
+            logger.warning(f"Cache write of {kind} {id} failed: {e}")
+
+    async def delete(self, kind: str, id: Any) -> None:
+        key = self.key(kind, id)
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.incr(f"{key}:version")
+            pipeline.expire(f"{key}:version", VERSION_TTL)
+            pipeline.delete(key)
+            await pipeline.execute()
+        except RedisError as e:
+            # A stale entry outlives this by at most its TTL
+            logger.error(f"Cache invalidation of {kind} {id} failed: {e}")
+
+
+def dump_transcription(transcription: Transcription) -> bytes:
+    """Serialize a transcription as a binary segment payload carrying its fields as metadata."""
+    fields = {
+        "id": transcription.id,
+        "audio_file_id": transcription.audio_file_id,
+        "user_id": transcription.user_id,
+        "model": transcription.model.value,
+        "status": transcription.status.value,
+        "language": transcription.language,
+        "error_message": transcription.error_message,
+        "revision": transcription.revision,
+        "created_at": transcription.created_at.isoformat() if transcription.created_at else None,
+        "has_segments": transcription.segments is not None,
+    }
+    return encode_segments(transcription.segments or TranscriptionSegments(), metadata=fields)
+
+
+def load_transcription(data: bytes) -> Transcription:
+    payload = decode_segments(data)
+    fields = payload.metadata
+    return Transcription(
+        id=fields["id"],
+        audio_file_id=fields["audio_file_id"],
+        user_id=fields["user_id"],
+        model=TranscriptionModel(fields["model"]),
+        status=TranscriptionStatus(fields["status"]),
+        language=fields["language"],
+        segments=payload.segments if fields["has_segments"] else None,
+        error_message=fields["error_message"],
+        revision=fields["revision"],
+        created_at=datetime.fromisoformat(fields["created_at"]) if fields["created_at"] else None,
+    )
+
+
+def dump_user_settings(settings: UserSettings) -> bytes:
+    return json.dumps(asdict(settings), default=str).encode("utf-8")
+
+
+def load_user_settings(data: bytes) -> UserSettings:
+    fields: Dict[str, Any] = json.loads(data)
+    for name in ("created_at", "updated_at"):
+        if fields[name]:
+            fields[name] = datetime.fromisoformat(fields[name])
+    fields["preferred_model"] = PreferredModel(fields["preferred_model"])
+    fields["preferred_export_format"] = ExportFormat(fields["preferred_export_format"])
+    return UserSettings(**fields)
+
+
+class CachedTranscriptionRepository(TranscriptionRepository):
+    """Read-through cache of single transcriptions in front of another repository.
+
+    Only ``get_by_id`` with segments is cached; writes go to the wrapped
+    repository first and then drop the cached entry. List queries and
+    segment-less lookups, which are cheap already, are passed through.
+
+    Pass the session of the wrapped repository as ``session``: entries are
+    then dropped only once its transaction commits, and misses are filled
+    from the primary rather than from a lagging replica.
+    """
+
+    KIND = "transcription"
+
+    def __init__(
+        self,
+        repository: TranscriptionRepository,
+        cache: RedisCache,
+        ttl: Optional[int] = None,
+        session: Optional[AsyncSession] = None
+    ):
+        self.repository = repository
+        self.cache = cache
+        self.ttl = ttl or config.get("CACHE_TRANSCRIPTION_TTL", 600)
+        self.session = session
+
+    async def _invalidate(self, transcription_id: str) -> None:
+        invalidate = partial(self.cache.delete, self.KIND, transcription_id)
+        if self.session is None:
+            await invalidate()
+        else:
+            await after_commit(self.session, invalidate)
+
+    async def save(self, transcription: Transcription) -> Transcription:
+        transcription = await self.repository.save(transcription)
+        await self._invalidate(transcription.id)
+        return transcription
+
+    async def get_by_id(self, transcription_id: str, include_segments: bool = True) -> Optional[Transcription]:
+        if not include_segments:
+            return await self.repository.get_by_id(transcription_id, include_segments=False)
+
+        data, version = await self.cache.get(self.KIND, transcription_id)
+        if data is not None:
+            return load_transcription(data)
+
+        if self.session is not None:
+            use_primary(self.session)
+        transcription = await self.repository.get_by_id(transcription_id)
+        if transcription is not None:
+            await self.cache.set(self.KIND, transcription_id, dump_transcription(transcription), self.ttl, version)
+        return transcription
+
+    async def get_by_audio_file_id(self, audio_file_id: str, include_segments: bool = True) -> List[Transcription]:
+        return await self.repository.get_by_audio_file_id(audio_file_id, include_segments)
+
+    async def get_by_user_id(self, user_id: int, include_segments: bool = True) -> List[Transcription]:
+        return await self.repository.get_by_user_id(user_id, include_segments)
+
+    async def get_page_by_user_id(
+        self,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        include_segments: bool = False
+    ) -> Page[Transcription]:
+        return await self.repository.get_page_by_user_id(user_id, limit, cursor, include_segments)
+
+    async def search_segments(
+        self, user_id: int, query: str, language: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[SegmentSearchHit]:
+        return await self.repository.search_segments(user_id, query, language, limit)
+
+    async def update(self, transcription: Transcription) -> Transcription:
+        transcription = await self.repository.update(transcription)
+        await self._invalidate(transcription.id)
+        return transcription
+
+    async def update_status(
+        self, transcription_id: str, status: TranscriptionStatus, error_message: Optional[str] = None
+    ) -> None:
+        await self.repository.update_status(transcription_id, status, error_message)
+        await self._invalidate(transcription_id)
+
+    async def delete(self, transcription_id: str) -> None:
+        await self.repository.delete(transcription_id)
+        await self._invalidate(transcription_id)
+
+
+class CachedUserSettingsRepository(UserSettingsRepository):
+    """Read-through cache of user settings, including users who have none yet.
+
+    ``session`` is used as in ``CachedTranscriptionRepository``.
+    """
+
+    KIND = "user_settings"
+
+    def __init__(
+        self,
+        repository: UserSettingsRepository,
+        cache: RedisCache,
+        ttl: Optional[int] = None,
+        session: Optional[AsyncSession] = None
+    ):
+        self.repository = repository
+        self.cache = cache
+        self.ttl = ttl or config.get("CACHE_USER_SETTINGS_TTL", 3600)
+        self.session = session
+
+    async def _invalidate(self, user_id: int) -> None:
+        invalidate = partial(self.cache.delete, self.KIND, user_id)
+        if self.session is None:
+            await invalidate()
+        else:
+            await after_commit(self.session, invalidate)
+
+    async def save(self, settings: UserSettings) -> UserSettings:
+        settings = await self.repository.save(settings)
+        await self._invalidate(settings.user_id)
+        return settings
+
+    async def get_by_user_id(self, user_id: int) -> Optional[UserSettings]:
+        data, version = await self.cache.get(self.KIND, user_id)
+        if data is not None:
+            return None if data == _MISSING else load_user_settings(data)
+
+        if self.session is not None:
+            use_primary(self.session)
+        settings = await self.repository.get_by_user_id(user_id)
+        await self.cache.set(
+            self.KIND, user_id, dump_user_settings(settings) if settings is not None else _MISSING, self.ttl, version
+        )
+        return settings
+
+    async def update(self, settings: UserSettings) -> UserSettings:
+        settings = await self.repository.update(settings)
+        await self._invalidate(settings.user_id)
+        return settings
+
+    async def delete(self, user_id: int) -> None:
+        await self.repository.delete(user_id)
+        await self._invalidate(user_id)
@@ -2,15 +2,42 @@ from datetime import datetime
 from typing import Optional, List
 from uuid import UUID
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, DateTime, Text, BigInteger
+from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, DateTime, Text, BigInteger, LargeBinary, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.schema import CreateColumn
 
 Base = declarative_base()
 
+# Text search configuration per transcription language; others fall back to 'simple'
+SEARCH_CONFIGS = {"ru": "russian", "en": "english"}
+
+
+def search_config(language: Optional[str]) -> str:
+    return SEARCH_CONFIGS.get(language, "simple")
+
+
+# Constant regconfigs keep the expression immutable, as generated columns require
+SEARCH_VECTOR_EXPRESSION = "to_tsvector(CASE language {} ELSE 'simple'::regconfig END, text)".format(
+    " ".join(f"WHEN '{language}' THEN '{config}'::regconfig" for language, config in SEARCH_CONFIGS.items())
+)
+
+
+@compiles(CreateColumn)
+def _create_column(element, compiler, **kw):
+    # Columns marked postgresql_only are left out of CREATE TABLE elsewhere (e.g. SQLite in tests)
+    if element.element.info.get("postgresql_only") and compiler.dialect.name != "postgresql":
+        return None
+    return compiler.visit_create_column(element, **kw)
+
 
 class AudioFile(Base):
     __tablename__ = "audio_files"
+    __table_args__ = (
+        Index("ix_audio_files_created_at", "created_at"),
+    )
 
     id = Column(String, primary_key=True)
     user_id = Column(BigInteger, nullable=False)
@@ -31,6 +58,10 @@ class AudioFile(Base):
 
 class Transcription(Base):
     __tablename__ = "transcriptions"
+    __table_args__ = (
+        # Keyset pagination of a user's history, newest first
+        Index("ix_transcriptions_user_history", "user_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True)
     audio_file_id = Column(String, ForeignKey("audio_files.id", ondelete="CASCADE"), nullable=False)
@@ -39,7 +70,10 @@ class Transcription(Base):
     status = Column(String(20), nullable=False)
     language = Column(String(10), nullable=True)
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    revision = Column(Integer, nullable=False, default=0)
+    # Segments encoded with domains.export.binary; NULL means they live in transcription_segments
+    packed_segments = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     audio_file = relationship("AudioFile", back_populates="transcriptions")
@@ -49,6 +83,10 @@ class Transcription(Base):
 
 class TranscriptionSegment(Base):
     __tablename__ = "transcription_segments"
+    __table_args__ = (
+        Index("ix_transcription_segments_transcription_start", "transcription_id", "start_time"),
+        Index("ix_transcription_segments_search", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
 
     id = Column(String, primary_key=True)
     transcription_id = Column(String, ForeignKey("transcriptions.id", ondelete="CASCADE"), nullable=False)
@@ -56,13 +94,21 @@ class TranscriptionSegment(Base):
     end_time = Column(Float, nullable=False)
     text = Column(Text, nullable=False)
     confidence = Column(Float, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    language = Column(String(10), nullable=True)  # copy of transcriptions.language for the search vector
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True), info={"postgresql_only": True})
+    )
+    # Monthly range partition key on PostgreSQL, where the primary key is (id, created_at)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     transcription = relationship("Transcription", back_populates="segments")
 
 
 class Diarization(Base):
     __tablename__ = "diarizations"
+    __table_args__ = (
+        Index("ix_diarizations_user_history", "user_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True)
     audio_file_id = Column(String, ForeignKey("audio_files.id", ondelete="CASCADE"), nullable=False)
@@ -70,7 +116,10 @@ class Diarization(Base):
     status = Column(String(20), nullable=False)
     num_speakers = Column(Integer, nullable=True)
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    revision = Column(Integer, nullable=False, default=0)
+    # Segments encoded with domains.export.binary; NULL means they live in speaker_segments
+    packed_segments = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     audio_file = relationship("AudioFile", back_populates="diarizations")
@@ -80,6 +129,9 @@ class Diarization(Base):
 
 class SpeakerSegment(Base):
     __tablename__ = "speaker_segments"
+    __table_args__ = (
+        Index("ix_speaker_segments_diarization_start", "diarization_id", "start_time"),
+    )
 
     id = Column(String, primary_key=True)
     diarization_id = Column(String, ForeignKey("diarizations.id", ondelete="CASCADE"), nullable=False)
@@ -87,7 +139,8 @@ class SpeakerSegment(Base):
     start_time = Column(Float, nullable=False)
     end_time = Column(Float, nullable=False)
     confidence = Column(Float, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Monthly range partition key on PostgreSQL, where the primary key is (id, created_at)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     diarization = relationship("Diarization", back_populates="segments")
 
@@ -124,6 +177,9 @@ class UserSettings(Base):
 
 class Export(Base):
     __tablename__ = "exports"
+    __table_args__ = (
+        Index("ix_exports_user_history", "user_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True)
     user_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -135,7 +191,8 @@ class Export(Base):
     file_url = Column(String(255), nullable=True)
     options = Column(Text, nullable=True)  # JSON serialized options
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    cache_key = Column(String(64), nullable=True, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = relationship("User", back_populates="exports")
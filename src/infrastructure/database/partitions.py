@@ -0,0 +1,121 @@
+"""Monthly range partitions of the segment tables (PostgreSQL only).
+
+Partitions are named ``<table>_pYYYY_MM`` and cover one calendar month of
+``created_at``; a ``<table>_default`` partition catches anything outside
+them. Segment rows carry the ``created_at`` of their transcription or
+diarization, so a partition holds the segments of the parents created in
+its month, however often they were edited since.
+
+Functions here take a connection outside a transaction and change each
+partition in a short transaction of its own. Creating a partition locks
+the parent table exclusively, so the statements run with
+``lock_timeout_ms`` and give up instead of queueing behind long queries;
+the next run retries.
+"""
+import logging
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("transcription_segments", "speaker_segments")
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+async def _set_lock_timeout(connection: AsyncConnection, lock_timeout_ms: int) -> None:
+    await connection.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+
+
+async def _create_partition(connection: AsyncConnection, table: str, month: datetime) -> None:
+    name = partition_name(table, month)
+    start, end = f"{month:%Y-%m-%d}", f"{add_months(month, 1):%Y-%m-%d}"
+    bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    default = f"{table}_default"
+    has_rows = await connection.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= '{start}' AND created_at < '{end}')"
+    ))
+    if not has_rows.scalar():
+        await connection.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+        return
+
+    # PostgreSQL refuses a partition for rows the default partition already
+    # holds, so take the default out while they are moved over
+    await connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    await connection.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+    await connection.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE created_at >= '{start}' AND created_at < '{end}' "
+        f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+    ))
+    await connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    logger.warning(f"Moved rows of {name} out of {default}; partitions should be created ahead of time")
+
+
+async def ensure_partitions(
+    connection: AsyncConnection, table: str, now: datetime, months_ahead: int, lock_timeout_ms: int = 5000
+) -> List[str]:
+    """Create the partitions of the current month and ``months_ahead`` following ones.
+
+    Creating them ahead of time keeps the default partition empty, which a
+    new partition covering rows already in it would otherwise have to scan.
+    Rows that landed in the default partition anyway, e.g. after maintenance
+    did not run for a while, are moved into the new partition. A month whose
+    lock cannot be taken within ``lock_timeout_ms`` is skipped until the
+    next run. Returns the names of the partitions created.
+    """
+    async with connection.begin():
+        existing = {name for name, _ in await list_partitions(connection, table)}
+
+    created = []
+    first = month_start(now)
+    for offset in range(months_ahead + 1):
+        month = add_months(first, offset)
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        try:
+            async with connection.begin():
+                await _set_lock_timeout(connection, lock_timeout_ms)
+                await _create_partition(connection, table, month)
+        except OperationalError as e:
+            logger.warning(f"Could not create partition {name}, retrying next run: {e}")
+            continue
+        logger.info(f"Created partition {name}")
+        created.append(name)
+    return created
+
+
+async def list_partitions(connection: AsyncConnection, table: str) -> List[Tuple[str, datetime]]:
+    """Monthly partitions of ``table`` with the (exclusive) end of their range, oldest first."""
+    result = await connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    partitions = []
+    prefix = f"{table}_p"
+    for (name,) in result:
+        if not name.startswith(prefix):
+            continue
+        month = datetime.strptime(name[len(prefix):], "%Y_%m")
+        partitions.append((name, add_months(month, 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
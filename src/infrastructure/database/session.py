@@ -0,0 +1,264 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from src.config.settings import config
+from src.infrastructure.monitoring.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CONNECTIONS_CREATED,
+    DB_POOL_CONNECTIONS_INVALIDATED,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_ROUTED_STATEMENTS,
+    DB_UNIT_OF_WORK_DURATION,
+)
+
+logger = logging.getLogger(__name__)
+
+# Session.info flag set while a session is owned by a unit of work
+UNIT_OF_WORK = "unit_of_work"
+# Session.info flags routing every statement of a session to the primary
+USE_PRIMARY = "use_primary"
+WROTE = "wrote"
+# Session.info lists of callbacks waiting for the open transaction to commit, and of those due to run
+AFTER_COMMIT = "after_commit"
+COMMITTED = "committed"
+
+
+def async_database_url(url: str) -> str:
+    """Point a plain ``postgresql://`` URL at the async psycopg driver."""
+    parsed = make_url(url)
+    if parsed.drivername in ("postgresql", "postgres"):
+        parsed = parsed.set(drivername="postgresql+psycopg")
+    return parsed.render_as_string(hide_password=False)
+
+
+def create_engine(url: Optional[str] = None, name: str = "primary", **overrides) -> AsyncEngine:
+    """Create a pooled async engine configured from settings."""
+    url = async_database_url(url or config.DATABASE_URL)
+    options = dict(
+        pool_pre_ping=config.get("DB_POOL_PRE_PING", True),
+        query_cache_size=config.get("DB_QUERY_CACHE_SIZE", 1200),
+    )
+    if make_url(url).get_backend_name() == "postgresql":
+        options.update(
+            pool_size=config.get("DB_POOL_SIZE", 10),
+            max_overflow=config.get("DB_MAX_OVERFLOW", 20),
+            pool_timeout=config.get("DB_POOL_TIMEOUT", 30),
+            pool_recycle=config.get("DB_POOL_RECYCLE", 1800),
+            pool_use_lifo=True,
+            # psycopg prepares a statement server-side after this many executions; None disables
+            # (required behind PgBouncer in transaction mode)
+            connect_args={"prepare_threshold": config.get("DB_PREPARE_THRESHOLD", 5)},
+        )
+    options.update(overrides)
+
+    engine = create_async_engine(url, **options)
+    instrument_pool(engine, name)
+    return engine
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> None:
+    """Export pool utilization of an engine as Prometheus metrics."""
+    pool = engine.sync_engine.pool
+
+    def update_usage(*_) -> None:
+        if isinstance(pool, QueuePool):
+            DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+            DB_POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+
+    def on_connect(*_) -> None:
+        DB_POOL_CONNECTIONS_CREATED.labels(name).inc()
+
+    def on_invalidate(*_) -> None:
+        DB_POOL_CONNECTIONS_INVALIDATED.labels(name).inc()
+
+    if isinstance(pool, QueuePool):
+        DB_POOL_SIZE.labels(name).set(pool.size())
+    event.listen(pool, "connect", on_connect)
+    event.listen(pool, "checkout", update_usage)
+    event.listen(pool, "checkin", update_usage)
+    event.listen(pool, "invalidate", on_invalidate)
+
+
+async def commit(session: AsyncSession) -> None:
+    """Commit a repository change, or only flush it inside a unit of work.
+
+    The unit of work commits once when its scope exits, so several
+    repository calls share one transaction and one round trip to COMMIT.
+    """
+    if session.info.get(UNIT_OF_WORK):
+        await session.flush()
+    else:
+        await session.commit()
+        await run_after_commit(session)
+
+
+async def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Await ``callback`` once the changes made so far in ``session`` are committed.
+
+    Runs it right away when no transaction is open, i.e. they already are.
+    The callback is dropped if the transaction rolls back. Cache
+    invalidations use this, so that no reader can load the old rows again
+    after the cache entry is gone.
+    """
+    if not session.in_transaction():
+        await callback()
+        return
+    session.info.setdefault(AFTER_COMMIT, []).append(callback)
+
+
+async def run_after_commit(session: AsyncSession) -> None:
+    """Await the ``after_commit`` callbacks of transactions that have committed."""
+    callbacks: List[Callable[[], Awaitable[None]]] = session.info.pop(COMMITTED, [])
+    for callback in callbacks:
+        await callback()
+
+
+def use_primary(session: AsyncSession) -> None:
+    """Send every further statement of ``session`` to the primary.
+
+    Repository writes call this before reading the rows they are about to
+    change, which the replica may not have caught up with.
+    """
+    session.info[USE_PRIMARY] = True
+
+
+class RoutingSession(Session):
+    """Session sending plain SELECTs to a replica and everything else to the primary.
+
+    After its first write, or when pinned with ``USE_PRIMARY``, a session
+    uses the primary for reads too, so it always sees its own writes.
+    Locking reads (``FOR UPDATE``) always go to the primary.
+    """
+
+    def __init__(self, *args, replica: Optional[Engine] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self.replica is None:
+            return primary
+
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info[WROTE] = True
+        elif (
+            getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+            and not self.info.get(USE_PRIMARY)
+            and not self.info.get(WROTE)
+        ):
+            DB_ROUTED_STATEMENTS.labels("replica").inc()
+            return self.replica
+        DB_ROUTED_STATEMENTS.labels("primary").inc()
+        return primary
+
+
+def _on_commit(session: Session) -> None:
+    # Events are synchronous; the callbacks are awaited by run_after_commit()
+    session.info.setdefault(COMMITTED, []).extend(session.info.pop(AFTER_COMMIT, []))
+
+
+def _on_rollback(session: Session) -> None:
+    session.info.pop(AFTER_COMMIT, None)
+
+
+event.listen(RoutingSession, "after_commit", _on_commit)
+event.listen(RoutingSession, "after_rollback", _on_rollback)
+
+
+class ReadYourWrites:
+    """Remembers users who wrote recently, so their reads skip the lagging replica."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._until: Dict[int, float] = {}
+
+    def mark(self, user_id: int) -> None:
+        now = time.monotonic()
+        if len(self._until) > 10_000:
+            self._until = {key: until for key, until in self._until.items() if until > now}
+        self._until[user_id] = now + self.window
+
+    def is_recent(self, user_id: int) -> bool:
+        until = self._until.get(user_id)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._until[user_id]
+            return False
+        return True
+
+
+class Database:
+    """Owns the engines and hands out sessions and units of work.
+
+    With ``database_replica_url`` configured, plain sessions read from the
+    replica; a user's sessions stick to the primary for
+    ``db_read_your_writes_seconds`` after a session of theirs wrote.
+    Read-your-writes state is per process.
+    """
+
+    def __init__(self, engine: Optional[AsyncEngine] = None, replica_engine: Optional[AsyncEngine] = None):
+        self.engine = engine or create_engine()
+        if replica_engine is None and config.get("DATABASE_REPLICA_URL"):
+            replica_engine = create_engine(config.DATABASE_REPLICA_URL, name="replica")
+        self.replica_engine = replica_engine
+        self.read_your_writes = ReadYourWrites(config.get("DB_READ_YOUR_WRITES_SECONDS", 5))
+        self.session_factory = async_sessionmaker(
+            self.engine,
+            expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            replica=replica_engine.sync_engine if replica_engine is not None else None
+        )
+
+    @asynccontextmanager
+    async def session(self, user_id: Optional[int] = None) -> AsyncIterator[AsyncSession]:
+        """Session whose repository calls commit individually.
+
+        Pass the acting user's id to get read-your-writes across sessions.
+        """
+        async with self.session_factory() as session:
+            if user_id is not None and self.read_your_writes.is_recent(user_id):
+                session.info[USE_PRIMARY] = True
+            try:
+                yield session
+                await run_after_commit(session)
+            finally:
+                if user_id is not None and session.info.get(WROTE):
+                    self.read_your_writes.mark(user_id)
+
+    @asynccontextmanager
+    async def unit_of_work(self, user_id: Optional[int] = None) -> AsyncIterator[AsyncSession]:
+        """Session whose repository calls share one transaction on the primary.
+
+        Commits when the block exits normally and rolls back on error.
+        """
+        started = time.perf_counter()
+        outcome = "rollback"
+        async with self.session_factory() as session:
+            session.info[UNIT_OF_WORK] = True
+            session.info[USE_PRIMARY] = True
+            try:
+                async with session.begin():
+                    yield session
+                outcome = "commit"
+                if user_id is not None and session.info.get(WROTE):
+                    self.read_your_writes.mark(user_id)
+                await run_after_commit(session)
+            finally:
+                DB_UNIT_OF_WORK_DURATION.labels(outcome).observe(time.perf_counter() - started)
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+        if self.replica_engine is not None:
+            await self.replica_engine.dispose()
+        logger.info("Database engine disposed")
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from src.config.settings import config
+from src.infrastructure.monitoring.metrics import EVENTS_COALESCED
+from .event_bus import Event, EventBus
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescingPublisher:
+    """Rate-limited publisher for progress events.
+
+    Events whose type sets ``coalesce`` are held back and only the latest
+    one per ``job_key`` is published, at most once every ``interval``
+    seconds. Every other event is published immediately. A terminal event
+    discards the held progress of its job and is never reordered before
+    progress that is already being published. Progress arriving within
+    ``finished_ttl`` seconds after the terminal event of its job is dropped.
+    """
+
+    def __init__(self, event_bus: EventBus, interval: Optional[float] = None, finished_ttl: Optional[float] = None):
+        self.event_bus = event_bus
+        self.interval = interval or config.get("PROGRESS_PUBLISH_INTERVAL", 1.0)
+        self.finished_ttl = finished_ttl or config.get("PROGRESS_FINISHED_TTL", 300)
+        self._pending: Dict[str, Event] = {}
+        # Job keys with a published terminal event, until when late progress for them is dropped
+        self._finished: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def _is_finished(self, key: str) -> bool:
+        until = self._finished.get(key)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._finished[key]
+            return False
+        return True
+
+    def _mark_finished(self, key: str) -> None:
+        now = time.monotonic()
+        if len(self._finished) > 10_000:
+            self._finished = {job: until for job, until in self._finished.items() if until > now}
+        self._finished[key] = now + self.finished_ttl
+
+    async def publish(self, event: Event) -> None:
+        key = event.job_key()
+        if event.coalesce and key is not None:
+            if self._is_finished(key):
+                EVENTS_COALESCED.labels(event.event_name()).inc()
+                return
+            if key in self._pending:
+                EVENTS_COALESCED.labels(event.event_name()).inc()
+            self._pending[key] = event
+            return
+
+        async with self._lock:
+            if key is not None:
+                self._pending.pop(key, None)
+                self._mark_finished(key)
+            await self.event_bus.publish(event)
+
+    async def flush(self) -> None:
+        """Publish the latest held progress of every job now."""
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            unsent = dict(batch)
+            for key, event in batch.items():
+                try:
+                    await self.event_bus.publish(event)
+                except asyncio.CancelledError:
+                    # Hand the rest of the batch back unless newer progress arrived meanwhile
+                    self._pending = {**unsent, **self._pending}
+                    raise
+                except Exception as e:
+                    logger.error(f"Failed to publish {event.event_name()} for {key}: {e}")
+                    # Retry on the next flush unless newer progress arrived meanwhile
+                    self._pending.setdefault(key, event)
+                del unsent[key]
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and publish whatever is still held.
+
+        A flush in progress is finished rather than cancelled.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
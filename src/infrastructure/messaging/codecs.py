@@ -0,0 +1,105 @@
+"""Wire codecs for NATS message payloads.
+
+Every message carries its codec in the ``Content-Type`` header and
+receivers decode by that header, so publishers can switch codecs without
+breaking consumers. Messages without the header come from older
+publishers and are JSON. Roll out a new codec by deploying consumers
+first and switching ``nats_codec`` on publishers afterwards.
+
+``orjson`` and ``msgpack`` are optional: JSON falls back to the standard
+library, and msgpack is only available when installed.
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Mapping, Optional
+
+from src.config.settings import config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional codec
+    msgpack = None
+
+CODEC_HEADER = "Content-Type"
+
+
+class Codec(ABC):
+    """Encodes message payloads to bytes and back."""
+
+    name: str
+    content_type: str
+
+    @abstractmethod
+    def encode(self, payload: Any) -> bytes:
+        """Encode a payload."""
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Decode a payload."""
+        pass
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {CODEC_HEADER: self.content_type}
+
+
+class JsonCodec(Codec):
+    """JSON, through orjson when it is installed."""
+
+    name = "json"
+    content_type = "application/json"
+
+    def encode(self, payload: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(payload, default=str)
+        return json.dumps(payload, default=str).encode()
+
+    def decode(self, data: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack; smaller and faster than JSON for numeric payloads."""
+
+    name = "msgpack"
+    content_type = "application/msgpack"
+
+    def encode(self, payload: Any) -> bytes:
+        return msgpack.packb(payload, default=str)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data)
+
+
+_CODECS: Dict[str, Codec] = {JsonCodec.name: JsonCodec()}
+if msgpack is not None:
+    _CODECS[MsgpackCodec.name] = MsgpackCodec()
+_BY_CONTENT_TYPE: Dict[str, Codec] = {codec.content_type: codec for codec in _CODECS.values()}
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """Codec by name; defaults to the ``nats_codec`` setting."""
+    name = name or config.get("NATS_CODEC", "json")
+    try:
+        return _CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown or unavailable codec: {name}") from None
+
+
+def codec_for_headers(headers: Optional[Mapping[str, str]]) -> Codec:
+    """Codec a received message was encoded with."""
+    content_type = (headers or {}).get(CODEC_HEADER)
+    if content_type is None:
+        return _CODECS[JsonCodec.name]
+    try:
+        return _BY_CONTENT_TYPE[content_type]
+    except KeyError:
+        raise ValueError(f"Unsupported content type: {content_type}") from None
@@ -1,12 +1,27 @@
-import json
+import asyncio
+import itertools
 import logging
+import time
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, fields, is_dataclass
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Set, Type, TypeVar
 
 from nats.aio.msg import Msg
+from nats.errors import TimeoutError as NatsTimeoutError
+from nats.js import JetStreamContext
+from nats.js.api import AckPolicy, ConsumerConfig, DiscardPolicy, RetentionPolicy, StorageType, StreamConfig
+from nats.js.errors import NotFoundError
 
-from .nats_client import NatsConnection
+from src.config.settings import config
+from src.infrastructure.monitoring.metrics import (
+    EVENT_HANDLER_DURATION,
+    EVENTS_CONSUMER_PENDING,
+    EVENTS_HANDLED,
+    EVENTS_IN_FLIGHT,
+)
+from .codecs import Codec, codec_for_headers, get_codec
+from .nats_client import NatsConnection, get_nats_connection
 
 logger = logging.getLogger(__name__)
 
@@ -14,23 +29,55 @@ T = TypeVar('T')
 
 
 class Event:
-    """Base class for all events."""
-    
+    """Base class for all events.
+
+    Events are declared as ``@dataclass(slots=True)`` subclasses; their
+    fields are the wire schema.
+    """
+
+    __slots__ = ()
+
+    # High-frequency events of which only the latest per job matters
+    coalesce: ClassVar[bool] = False
+
+    def job_key(self) -> Optional[str]:
+        """Key of the job the event reports on, if any."""
+        return None
+
     @classmethod
     def event_name(cls) -> str:
         """Get the event name."""
         return cls.__name__
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert event to dictionary."""
-        return self.__dict__
+        """Convert event to a new dictionary."""
+        if is_dataclass(self):
+            return {f.name: getattr(self, f.name) for f in fields(self)}
+        return dict(self.__dict__)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Event':
-        """Create event from dictionary."""
+        """Create event from dictionary, ignoring fields this version does not know."""
+        if is_dataclass(cls):
+            names = {f.name for f in fields(cls)}
+            data = {key: value for key, value in data.items() if key in names}
         return cls(**data)
 
 
+def encode_event(event: Event, codec: Codec) -> bytes:
+    """Encode an event in the bus envelope."""
+    return codec.encode({
+        "event_type": type(event).__name__,
+        "data": event.to_dict()
+    })
+
+
+def decode_event(msg: Msg, event_type: Type[Event]) -> Event:
+    """Decode an event with the codec named in the message headers."""
+    payload = codec_for_headers(msg.headers).decode(msg.data)
+    return event_type.from_dict(payload.get("data", {}))
+
+
 class EventBus(ABC):
     """Event bus interface."""
     
@@ -53,9 +100,10 @@ class EventBus(ABC):
 class NatsEventBus(EventBus):
     """NATS implementation of event bus."""
     
-    def __init__(self, nats_connection: NatsConnection, subject_prefix: str = "events"):
+    def __init__(self, nats_connection: NatsConnection, subject_prefix: str = "events", codec: Optional[Codec] = None):
         self.nats = nats_connection
         self.subject_prefix = subject_prefix
+        self.codec = codec or get_codec()
         self.subscriptions: Dict[str, List[int]] = {}
     
     def _get_subject(self, event_type: Type[Event]) -> str:
@@ -65,11 +113,7 @@ class NatsEventBus(EventBus):
     async def publish(self, event: Event) -> None:
         """Publish an event to NATS."""
         subject = self._get_subject(type(event))
-        payload = {
-            "event_type": type(event).__name__,
-            "data": event.to_dict()
-        }
-        await self.nats.publish(subject, payload)
+        await self.nats.publish_raw(subject, encode_event(event, self.codec), self.codec.headers)
         logger.debug(f"Published event {type(event).__name__} to {subject}")
     
     async def subscribe(self, event_type: Type[Event], handler: Callable[[Event], None]) -> None:
@@ -78,10 +122,7 @@ class NatsEventBus(EventBus):
         
         async def message_handler(msg: Msg) -> None:
             try:
-                payload = json.loads(msg.data.decode())
-                event_data = payload.get("data", {})
-                event = event_type.from_dict(event_data)
-                await handler(event)
+                await handler(decode_event(msg, event_type))
             except Exception as e:
                 logger.error(f"Error handling event {event_type.__name__}: {e}")
         
@@ -102,45 +143,414 @@ class NatsEventBus(EventBus):
         self.subscriptions = {}
 
 
+@dataclass(slots=True)
+class _LocalSubscription:
+    queues: List[asyncio.Queue]
+    workers: List[asyncio.Task]
+
+
+class InProcessEventBus(EventBus):
+    """In-process event bus for single-node deployments and tests.
+
+    As with ``NatsEventBus``, every subscription receives every event of
+    its type, but events are handed over as objects without encoding or a
+    broker hop. Each subscription runs ``concurrency`` workers with their
+    own bounded queue. Events with the same ``job_key`` always go to the
+    same worker, so they are handled in publish order. ``publish`` waits
+    while a queue is full.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, queue_size: int = 1000):
+        self.concurrency = concurrency or config.get("NATS_CONSUMER_CONCURRENCY", 4)
+        self.queue_size = queue_size
+        self.subscriptions: Dict[Type[Event], List[_LocalSubscription]] = {}
+        self._round_robin = itertools.count()
+
+    async def publish(self, event: Event) -> None:
+        """Queue an event for every subscription of its type."""
+        key = event.job_key()
+        for subscription in self.subscriptions.get(type(event), ()):
+            queues = subscription.queues
+            index = hash(key) if key is not None else next(self._round_robin)
+            await queues[index % len(queues)].put(event)
+        logger.debug(f"Published event {type(event).__name__} in process")
+
+    async def subscribe(
+        self,
+        event_type: Type[Event],
+        handler: Callable[[Event], None],
+        concurrency: Optional[int] = None,
+    ) -> None:
+        """Start ``concurrency`` workers handling an event type."""
+        queues = [asyncio.Queue(self.queue_size) for _ in range(concurrency or self.concurrency)]
+        workers = [asyncio.create_task(self._work(queue, event_type, handler)) for queue in queues]
+        self.subscriptions.setdefault(event_type, []).append(_LocalSubscription(queues, workers))
+
+        logger.info(f"Subscribed to event {event_type.__name__} in process with {len(workers)} workers")
+
+    async def _work(self, queue: asyncio.Queue, event_type: Type[Event], handler: Callable[[Event], None]) -> None:
+        name = event_type.event_name()
+        while True:
+            event = await queue.get()
+            EVENTS_IN_FLIGHT.labels(name).inc()
+            started = time.perf_counter()
+            outcome = "ack"
+            try:
+                await handler(event)
+            except Exception as e:
+                outcome = "error"
+                logger.error(f"Error handling event {event_type.__name__}: {e}")
+            finally:
+                EVENTS_IN_FLIGHT.labels(name).dec()
+                EVENT_HANDLER_DURATION.labels(name).observe(time.perf_counter() - started)
+                queue.task_done()
+            EVENTS_HANDLED.labels(name, outcome).inc()
+
+    async def join(self) -> None:
+        """Wait until every queued event has been handled."""
+        await asyncio.gather(*(
+            queue.join()
+            for subscriptions in self.subscriptions.values()
+            for subscription in subscriptions
+            for queue in subscription.queues
+        ))
+
+    async def unsubscribe_all(self) -> None:
+        """Stop all workers; events still queued are discarded."""
+        workers = [
+            worker
+            for subscriptions in self.subscriptions.values()
+            for subscription in subscriptions
+            for worker in subscription.workers
+        ]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self.subscriptions = {}
+
+
+class JetStreamEventBus(EventBus):
+    """JetStream implementation of event bus with durable work queues.
+
+    Events are stored in a work-queue stream, so they survive worker restarts
+    and each one is delivered to exactly one worker. Subscribers on every node
+    share one durable pull consumer per event type. A failed handler naks its
+    message with exponential backoff; after ``max_deliver`` attempts the
+    message is terminated and logged.
+
+    Each subscription fetches messages in batches and handles up to
+    ``concurrency`` of them at once. While all slots are busy it stops
+    fetching, leaving the backlog in the stream for other workers.
+
+    The stream captures every event subject, including types nobody
+    consumes, so it is capped by age, size and count; past a limit the
+    oldest events are discarded.
+    """
+
+    def __init__(
+        self,
+        nats_connection: NatsConnection,
+        stream: Optional[str] = None,
+        subject_prefix: str = "events",
+        durable_prefix: str = "workers",
+        fetch_timeout: float = 5.0,
+        drain_timeout: float = 30.0,
+        codec: Optional[Codec] = None,
+    ):
+        self.nats = nats_connection
+        self.codec = codec or get_codec()
+        self.stream = stream or config.get("NATS_EVENTS_STREAM", "EVENTS")
+        self.subject_prefix = subject_prefix
+        self.durable_prefix = durable_prefix
+        self.fetch_timeout = fetch_timeout
+        self.drain_timeout = drain_timeout
+        self.concurrency = config.get("NATS_CONSUMER_CONCURRENCY", 4)
+        self.fetch_batch = config.get("NATS_CONSUMER_FETCH_BATCH", 10)
+        self.ack_wait = config.get("NATS_CONSUMER_ACK_WAIT", 60)
+        self.max_deliver = config.get("NATS_CONSUMER_MAX_DELIVER", 5)
+        self.backoff_base = config.get("NATS_CONSUMER_BACKOFF_BASE", 1.0)
+        self.backoff_max = config.get("NATS_CONSUMER_BACKOFF_MAX", 60.0)
+        self._js: Optional[JetStreamContext] = None
+        self.subscriptions: Dict[str, List[JetStreamContext.PullSubscription]] = {}
+        self._consumers: List[asyncio.Task] = []
+
+    def _get_subject(self, event_type: Type[Event]) -> str:
+        """Get the NATS subject for an event type."""
+        return f"{self.subject_prefix}.{event_type.event_name()}"
+
+    def _get_durable(self, event_type: Type[Event]) -> str:
+        """Get the durable consumer name shared by all workers of an event type."""
+        return f"{self.durable_prefix}-{event_type.event_name()}"
+
+    def _stream_config(self) -> StreamConfig:
+        return StreamConfig(
+            name=self.stream,
+            subjects=[f"{self.subject_prefix}.>"],
+            retention=RetentionPolicy.WORK_QUEUE,
+            storage=StorageType.FILE,
+            discard=DiscardPolicy.OLD,
+            max_age=config.get("NATS_EVENTS_MAX_AGE", 7 * 24 * 3600),
+            max_bytes=config.get("NATS_EVENTS_MAX_BYTES", 1024 ** 3),
+            max_msgs=config.get("NATS_EVENTS_MAX_MSGS", 1_000_000),
+        )
+
+    async def _jetstream(self) -> JetStreamContext:
+        """Get a JetStream context, creating the work-queue stream on first use.
+
+        An existing stream gets its limits updated to the configured ones.
+        """
+        if self._js is not None:
+            return self._js
+
+        js = await self.nats.jetstream()
+        stream_config = self._stream_config()
+        try:
+            info = await js.stream_info(self.stream)
+        except NotFoundError:
+            await js.add_stream(stream_config)
+            logger.info(f"Created JetStream stream {self.stream}")
+        else:
+            limits = ("discard", "max_age", "max_bytes", "max_msgs")
+            if any(getattr(info.config, name) != getattr(stream_config, name) for name in limits):
+                await js.update_stream(stream_config)
+                logger.info(f"Updated limits of JetStream stream {self.stream}")
+        self._js = js
+        return js
+
+    def backoff(self, num_delivered: int) -> float:
+        """Delay before redelivering a message that failed ``num_delivered`` times."""
+        return min(self.backoff_base * 2 ** (num_delivered - 1), self.backoff_max)
+
+    async def publish(self, event: Event) -> None:
+        """Publish an event to the stream and wait for it to be stored."""
+        js = await self._jetstream()
+        subject = self._get_subject(type(event))
+        ack = await js.publish(
+            subject, encode_event(event, self.codec), stream=self.stream, headers=self.codec.headers
+        )
+        logger.debug(f"Published event {type(event).__name__} to {subject} (seq {ack.seq})")
+
+    async def subscribe(
+        self,
+        event_type: Type[Event],
+        handler: Callable[[Event], None],
+        concurrency: Optional[int] = None,
+    ) -> None:
+        """Start consuming an event type through its durable pull consumer.
+
+        ``concurrency`` caps the handlers running at once for this event
+        type and defaults to ``nats_consumer_concurrency``.
+        """
+        js = await self._jetstream()
+        subject = self._get_subject(event_type)
+        psub = await js.pull_subscribe(
+            subject,
+            durable=self._get_durable(event_type),
+            stream=self.stream,
+            config=ConsumerConfig(
+                ack_policy=AckPolicy.EXPLICIT,
+                ack_wait=self.ack_wait,
+                max_deliver=self.max_deliver,
+            ),
+        )
+        self.subscriptions.setdefault(subject, []).append(psub)
+        self._consumers.append(asyncio.create_task(
+            self._consume(psub, event_type, handler, concurrency or self.concurrency)
+        ))
+
+        logger.info(f"Subscribed to event {event_type.__name__} on {subject} as {self._get_durable(event_type)}")
+
+    async def _consume(
+        self,
+        psub: JetStreamContext.PullSubscription,
+        event_type: Type[Event],
+        handler: Callable[[Event], None],
+        concurrency: int,
+    ) -> None:
+        name = event_type.event_name()
+        tasks: Set[asyncio.Task] = set()
+        try:
+            while True:
+                if len(tasks) >= concurrency:
+                    # Backpressure: fetch only once a handler slot is free
+                    await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                try:
+                    messages = await psub.fetch(
+                        min(self.fetch_batch, concurrency - len(tasks)), timeout=self.fetch_timeout
+                    )
+                except NatsTimeoutError:
+                    EVENTS_CONSUMER_PENDING.labels(name).set(0)
+                    continue
+                except Exception as e:
+                    logger.error(f"Error fetching {event_type.__name__} events: {e}")
+                    await asyncio.sleep(self.backoff_base)
+                    continue
+
+                EVENTS_CONSUMER_PENDING.labels(name).set(messages[-1].metadata.num_pending)
+                for msg in messages:
+                    task = asyncio.create_task(self._handle(msg, event_type, handler))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        finally:
+            if tasks:
+                # Let running handlers settle their messages; the rest are redelivered
+                _, pending = await asyncio.wait(tasks, timeout=self.drain_timeout)
+                for task in pending:
+                    task.cancel()
+
+    async def _handle(self, msg: Msg, event_type: Type[Event], handler: Callable[[Event], None]) -> None:
+        """Run the handler for one message and settle it with ack, nak or term.
+
+        Never raises: a message that could not be settled is logged and
+        redelivered once its ack deadline passes.
+        """
+        name = event_type.event_name()
+        EVENTS_IN_FLIGHT.labels(name).inc()
+        started = time.perf_counter()
+        try:
+            outcome = await self._settle(msg, event_type, handler)
+        except Exception as e:
+            outcome = "error"
+            logger.error(f"Failed to settle {event_type.__name__} event: {e}")
+        finally:
+            EVENTS_IN_FLIGHT.labels(name).dec()
+            EVENT_HANDLER_DURATION.labels(name).observe(time.perf_counter() - started)
+        EVENTS_HANDLED.labels(name, outcome).inc()
+
+    async def _settle(self, msg: Msg, event_type: Type[Event], handler: Callable[[Event], None]) -> str:
+        try:
+            event = decode_event(msg, event_type)
+        except Exception as e:
+            # Redelivery cannot fix a malformed message
+            logger.error(f"Dropping undecodable {event_type.__name__} event: {e}")
+            await msg.term()
+            return "term"
+
+        heartbeat = asyncio.create_task(self._keep_alive(msg))
+        try:
+            await handler(event)
+        except Exception as e:
+            num_delivered = msg.metadata.num_delivered
+            if num_delivered >= self.max_deliver:
+                logger.error(
+                    f"Giving up on {event_type.__name__} event after {num_delivered} attempts: {e}"
+                )
+                await msg.term()
+                return "term"
+            delay = self.backoff(num_delivered)
+            logger.warning(
+                f"Error handling event {event_type.__name__} (attempt {num_delivered}), "
+                f"retrying in {delay}s: {e}"
+            )
+            await msg.nak(delay=delay)
+            return "nak"
+        else:
+            await msg.ack()
+            return "ack"
+        finally:
+            heartbeat.cancel()
+
+    async def _keep_alive(self, msg: Msg) -> None:
+        """Extend the ack deadline while a long handler is still running."""
+        while True:
+            await asyncio.sleep(self.ack_wait / 2)
+            await msg.in_progress()
+
+    async def unsubscribe_all(self) -> None:
+        """Stop all consumers; their durable state stays on the server."""
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        for subject, psubs in self.subscriptions.items():
+            for psub in psubs:
+                await psub.unsubscribe()
+            logger.info(f"Unsubscribed from {subject}")
+        self.subscriptions = {}
+
+
+def create_event_bus(nats_connection: Optional[NatsConnection] = None) -> EventBus:
+    """Event bus configured by ``event_bus`` and ``nats_jetstream_enabled``.
+
+    NATS buses use the shared connection unless one is passed in.
+    """
+    if config.get("EVENT_BUS", "nats") == "in_process":
+        return InProcessEventBus()
+    nats_connection = nats_connection or get_nats_connection()
+    if config.get("NATS_JETSTREAM_ENABLED", True):
+        return JetStreamEventBus(nats_connection)
+    return NatsEventBus(nats_connection)
+
+
 # Example event classes
+@dataclass(slots=True)
 class AudioProcessedEvent(Event):
     """Event emitted when audio processing is complete."""
-    
-    def __init__(self, audio_id: str, user_id: int, success: bool, error_message: Optional[str] = None):
-        self.audio_id = audio_id
-        self.user_id = user_id
-        self.success = success
-        self.error_message = error_message
+    audio_id: str
+    user_id: int
+    success: bool
+    error_message: Optional[str] = None
+
+
+@dataclass(slots=True)
+class TranscriptionProgressEvent(Event):
+    """Event emitted as transcription advances."""
+    coalesce: ClassVar[bool] = True
+
+    transcription_id: str
+    user_id: int
+    progress: float  # percent
 
+    def job_key(self) -> Optional[str]:
+        return f"transcription:{self.transcription_id}"
 
+
+@dataclass(slots=True)
 class TranscriptionCompletedEvent(Event):
     """Event emitted when transcription is complete."""
-    
-    def __init__(self, transcription_id: str, audio_id: str, user_id: int, success: bool, error_message: Optional[str] = None):
-        self.transcription_id = transcription_id
-        self.audio_id = audio_id
-        self.user_id = user_id
-        self.success = success
-        self.error_message = error_message
+    transcription_id: str
+    audio_id: str
+    user_id: int
+    success: bool
+    error_message: Optional[str] = None
+
+    def job_key(self) -> Optional[str]:
+        return f"transcription:{self.transcription_id}"
+
+
+@dataclass(slots=True)
+class DiarizationProgressEvent(Event):
+    """Event emitted as diarization advances."""
+    coalesce: ClassVar[bool] = True
 
+    diarization_id: str
+    user_id: int
+    progress: float  # percent
 
+    def job_key(self) -> Optional[str]:
+        return f"diarization:{self.diarization_id}"
+
+
+@dataclass(slots=True)
 class DiarizationCompletedEvent(Event):
     """Event emitted when diarization is complete."""
-    
-    def __init__(self, diarization_id: str, audio_id: str, user_id: int, success: bool, error_message: Optional[str] = None):
-        self.diarization_id = diarization_id
-        self.audio_id = audio_id
-        self.user_id = user_id
-        self.success = success
-        self.error_message = error_message
+    diarization_id: str
+    audio_id: str
+    user_id: int
+    success: bool
+    error_message: Optional[str] = None
 
+    def job_key(self) -> Optional[str]:
+        return f"diarization:{self.diarization_id}"
 
+
+@dataclass(slots=True)
 class ExportCompletedEvent(Event):
     """Event emitted when export is complete."""
-    
-    def __init__(self, export_id: str, user_id: int, success: bool, file_url: Optional[str] = None, error_message: Optional[str] = None):
-        self.export_id = export_id
-        self.user_id = user_id
-        self.success = success
-        self.file_url = file_url
-        self.error_message = error_message
\ No newline at end of file
+    export_id: str
+    user_id: int
+    success: bool
+    file_url: Optional[str] = None
+    error_message: Optional[str] = None
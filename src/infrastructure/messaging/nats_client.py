@@ -1,55 +1,166 @@
-import json
+import asyncio
 import logging
 from typing import Any, Callable, Dict, Optional, List
 
 import nats
 from nats.aio.client import Client as NatsClient
 from nats.aio.msg import Msg
+from nats.js import JetStreamContext
+from nats.js.api import KeyValueConfig, ObjectStoreConfig
+from nats.js.errors import NotFoundError
+from nats.js.kv import KeyValue
+from nats.js.object_store import ObjectStore
+
+from src.config.settings import config
+from src.infrastructure.monitoring.metrics import NATS_CONNECTED, NATS_ERRORS, NATS_RECONNECTS
+from .codecs import Codec, codec_for_headers, get_codec
 
 logger = logging.getLogger(__name__)
 
 
 class NatsConnection:
-    """NATS connection manager."""
+    """NATS connection manager.
+
+    Owns one client with automatic reconnects, a JetStream context and
+    cached object store and key-value handles. Use ``get_nats_connection``
+    to share a single connection per server across the process.
+    """
 
-    def __init__(self, nats_url: str):
+    def __init__(self, nats_url: str, codec: Optional[Codec] = None):
         self.nats_url = nats_url
+        self.codec = codec or get_codec()
         self.client: Optional[NatsClient] = None
         self.subscriptions: List[int] = []
+        self._js: Optional[JetStreamContext] = None
+        self._object_stores: Dict[str, ObjectStore] = {}
+        self._key_values: Dict[str, KeyValue] = {}
+        self._lock = asyncio.Lock()
+        self._handles_lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self.client is not None and self.client.is_connected
 
     async def connect(self) -> None:
-        """Connect to NATS server."""
-        if self.client and self.client.is_connected:
-            return
+        """Connect to NATS server.
+
+        Once connected the client reconnects on its own; while it does,
+        publishes are buffered by the client instead of opening a new
+        connection.
+        """
+        async with self._lock:
+            if self.client is not None and not self.client.is_closed:
+                return
+
+            self.client = await nats.connect(
+                self.nats_url,
+                name=config.get("PROJECT_NAME", None),
+                max_reconnect_attempts=config.get("NATS_MAX_RECONNECT_ATTEMPTS", -1),
+                reconnect_time_wait=config.get("NATS_RECONNECT_TIME_WAIT", 2),
+                disconnected_cb=self._on_disconnected,
+                reconnected_cb=self._on_reconnected,
+                error_cb=self._on_error,
+                closed_cb=self._on_closed,
+            )
+            self._js = None
+            self._object_stores = {}
+            self._key_values = {}
+            NATS_CONNECTED.set(1)
+            logger.info(f"Connected to NATS server at {self.nats_url}")
+
+    async def _ensure_connected(self) -> NatsClient:
+        if self.client is None or self.client.is_closed:
+            await self.connect()
+        return self.client
+
+    async def _on_disconnected(self) -> None:
+        NATS_CONNECTED.set(0)
+        logger.warning(f"Disconnected from NATS server at {self.nats_url}, reconnecting")
+
+    async def _on_reconnected(self) -> None:
+        NATS_CONNECTED.set(1)
+        NATS_RECONNECTS.inc()
+        logger.info(f"Reconnected to NATS server at {self.nats_url}")
 
-        self.client = await nats.connect(self.nats_url)
-        logger.info(f"Connected to NATS server at {self.nats_url}")
+    async def _on_error(self, e: Exception) -> None:
+        NATS_ERRORS.labels(type(e).__name__).inc()
+        logger.error(f"NATS connection error: {e}")
+
+    async def _on_closed(self) -> None:
+        NATS_CONNECTED.set(0)
+        logger.info("NATS connection closed")
 
     async def disconnect(self) -> None:
         """Disconnect from NATS server."""
-        if self.client and self.client.is_connected:
-            for sid in self.subscriptions:
-                await self.client.unsubscribe(sid)
+        if self.client and not self.client.is_closed:
+            if self.client.is_connected:
+                for sid in self.subscriptions:
+                    await self.client.unsubscribe(sid)
             await self.client.close()
             self.client = None
             self.subscriptions = []
+            self._js = None
+            self._object_stores = {}
+            self._key_values = {}
             logger.info("Disconnected from NATS server")
 
+    async def jetstream(self) -> JetStreamContext:
+        """Get the JetStream context of the connection."""
+        client = await self._ensure_connected()
+        if self._js is None:
+            self._js = client.jetstream()
+        return self._js
+
+    async def object_store(self, bucket: str, create_config: Optional[ObjectStoreConfig] = None) -> ObjectStore:
+        """Get an object store handle, creating the bucket from ``create_config`` if missing."""
+        async with self._handles_lock:
+            if bucket in self._object_stores:
+                return self._object_stores[bucket]
+            js = await self.jetstream()
+            try:
+                store = await js.object_store(bucket)
+            except NotFoundError:
+                if create_config is None:
+                    raise
+                store = await js.create_object_store(bucket, create_config)
+                logger.info(f"Created object store: {bucket}")
+            self._object_stores[bucket] = store
+            return store
+
+    async def key_value(self, bucket: str, create_config: Optional[KeyValueConfig] = None) -> KeyValue:
+        """Get a key-value bucket handle, creating the bucket from ``create_config`` if missing."""
+        async with self._handles_lock:
+            if bucket in self._key_values:
+                return self._key_values[bucket]
+            js = await self.jetstream()
+            try:
+                kv = await js.key_value(bucket)
+            except NotFoundError:
+                if create_config is None:
+                    raise
+                kv = await js.create_key_value(create_config)
+                logger.info(f"Created key-value bucket: {bucket}")
+            self._key_values[bucket] = kv
+            return kv
+
     async def publish(self, subject: str, payload: Dict[str, Any]) -> None:
         """Publish a message to a subject."""
-        if not self.client or not self.client.is_connected:
-            await self.connect()
+        client = await self._ensure_connected()
 
-        message = json.dumps(payload).encode()
-        await self.client.publish(subject, message)
+        await client.publish(subject, self.codec.encode(payload), headers=self.codec.headers)
         logger.debug(f"Published message to {subject}: {payload}")
 
-    async def subscribe(self, subject: str, callback: Callable[[Msg], None]) -> int:
-        """Subscribe to a subject."""
-        if not self.client or not self.client.is_connected:
-            await self.connect()
+    async def publish_raw(self, subject: str, data: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        """Publish already encoded bytes to a subject."""
+        client = await self._ensure_connected()
 
-        sid = await self.client.subscribe(subject, cb=callback)
+        await client.publish(subject, data, headers=headers)
+
+    async def subscribe(self, subject: str, callback: Callable[[Msg], None], queue: str = "") -> int:
+        """Subscribe to a subject; subscribers sharing a ``queue`` group split its messages."""
+        client = await self._ensure_connected()
+
+        sid = await client.subscribe(subject, queue=queue, cb=callback)
         self.subscriptions.append(sid)
         logger.info(f"Subscribed to {subject} with sid {sid}")
         return sid
@@ -66,9 +177,35 @@ class NatsConnection:
 
     async def request(self, subject: str, payload: Dict[str, Any], timeout: float = 10.0) -> Dict[str, Any]:
         """Send a request and wait for a response."""
-        if not self.client or not self.client.is_connected:
-            await self.connect()
+        client = await self._ensure_connected()
+
+        response = await client.request(
+            subject, self.codec.encode(payload), timeout=timeout, headers=self.codec.headers
+        )
+        return codec_for_headers(response.headers).decode(response.data)
+
+    async def request_raw(
+        self, subject: str, data: bytes, timeout: float = 10.0, headers: Optional[Dict[str, str]] = None
+    ) -> Msg:
+        """Send already encoded bytes as a request and return the raw response."""
+        client = await self._ensure_connected()
+
+        return await client.request(subject, data, timeout=timeout, headers=headers)
+
+
+_connections: Dict[str, NatsConnection] = {}
+
+
+def get_nats_connection(nats_url: Optional[str] = None) -> NatsConnection:
+    """Process-wide connection to a NATS server, ``nats_url`` by default."""
+    nats_url = nats_url or config.NATS_URL
+    if nats_url not in _connections:
+        _connections[nats_url] = NatsConnection(nats_url)
+    return _connections[nats_url]
+
 
-        message = json.dumps(payload).encode()
-        response = await self.client.request(subject, message, timeout=timeout)
-        return json.loads(response.data.decode())
\ No newline at end of file
+async def close_nats_connections() -> None:
+    """Close every connection handed out by ``get_nats_connection``."""
+    for connection in list(_connections.values()):
+        await connection.disconnect()
+    _connections.clear()
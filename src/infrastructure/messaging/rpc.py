@@ -0,0 +1,189 @@
+"""Request/reply RPC over NATS.
+
+Workers register handlers with ``RpcServer``; every worker of a method
+joins the same queue group, so each request is served by one of them.
+``RpcClient.call`` sends the absolute deadline of the call in a header.
+Workers skip requests whose deadline has passed and stop handlers that
+run past it. When an attempt times out, the call is retried and may be
+served by another worker, so RPC handlers must be idempotent. Nested
+calls made by a handler inherit its deadline.
+"""
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from nats.aio.msg import Msg
+from nats.errors import NoRespondersError
+from nats.errors import TimeoutError as NatsTimeoutError
+
+from src.config.settings import config
+from src.infrastructure.monitoring.metrics import RPC_CLIENT_DURATION, RPC_RETRIES, RPC_SERVER_DURATION
+from .codecs import codec_for_headers
+from .nats_client import NatsConnection
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = "Rpc-Deadline"
+
+RpcHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+_deadline: ContextVar[Optional[float]] = ContextVar("rpc_deadline", default=None)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left until the deadline of the request being served, if any."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.time()
+
+
+class RpcError(Exception):
+    """Raised when a remote handler fails."""
+    def __init__(self, message: str, method: Optional[str] = None, error_type: Optional[str] = None):
+        self.method = method
+        self.error_type = error_type
+        super().__init__(message)
+
+
+class RpcTimeoutError(RpcError):
+    """Raised when no worker answered before the deadline."""
+    pass
+
+
+class RpcServer:
+    """Serves RPC methods as a member of a queue group."""
+
+    def __init__(
+        self,
+        nats_connection: NatsConnection,
+        subject_prefix: str = "rpc",
+        queue_group: str = "rpc-workers",
+        concurrency: Optional[int] = None,
+    ):
+        self.nats = nats_connection
+        self.subject_prefix = subject_prefix
+        self.queue_group = queue_group
+        self.concurrency = concurrency or config.get("RPC_CONCURRENCY", 8)
+        self.subscriptions: List[int] = []
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def register(self, method: str, handler: RpcHandler, concurrency: Optional[int] = None) -> None:
+        """Serve ``method`` with ``handler``, running up to ``concurrency`` requests at once."""
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def on_request(msg: Msg) -> None:
+            # Waiting here leaves further requests queued in the client
+            await semaphore.acquire()
+            task = asyncio.create_task(self._serve(msg, method, handler))
+            task.add_done_callback(lambda _: semaphore.release())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        subject = f"{self.subject_prefix}.{method}"
+        sid = await self.nats.subscribe(subject, on_request, queue=self.queue_group)
+        self.subscriptions.append(sid)
+        logger.info(f"Serving RPC {method} on {subject} in queue group {self.queue_group}")
+
+    async def _serve(self, msg: Msg, method: str, handler: RpcHandler) -> None:
+        started = time.perf_counter()
+        headers = msg.headers or {}
+        deadline = float(headers[DEADLINE_HEADER]) if DEADLINE_HEADER in headers else None
+        outcome = "expired"
+        token = _deadline.set(deadline)
+        try:
+            if deadline is not None and deadline <= time.time():
+                # The caller has already given up
+                return
+            payload = codec_for_headers(headers).decode(msg.data)
+            if deadline is None:
+                result = await handler(payload)
+            else:
+                result = await asyncio.wait_for(handler(payload), timeout=deadline - time.time())
+            response = {"result": result}
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            logger.warning(f"RPC {method} ran past its deadline")
+            return
+        except Exception as e:
+            logger.error(f"Error serving RPC {method}: {e}")
+            response = {"error": {"type": type(e).__name__, "message": str(e)}}
+            outcome = "error"
+        finally:
+            _deadline.reset(token)
+            RPC_SERVER_DURATION.labels(method, outcome).observe(time.perf_counter() - started)
+
+        if msg.reply:
+            codec = self.nats.codec
+            await self.nats.publish_raw(msg.reply, codec.encode(response), codec.headers)
+
+    async def stop(self) -> None:
+        """Stop accepting requests and wait for the ones being served."""
+        for sid in self.subscriptions:
+            await self.nats.unsubscribe(sid)
+        self.subscriptions = []
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class RpcClient:
+    """Calls RPC methods with a deadline and retries on timeouts."""
+
+    def __init__(
+        self,
+        nats_connection: NatsConnection,
+        subject_prefix: str = "rpc",
+        timeout: Optional[float] = None,
+        attempt_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+    ):
+        self.nats = nats_connection
+        self.subject_prefix = subject_prefix
+        self.timeout = timeout or config.get("RPC_TIMEOUT", 10)
+        self.attempt_timeout = attempt_timeout or config.get("RPC_ATTEMPT_TIMEOUT", 3)
+        self.retries = config.get("RPC_RETRIES", 2) if retries is None else retries
+
+    async def call(self, method: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Call ``method`` and return its result.
+
+        ``timeout`` bounds the whole call including retries; inside an RPC
+        handler the inherited deadline applies if it is earlier.
+        """
+        started = time.perf_counter()
+        deadline = time.time() + (timeout or self.timeout)
+        inherited = _deadline.get()
+        if inherited is not None:
+            deadline = min(deadline, inherited)
+
+        codec = self.nats.codec
+        subject = f"{self.subject_prefix}.{method}"
+        data = codec.encode(payload)
+        headers = {**codec.headers, DEADLINE_HEADER: f"{deadline:.6f}"}
+        attempt = 0
+        while True:
+            remaining = deadline - time.time()
+            try:
+                if remaining <= 0:
+                    raise NatsTimeoutError
+                msg = await self.nats.request_raw(
+                    subject, data, timeout=min(self.attempt_timeout, remaining), headers=headers
+                )
+                break
+            except (NatsTimeoutError, NoRespondersError) as e:
+                attempt += 1
+                if attempt > self.retries or deadline <= time.time():
+                    RPC_CLIENT_DURATION.labels(method, "timeout").observe(time.perf_counter() - started)
+                    raise RpcTimeoutError(f"RPC {method} timed out after {attempt} attempts", method) from e
+                RPC_RETRIES.labels(method).inc()
+                logger.warning(f"RPC {method} attempt {attempt} failed ({type(e).__name__}), retrying")
+                if isinstance(e, NoRespondersError):
+                    await asyncio.sleep(min(0.1, max(deadline - time.time(), 0)))
+
+        response = codec_for_headers(msg.headers).decode(msg.data)
+        error = response.get("error")
+        if error is not None:
+            RPC_CLIENT_DURATION.labels(method, "error").observe(time.perf_counter() - started)
+            raise RpcError(error.get("message", ""), method, error.get("type"))
+
+        RPC_CLIENT_DURATION.labels(method, "ok").observe(time.perf_counter() - started)
+        return response.get("result")
@@ -0,0 +1,129 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Database connection pool
+DB_POOL_SIZE = Gauge(
+    'db_pool_size',
+    'Configured number of persistent connections in the pool',
+    ['pool']
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out',
+    'Connections currently checked out of the pool',
+    ['pool']
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow',
+    'Connections open beyond the pool size',
+    ['pool']
+)
+
+DB_POOL_CONNECTIONS_CREATED = Counter(
+    'db_pool_connections_created_total',
+    'New database connections opened by the pool',
+    ['pool']
+)
+
+DB_POOL_CONNECTIONS_INVALIDATED = Counter(
+    'db_pool_connections_invalidated_total',
+    'Pooled connections discarded as broken, e.g. by a failed pre-ping',
+    ['pool']
+)
+
+DB_ROUTED_STATEMENTS = Counter(
+    'db_routed_statements_total',
+    'Statements routed by target database (primary, replica)',
+    ['target']
+)
+
+DB_UNIT_OF_WORK_DURATION = Histogram(
+    'db_unit_of_work_duration_seconds',
+    'Time a unit of work holds its transaction open',
+    ['outcome'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+# Redis data cache
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Cache lookups by entity kind and result (hit, miss)',
+    ['kind', 'result']
+)
+
+# Write-behind user upserts
+USER_UPSERT_BATCH_SIZE = Histogram(
+    'user_upsert_batch_size',
+    'Users written per write-behind flush',
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+
+# Event consumers
+EVENTS_IN_FLIGHT = Gauge(
+    'events_in_flight',
+    'Events currently being handled',
+    ['event_type']
+)
+
+EVENTS_CONSUMER_PENDING = Gauge(
+    'events_consumer_pending',
+    'Events waiting in the stream for a consumer (lag)',
+    ['event_type']
+)
+
+EVENTS_HANDLED = Counter(
+    'events_handled_total',
+    'Events settled by outcome (ack, nak, term, error)',
+    ['event_type', 'outcome']
+)
+
+EVENT_HANDLER_DURATION = Histogram(
+    'event_handler_duration_seconds',
+    'Time spent in event handlers',
+    ['event_type'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)
+)
+
+EVENTS_COALESCED = Counter(
+    'events_coalesced_total',
+    'Progress events replaced by a newer one before being published',
+    ['event_type']
+)
+
+# NATS connection
+NATS_CONNECTED = Gauge(
+    'nats_connected',
+    'Whether the NATS connection is up (1) or down (0)'
+)
+
+NATS_RECONNECTS = Counter(
+    'nats_reconnects_total',
+    'Successful NATS reconnects'
+)
+
+NATS_ERRORS = Counter(
+    'nats_errors_total',
+    'Asynchronous NATS connection errors by exception type',
+    ['error']
+)
+
+# RPC
+RPC_CLIENT_DURATION = Histogram(
+    'rpc_client_duration_seconds',
+    'RPC call latency seen by callers, including retries',
+    ['method', 'outcome'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+RPC_SERVER_DURATION = Histogram(
+    'rpc_server_duration_seconds',
+    'Time RPC workers spend serving a request',
+    ['method', 'outcome'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+RPC_RETRIES = Counter(
+    'rpc_retries_total',
+    'RPC attempts retried after a timeout or missing responders',
+    ['method']
+)
@@ -1,20 +1,58 @@
+import base64
 import logging
 import os
 import io
+import tempfile
 from abc import ABC, abstractmethod
+from hashlib import sha256
 from pathlib import Path
-from typing import BinaryIO, Optional, Union, Dict, Any
+from typing import AsyncIterator, BinaryIO, Iterable, Iterator, Optional, Union, Dict, Any
 from uuid import uuid4
 
 import aiofiles
-import nats
 from nats.js.api import ObjectStoreConfig
-from nats.js.object_store import ObjectStore
+from nats.js.errors import (
+    BadObjectMetaError,
+    DigestMismatchError,
+    LinkIsABucketError,
+    ObjectDeletedError,
+    ObjectNotFoundError,
+)
+from nats.js.object_store import OBJ_CHUNKS_PRE_TEMPLATE, ObjectStore
 
 from src.config import settings
+from src.infrastructure.messaging.nats_client import NatsConnection, get_nats_connection
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 64 * 1024
+# Objects returned by get_object stay in memory up to this size and spill to disk beyond it
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+# Seconds to wait for the next chunk of a NATS object before giving up on it
+CHUNK_TIMEOUT = 30.0
+
+
+class IterableStream(io.RawIOBase):
+    """Read-only file-like view over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
 
 class ObjectStorage(ABC):
     """Interface for object storage."""
@@ -29,6 +67,10 @@ class ObjectStorage(ABC):
         """Upload a file-like object to the storage and return its URL."""
         pass
 
+    async def upload_stream(self, chunks: Iterable[bytes], object_name: str) -> str:
+        """Upload an iterator of byte chunks without materializing the whole object."""
+        return await self.upload_fileobj(io.BufferedReader(IterableStream(chunks), CHUNK_SIZE), object_name)
+
     @abstractmethod
     async def download_file(self, object_name: str, file_path: Union[str, Path]) -> None:
         """Download a file from the storage."""
@@ -39,6 +81,11 @@ class ObjectStorage(ABC):
         """Get a file-like object from the storage."""
         pass
 
+    @abstractmethod
+    def iter_object(self, object_name: str) -> AsyncIterator[bytes]:
+        """Iterate over the content of an object in chunks."""
+        pass
+
     @abstractmethod
     async def delete_object(self, object_name: str) -> None:
         """Delete an object from the storage."""
@@ -69,9 +116,9 @@ class LocalObjectStorage(ObjectStorage):
         os.makedirs(dest_path.parent, exist_ok=True)
 
         async with aiofiles.open(file_path, "rb") as src_file:
-            content = await src_file.read()
             async with aiofiles.open(dest_path, "wb") as dest_file:
-                await dest_file.write(content)
+                while chunk := await src_file.read(CHUNK_SIZE):
+                    await dest_file.write(chunk)
 
         logger.debug(f"Uploaded file {file_path} to {dest_path}")
         return self.get_url(object_name)
@@ -81,9 +128,9 @@ class LocalObjectStorage(ObjectStorage):
         dest_path = self.base_dir / object_name
         os.makedirs(dest_path.parent, exist_ok=True)
 
-        content = file_obj.read()
         async with aiofiles.open(dest_path, "wb") as dest_file:
-            await dest_file.write(content)
+            while chunk := file_obj.read(CHUNK_SIZE):
+                await dest_file.write(chunk)
 
         logger.debug(f"Uploaded file object to {dest_path}")
         return self.get_url(object_name)
@@ -94,10 +141,9 @@ class LocalObjectStorage(ObjectStorage):
         file_path = Path(file_path)
         os.makedirs(file_path.parent, exist_ok=True)
 
-        async with aiofiles.open(src_path, "rb") as src_file:
-            content = await src_file.read()
-            async with aiofiles.open(file_path, "wb") as dest_file:
-                await dest_file.write(content)
+        async with aiofiles.open(file_path, "wb") as dest_file:
+            async for chunk in self.iter_object(object_name):
+                await dest_file.write(chunk)
 
         logger.debug(f"Downloaded file {src_path} to {file_path}")
 
@@ -106,6 +152,12 @@ class LocalObjectStorage(ObjectStorage):
         src_path = self.base_dir / object_name
         return open(src_path, "rb")
 
+    async def iter_object(self, object_name: str) -> AsyncIterator[bytes]:
+        """Iterate over a file of the local storage in chunks."""
+        async with aiofiles.open(self.base_dir / object_name, "rb") as src_file:
+            while chunk := await src_file.read(CHUNK_SIZE):
+                yield chunk
+
     async def delete_object(self, object_name: str) -> None:
         """Delete an object from the local storage."""
         file_path = self.base_dir / object_name
@@ -119,38 +171,33 @@ class LocalObjectStorage(ObjectStorage):
 
 
 class NatsObjectStorage(ObjectStorage):
-    """NATS JetStream implementation of object storage."""
+    """NATS JetStream implementation of object storage.
 
-    def __init__(self, bucket_name: str = "transcription", nats_url: Optional[str] = None):
+    Uses the process-wide NATS connection unless one is passed in.
+    """
+
+    def __init__(
+        self,
+        bucket_name: str = "transcription",
+        nats_url: Optional[str] = None,
+        connection: Optional[NatsConnection] = None,
+    ):
         self.bucket_name = bucket_name
-        self.nats_url = nats_url or settings.NATS_URL
-        self._nc = None
-        self._js = None
-        self._object_store = None
+        self.nats = connection or get_nats_connection(nats_url)
+        self._object_store: Optional[ObjectStore] = None
         logger.info(f"NatsObjectStorage initialized with bucket: {bucket_name}")
 
     async def _ensure_connected(self) -> None:
-        """Ensure connection to NATS and initialize object store."""
-        if self._nc is None or not self._nc.is_connected:
-            self._nc = await nats.connect(self.nats_url)
-            self._js = self._nc.jetstream()
-            await self._get_or_create_object_store()
-
-    async def _get_or_create_object_store(self) -> None:
-        """Get or create the object store."""
-        try:
-            # Try to get existing object store
-            self._object_store = await self._js.object_store(self.bucket_name)
-        except Exception as e:
-            logger.debug(f"Object store {self.bucket_name} not found, creating: {e}")
-            # Create new object store if it doesn't exist
-            config = ObjectStoreConfig(
-                name=self.bucket_name,
-                storage="file",
-                max_bytes=getattr(settings, "OBJECT_STORE_MAX_BYTES", 1024 * 1024 * 1024)  # Default 1GB
+        """Get the object store from the shared connection, creating it if missing."""
+        if self._object_store is None:
+            self._object_store = await self.nats.object_store(
+                self.bucket_name,
+                ObjectStoreConfig(
+                    bucket=self.bucket_name,
+                    storage="file",
+                    max_bytes=getattr(settings, "OBJECT_STORE_MAX_BYTES", 1024 * 1024 * 1024)  # Default 1GB
+                ),
             )
-            self._object_store = await self._js.create_object_store(config)
-            logger.info(f"Created object store: {self.bucket_name}")
 
     async def upload_file(self, file_path: Union[str, Path], object_name: Optional[str] = None) -> str:
         """Upload a file to NATS object store and return its URL."""
@@ -161,9 +208,9 @@ class NatsObjectStorage(ObjectStorage):
             object_name = f"{uuid4()}{file_path.suffix}"
 
         try:
-            async with aiofiles.open(file_path, "rb") as file:
-                content = await file.read()
-                await self._object_store.put(object_name, content)
+            # The object store reads the file chunk by chunk
+            with open(file_path, "rb") as file:
+                await self._object_store.put(object_name, file)
 
             logger.debug(f"Uploaded file {file_path} to NATS object store {self.bucket_name}/{object_name}")
             return self.get_url(object_name)
@@ -176,8 +223,8 @@ class NatsObjectStorage(ObjectStorage):
         await self._ensure_connected()
 
         try:
-            content = file_obj.read()
-            await self._object_store.put(object_name, content)
+            # The object store reads the stream chunk by chunk
+            await self._object_store.put(object_name, file_obj)
 
             logger.debug(f"Uploaded file object to NATS object store {self.bucket_name}/{object_name}")
             return self.get_url(object_name)
@@ -193,10 +240,9 @@ class NatsObjectStorage(ObjectStorage):
         os.makedirs(file_path.parent, exist_ok=True)
 
         try:
-            obj_info = await self._object_store.get(object_name)
-
             async with aiofiles.open(file_path, "wb") as file:
-                await file.write(obj_info.data)
+                async for chunk in self.iter_object(object_name):
+                    await file.write(chunk)
 
             logger.debug(f"Downloaded file from NATS object store {self.bucket_name}/{object_name} to {file_path}")
         except Exception as e:
@@ -204,15 +250,66 @@ class NatsObjectStorage(ObjectStorage):
             raise
 
     async def get_object(self, object_name: str) -> BinaryIO:
-        """Get a file-like object from NATS object store."""
-        await self._ensure_connected()
+        """Get a file-like object from NATS object store.
 
+        Small objects are kept in memory, large ones are spooled to disk.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
         try:
-            obj_info = await self._object_store.get(object_name)
-            return io.BytesIO(obj_info.data)
+            async for chunk in self.iter_object(object_name):
+                spool.write(chunk)
         except Exception as e:
+            spool.close()
             logger.error(f"Error getting object from NATS object store: {e}")
             raise
+        spool.seek(0)
+        return spool
+
+    async def iter_object(self, object_name: str) -> AsyncIterator[bytes]:
+        """Iterate over an object in the chunks it was stored in.
+
+        Chunks are read from the object's stream as they are consumed and
+        the digest is checked at the end, so memory stays at a few chunks
+        whatever the object size. ``ObjectStore.get`` would buffer the whole
+        object, and loses ``writeinto`` when following a link, so links are
+        resolved here as well. A chunk that does not arrive within
+        ``CHUNK_TIMEOUT`` seconds, e.g. because the object was purged while
+        being read, raises ``nats.errors.TimeoutError``.
+        """
+        await self._ensure_connected()
+
+        bucket = self.bucket_name
+        info = await self._object_store.get_info(object_name)
+        if not info.nuid:
+            raise BadObjectMetaError
+        if info.is_link():
+            link = info.options.link
+            if not link.name:
+                raise LinkIsABucketError
+            bucket = link.bucket
+            linked_store = await self.nats.object_store(bucket)
+            info = await linked_store.get_info(link.name)
+        if not info.size:
+            return
+
+        js = await self.nats.jetstream()
+        subscription = await js.subscribe(
+            OBJ_CHUNKS_PRE_TEMPLATE.format(bucket=bucket, obj=info.nuid),
+            ordered_consumer=True,
+        )
+        digest = sha256()
+        try:
+            while True:
+                msg = await subscription.next_msg(timeout=CHUNK_TIMEOUT)
+                digest.update(msg.data)
+                yield msg.data
+                if msg.metadata.num_pending == 0:
+                    break
+        finally:
+            await subscription.unsubscribe()
+
+        if digest.digest() != base64.urlsafe_b64decode(info.digest.split("=", 1)[1]):
+            raise DigestMismatchError
 
     async def delete_object(self, object_name: str) -> None:
         """Delete an object from NATS object store."""
@@ -221,6 +318,9 @@ class NatsObjectStorage(ObjectStorage):
         try:
             await self._object_store.delete(object_name)
             logger.debug(f"Deleted object from NATS object store {self.bucket_name}/{object_name}")
+        except (ObjectNotFoundError, ObjectDeletedError):
+            # Already gone; deletes are idempotent as in the local storage
+            logger.debug(f"Object {self.bucket_name}/{object_name} already deleted")
         except Exception as e:
             logger.error(f"Error deleting object from NATS object store: {e}")
             raise
@@ -231,3 +331,13 @@ class NatsObjectStorage(ObjectStorage):
         # For simplicity, we'll just return a path that can be used with an API endpoint
         api_base_url = getattr(settings, "API_BASE_URL", "http://localhost:8000")
         return f"{api_base_url}/api/v1/files/{self.bucket_name}/{object_name}"
+
+
+def create_object_storage() -> ObjectStorage:
+    """Create the object storage selected by the ``storage_type`` setting."""
+    storage_type = getattr(settings, "STORAGE_TYPE", "nats")
+    if storage_type == "nats":
+        return NatsObjectStorage()
+    if storage_type == "local":
+        return LocalObjectStorage(settings.STORAGE_PATH)
+    raise ValueError(f"Unsupported storage type: {storage_type}")
@@ -9,9 +9,15 @@ from aiogram.fsm.storage.redis import RedisStorage
 from aiogram_dialog import setup_dialogs
 
 from src.application.bot.middlewares import register_middlewares
+from src.application.services.retention import RetentionService
+from src.application.services.users import UserUpsertBuffer
 from src.config.settings import config
 from src.application.bot.handlers import register_handlers
 from src.application.bot.dialogs import register_dialogs
+from src.domains.user.entities import User
+from src.infrastructure.database.repositories import SQLAlchemyUserRepository
+from src.infrastructure.database.session import Database
+from src.infrastructure.storage.object_storage import create_object_storage
 
 # Настройка логирования
 structlog.configure(
@@ -54,7 +60,22 @@ async def main():
     # Регистрация обработчиков
     register_handlers(dp)
 
-    register_middlewares(dp)
+    # Профили пользователей пишутся в БД пачками, а не на каждый апдейт
+    database = Database()
+
+    async def upsert_users(users: list[User]) -> None:
+        async with database.unit_of_work() as session:
+            await SQLAlchemyUserRepository(session).upsert_many(users)
+
+    user_buffer = UserUpsertBuffer(upsert_users)
+    user_buffer.start()
+
+    register_middlewares(dp, user_buffer)
+
+    # Удаление просроченных файлов и обслуживание партиций сегментов
+    retention = RetentionService(database, create_object_storage())
+    if config.get("RETENTION_ENABLED", True):
+        retention.start()
 
     # Регистрация диалогов
     register_dialogs(dp)
@@ -67,6 +88,9 @@ async def main():
     try:
         await dp.start_polling(bot)
     finally:
+        await retention.stop()
+        await user_buffer.stop()
+        await database.dispose()
         await bot.session.close()
 
 
@@ -0,0 +1,163 @@
+"""
+Tests for the Redis read-through repository cache.
+"""
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.domains.transcription.entities import (
+    Transcription,
+    TranscriptionModel,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from src.domains.user.entities import UserSettings
+from src.infrastructure.cache.repositories import (
+    CachedTranscriptionRepository,
+    CachedUserSettingsRepository,
+    RedisCache,
+    dump_transcription,
+    load_transcription,
+)
+from src.infrastructure.database.session import USE_PRIMARY, Database, create_engine
+
+
+@pytest.fixture
+def redis_client():
+    """Create a mock async Redis client backed by a dict."""
+    store = {}
+
+    def incr(key):
+        store[key] = str(int(store.get(key, b"0")) + 1).encode()
+
+    def pipeline(transaction=True):
+        commands = []
+        pipe = MagicMock()
+        pipe.incr = lambda key: commands.append(lambda: incr(key))
+        pipe.expire = lambda key, seconds: commands.append(lambda: None)
+        pipe.delete = lambda key: commands.append(lambda: store.pop(key, None))
+        pipe.execute = AsyncMock(side_effect=lambda: [command() for command in commands])
+        return pipe
+
+    client = MagicMock()
+    client.mget = AsyncMock(side_effect=lambda *keys: [store.get(key) for key in keys])
+    client.set = AsyncMock(side_effect=lambda key, value, ex=None: store.__setitem__(key, value))
+    client.pipeline = pipeline
+    client.store = store
+    return client
+
+
+@pytest.fixture
+def transcription():
+    return Transcription(
+        id="t1",
+        audio_file_id="a1",
+        user_id=1,
+        model=TranscriptionModel.WHISPER_TURBO,
+        status=TranscriptionStatus.COMPLETED,
+        language="ru",
+        segments=[TranscriptionSegment(0.0, 1.5, "Привет", 0.9), TranscriptionSegment(1.5, 3.0, "мир", 0.8)],
+        revision=2,
+        created_at=datetime(2025, 1, 1, 12, 0),
+    )
+
+
+def test_transcription_roundtrip(transcription):
+    assert load_transcription(dump_transcription(transcription)) == transcription
+
+    transcription.segments = None
+    assert load_transcription(dump_transcription(transcription)).segments is None
+
+
+def test_transcription_read_through(redis_client, transcription):
+    inner = MagicMock()
+    inner.get_by_id = AsyncMock(return_value=transcription)
+    inner.update_status = AsyncMock()
+    repository = CachedTranscriptionRepository(inner, RedisCache(redis_client), ttl=60)
+
+    async def scenario():
+        assert await repository.get_by_id("t1") == transcription
+        assert await repository.get_by_id("t1") == transcription
+        assert inner.get_by_id.await_count == 1
+
+        await repository.update_status("t1", TranscriptionStatus.FAILED, "boom")
+        assert "stt:v2:transcription:t1" not in redis_client.store
+        await repository.get_by_id("t1")
+        assert inner.get_by_id.await_count == 2
+
+    asyncio.run(scenario())
+    redis_client.set.assert_awaited_with("stt:v2:transcription:t1", redis_client.store["stt:v2:transcription:t1"], ex=60)
+
+
+def test_fill_racing_a_write_is_not_served(redis_client, transcription):
+    cache = RedisCache(redis_client)
+
+    async def scenario():
+        data, version = await cache.get("transcription", "t1")
+        # A write commits and invalidates while the miss is being filled from the database
+        await cache.delete("transcription", "t1")
+        await cache.set("transcription", "t1", dump_transcription(transcription), 60, version)
+        assert (await cache.get("transcription", "t1"))[0] is None
+
+        data, version = await cache.get("transcription", "t1")
+        await cache.set("transcription", "t1", dump_transcription(transcription), 60, version)
+        return (await cache.get("transcription", "t1"))[0]
+
+    assert load_transcription(asyncio.run(scenario())) == transcription
+
+
+def test_invalidation_waits_for_commit_and_fills_use_the_primary(tmp_path, redis_client, transcription):
+    inner = MagicMock()
+    inner.get_by_id = AsyncMock(return_value=transcription)
+    inner.update = AsyncMock(side_effect=lambda transcription: transcription)
+
+    async def scenario():
+        database = Database(create_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"))
+        try:
+            async with database.session() as session:
+                repository = CachedTranscriptionRepository(inner, RedisCache(redis_client), ttl=60, session=session)
+                await repository.get_by_id("t1")
+                assert session.info[USE_PRIMARY]
+
+            async with database.unit_of_work() as session:
+                repository = CachedTranscriptionRepository(inner, RedisCache(redis_client), ttl=60, session=session)
+                await repository.update(transcription)
+                assert "stt:v2:transcription:t1" in redis_client.store
+            assert "stt:v2:transcription:t1" not in redis_client.store
+        finally:
+            await database.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_user_settings_cache_remembers_missing(redis_client):
+    inner = MagicMock()
+    inner.get_by_user_id = AsyncMock(return_value=None)
+    inner.save = AsyncMock(side_effect=lambda settings: settings)
+    repository = CachedUserSettingsRepository(inner, RedisCache(redis_client), ttl=60)
+
+    async def scenario():
+        assert await repository.get_by_user_id(1) is None
+        assert await repository.get_by_user_id(1) is None
+        assert inner.get_by_user_id.await_count == 1
+
+        settings = await repository.save(UserSettings(user_id=1, auto_delete_files=False))
+        inner.get_by_user_id.return_value = settings
+        assert await repository.get_by_user_id(1) == settings
+        assert await repository.get_by_user_id(1) == settings
+        assert inner.get_by_user_id.await_count == 2
+
+    asyncio.run(scenario())
+
+
+def test_cache_fails_open(redis_client, transcription):
+    redis_client.get.side_effect = ConnectionError("down")
+    redis_client.set.side_effect = ConnectionError("down")
+    inner = MagicMock()
+    inner.get_by_id = AsyncMock(return_value=transcription)
+    repository = CachedTranscriptionRepository(inner, RedisCache(redis_client))
+
+    assert asyncio.run(repository.get_by_id("t1")) == transcription
@@ -0,0 +1,145 @@
+"""
+Tests for the coalescing progress publisher.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from src.infrastructure.messaging import coalescing
+from src.infrastructure.messaging.coalescing import CoalescingPublisher
+from src.infrastructure.messaging.event_bus import (
+    TranscriptionCompletedEvent,
+    TranscriptionProgressEvent,
+)
+
+
+def make_publisher():
+    event_bus = MagicMock()
+    event_bus.publish = AsyncMock()
+    return CoalescingPublisher(event_bus, interval=60), event_bus
+
+
+def published(event_bus):
+    return [call.args[0] for call in event_bus.publish.await_args_list]
+
+
+def test_only_latest_progress_per_job_is_published():
+    publisher, event_bus = make_publisher()
+
+    async def scenario():
+        for progress in range(0, 101, 10):
+            await publisher.publish(TranscriptionProgressEvent("t1", 1, progress))
+        await publisher.publish(TranscriptionProgressEvent("t2", 1, 5))
+        await publisher.flush()
+
+    asyncio.run(scenario())
+
+    assert published(event_bus) == [
+        TranscriptionProgressEvent("t1", 1, 100),
+        TranscriptionProgressEvent("t2", 1, 5),
+    ]
+
+
+def test_terminal_event_is_published_at_once_and_drops_held_progress():
+    publisher, event_bus = make_publisher()
+    completed = TranscriptionCompletedEvent("t1", "a1", 1, True)
+
+    async def scenario():
+        await publisher.publish(TranscriptionProgressEvent("t1", 1, 50))
+        await publisher.publish(TranscriptionProgressEvent("t2", 1, 50))
+        await publisher.publish(completed)
+        assert published(event_bus) == [completed]
+        await publisher.stop()
+
+    asyncio.run(scenario())
+
+    assert published(event_bus) == [completed, TranscriptionProgressEvent("t2", 1, 50)]
+
+
+def test_failed_progress_is_retried_on_next_flush():
+    publisher, event_bus = make_publisher()
+    event_bus.publish.side_effect = [RuntimeError("down"), None]
+
+    async def scenario():
+        await publisher.publish(TranscriptionProgressEvent("t1", 1, 10))
+        await publisher.flush()
+        await publisher.flush()
+
+    asyncio.run(scenario())
+
+    assert event_bus.publish.await_count == 2
+
+
+def test_progress_after_terminal_event_is_dropped_until_ttl(monkeypatch):
+    publisher, event_bus = make_publisher()
+    publisher.finished_ttl = 300
+    completed = TranscriptionCompletedEvent("t1", "a1", 1, True)
+    clock = [1000.0]
+    monkeypatch.setattr(coalescing.time, "monotonic", lambda: clock[0])
+
+    async def scenario():
+        await publisher.publish(completed)
+        await publisher.publish(TranscriptionProgressEvent("t1", 1, 90))
+        await publisher.flush()
+        clock[0] += 301
+        await publisher.publish(TranscriptionProgressEvent("t1", 1, 5))
+        await publisher.flush()
+
+    asyncio.run(scenario())
+
+    assert published(event_bus) == [completed, TranscriptionProgressEvent("t1", 1, 5)]
+
+
+def test_stop_finishes_the_flush_in_progress():
+    publisher, event_bus = make_publisher()
+    publisher.interval = 0.01
+
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_publish(event):
+            started.set()
+            await release.wait()
+
+        event_bus.publish.side_effect = slow_publish
+        publisher.start()
+        await publisher.publish(TranscriptionProgressEvent("t1", 1, 10))
+        await publisher.publish(TranscriptionProgressEvent("t2", 1, 10))
+        await started.wait()
+        stopping = asyncio.create_task(publisher.stop())
+        await asyncio.sleep(0.01)
+        release.set()
+        await stopping
+
+    asyncio.run(scenario())
+
+    assert published(event_bus) == [
+        TranscriptionProgressEvent("t1", 1, 10),
+        TranscriptionProgressEvent("t2", 1, 10),
+    ]
+
+
+def test_cancelled_flush_keeps_the_unsent_progress():
+    publisher, event_bus = make_publisher()
+
+    async def scenario():
+        hang = asyncio.Event()
+
+        async def hanging_publish(event):
+            await hang.wait()
+
+        event_bus.publish.side_effect = hanging_publish
+        await publisher.publish(TranscriptionProgressEvent("t1", 1, 10))
+        await publisher.publish(TranscriptionProgressEvent("t2", 1, 10))
+        flushing = asyncio.create_task(publisher.flush())
+        await asyncio.sleep(0.01)
+        flushing.cancel()
+        await asyncio.gather(flushing, return_exceptions=True)
+        event_bus.publish.reset_mock(side_effect=True)
+        await publisher.flush()
+
+    asyncio.run(scenario())
+
+    assert published(event_bus) == [
+        TranscriptionProgressEvent("t1", 1, 10),
+        TranscriptionProgressEvent("t2", 1, 10),
+    ]
@@ -0,0 +1,240 @@
+"""
+Tests for the JetStream event bus.
+"""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from prometheus_client import REGISTRY
+from nats.js.api import DiscardPolicy, RetentionPolicy, StreamConfig
+from nats.js.errors import NotFoundError
+
+from src.infrastructure.messaging.codecs import JsonCodec, codec_for_headers
+from src.infrastructure.messaging.event_bus import (
+    AudioProcessedEvent,
+    InProcessEventBus,
+    JetStreamEventBus,
+    TranscriptionProgressEvent,
+    decode_event,
+    encode_event,
+)
+
+
+def make_message(data: bytes, num_delivered: int = 1, headers=None):
+    """Create a mock JetStream message."""
+    msg = MagicMock()
+    msg.data = data
+    msg.headers = headers
+    msg.metadata.num_delivered = num_delivered
+    msg.ack = AsyncMock()
+    msg.nak = AsyncMock()
+    msg.term = AsyncMock()
+    msg.in_progress = AsyncMock()
+    return msg
+
+
+def event_payload() -> bytes:
+    event = AudioProcessedEvent(audio_id="a1", user_id=1, success=True)
+    return json.dumps({"event_type": "AudioProcessedEvent", "data": event.to_dict()}).encode()
+
+
+@pytest.fixture
+def event_bus():
+    bus = JetStreamEventBus(MagicMock())
+    bus.max_deliver = 3
+    bus.backoff_base = 2.0
+    bus.backoff_max = 5.0
+    return bus
+
+
+def test_handled_event_is_acked(event_bus):
+    handler = AsyncMock()
+    msg = make_message(event_payload())
+
+    asyncio.run(event_bus._handle(msg, AudioProcessedEvent, handler))
+
+    event = handler.await_args.args[0]
+    assert (event.audio_id, event.user_id, event.success) == ("a1", 1, True)
+    msg.ack.assert_awaited_once()
+    msg.nak.assert_not_awaited()
+
+
+def test_failed_event_is_nakked_with_backoff(event_bus):
+    handler = AsyncMock(side_effect=RuntimeError("boom"))
+    msg = make_message(event_payload(), num_delivered=2)
+
+    asyncio.run(event_bus._handle(msg, AudioProcessedEvent, handler))
+
+    msg.nak.assert_awaited_once_with(delay=4.0)
+    msg.ack.assert_not_awaited()
+    assert event_bus.backoff(10) == 5.0
+
+
+def test_event_is_terminated_after_max_deliver(event_bus):
+    handler = AsyncMock(side_effect=RuntimeError("boom"))
+    msg = make_message(event_payload(), num_delivered=3)
+
+    asyncio.run(event_bus._handle(msg, AudioProcessedEvent, handler))
+
+    msg.term.assert_awaited_once()
+    msg.nak.assert_not_awaited()
+
+
+def test_undecodable_event_is_terminated(event_bus):
+    handler = AsyncMock()
+    msg = make_message(b"not json")
+
+    asyncio.run(event_bus._handle(msg, AudioProcessedEvent, handler))
+
+    handler.assert_not_awaited()
+    msg.term.assert_awaited_once()
+
+
+def test_consumer_limits_concurrency_and_applies_backpressure(event_bus):
+    release = asyncio.Event()
+    running = []
+    batches = []
+
+    async def handler(event):
+        running.append(event)
+        await release.wait()
+
+    async def fetch(batch, timeout=None):
+        batches.append(batch)
+        if len(batches) > 2:
+            await asyncio.sleep(3600)
+        return [make_message(event_payload()) for _ in range(batch)]
+
+    psub = MagicMock()
+    psub.fetch = fetch
+
+    async def scenario():
+        consumer = asyncio.create_task(event_bus._consume(psub, AudioProcessedEvent, handler, 2))
+        await asyncio.sleep(0.01)
+        assert batches == [2]
+        assert len(running) == 2
+
+        release.set()
+        await asyncio.sleep(0.01)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    assert batches[:2] == [2, 2]
+    assert len(running) == 4
+
+
+def test_event_round_trips_through_codec_header():
+    codec = JsonCodec()
+    event = AudioProcessedEvent(audio_id="a1", user_id=1, success=False, error_message="bad")
+    msg = make_message(encode_event(event, codec), headers=codec.headers)
+
+    assert decode_event(msg, AudioProcessedEvent) == event
+
+
+def test_message_without_codec_header_is_json():
+    assert codec_for_headers(None).name == "json"
+    with pytest.raises(ValueError):
+        codec_for_headers({"Content-Type": "application/x-unknown"})
+
+
+def test_event_dict_is_a_copy_and_unknown_fields_are_ignored():
+    event = AudioProcessedEvent(audio_id="a1", user_id=1, success=True)
+    data = event.to_dict()
+    data["audio_id"] = "changed"
+
+    assert event.audio_id == "a1"
+    assert AudioProcessedEvent.from_dict({**data, "added_later": 1}).audio_id == "changed"
+
+
+def test_in_process_bus_fans_out_and_keeps_per_job_order():
+    bus = InProcessEventBus(concurrency=4)
+    handled = {"first": [], "second": []}
+
+    def handler(name):
+        async def handle(event):
+            await asyncio.sleep(0.001 * (event.progress % 3))
+            handled[name].append((event.transcription_id, event.progress))
+        return handle
+
+    async def scenario():
+        await bus.subscribe(TranscriptionProgressEvent, handler("first"))
+        await bus.subscribe(TranscriptionProgressEvent, handler("second"), concurrency=2)
+        for progress in range(10):
+            for transcription_id in ("t1", "t2", "t3"):
+                await bus.publish(TranscriptionProgressEvent(transcription_id, 1, progress))
+        await bus.join()
+        await bus.unsubscribe_all()
+
+    asyncio.run(scenario())
+
+    for events in handled.values():
+        assert len(events) == 30
+        for transcription_id in ("t1", "t2", "t3"):
+            assert [p for t, p in events if t == transcription_id] == list(range(10))
+
+
+def test_in_process_bus_limits_concurrency():
+    bus = InProcessEventBus()
+    running = 0
+    peak = 0
+
+    async def handler(event):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+
+    async def scenario():
+        await bus.subscribe(AudioProcessedEvent, handler, concurrency=3)
+        for i in range(20):
+            await bus.publish(AudioProcessedEvent(audio_id=f"a{i}", user_id=1, success=True))
+        await bus.join()
+        await bus.unsubscribe_all()
+
+    asyncio.run(scenario())
+
+    assert peak == 3
+
+
+def test_stream_is_created_with_limits():
+    js = MagicMock()
+    js.stream_info = AsyncMock(side_effect=NotFoundError)
+    js.add_stream = AsyncMock()
+    nats = MagicMock()
+    nats.jetstream = AsyncMock(return_value=js)
+
+    asyncio.run(JetStreamEventBus(nats)._jetstream())
+
+    stream_config = js.add_stream.await_args.args[0]
+    assert stream_config.retention == RetentionPolicy.WORK_QUEUE
+    assert stream_config.discard == DiscardPolicy.OLD
+    assert stream_config.max_age and stream_config.max_bytes and stream_config.max_msgs
+
+
+def test_existing_stream_gets_its_limits_updated():
+    bus = JetStreamEventBus(MagicMock())
+    js = MagicMock()
+    js.stream_info = AsyncMock(return_value=MagicMock(config=StreamConfig(name=bus.stream)))
+    js.update_stream = AsyncMock()
+    bus.nats.jetstream = AsyncMock(return_value=js)
+
+    asyncio.run(bus._jetstream())
+
+    assert js.update_stream.await_args.args[0] == bus._stream_config()
+
+
+def test_failure_to_settle_is_logged_and_counted(event_bus, caplog):
+    handler = AsyncMock()
+    msg = make_message(event_payload())
+    msg.ack.side_effect = ConnectionError("connection lost")
+    labels = {"event_type": "AudioProcessedEvent", "outcome": "error"}
+    before = REGISTRY.get_sample_value("events_handled_total", labels) or 0
+
+    asyncio.run(event_bus._handle(msg, AudioProcessedEvent, handler))
+
+    assert REGISTRY.get_sample_value("events_handled_total", labels) == before + 1
+    assert "connection lost" in caplog.text
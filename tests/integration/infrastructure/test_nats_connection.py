@@ -0,0 +1,68 @@
+"""
+Tests for the shared NATS connection manager.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.infrastructure.messaging.nats_client import (
+    NatsConnection,
+    close_nats_connections,
+    get_nats_connection,
+)
+from src.infrastructure.storage.object_storage import NatsObjectStorage
+
+
+def make_client():
+    client = MagicMock()
+    client.is_closed = False
+    client.is_connected = True
+    client.close = AsyncMock()
+    js = MagicMock()
+    js.object_store = AsyncMock(return_value=MagicMock())
+    client.jetstream.return_value = js
+    return client
+
+
+def test_connection_is_shared_per_url():
+    first = get_nats_connection("nats://shared:4222")
+
+    assert get_nats_connection("nats://shared:4222") is first
+    assert get_nats_connection("nats://other:4222") is not first
+    asyncio.run(close_nats_connections())
+
+
+def test_concurrent_users_open_one_client_and_one_object_store():
+    client = make_client()
+    connection = NatsConnection("nats://localhost:4222")
+
+    async def scenario():
+        with patch("nats.connect", AsyncMock(return_value=client)) as connect:
+            storages = [NatsObjectStorage(connection=connection) for _ in range(3)]
+            await asyncio.gather(*(storage._ensure_connected() for storage in storages))
+            await connection.jetstream()
+            return connect, storages
+
+    connect, storages = asyncio.run(scenario())
+
+    connect.assert_awaited_once()
+    client.jetstream.assert_called_once()
+    client.jetstream.return_value.object_store.assert_awaited_once_with("transcription")
+    assert len({id(storage._object_store) for storage in storages}) == 1
+
+
+def test_reconnecting_client_is_not_replaced():
+    client = make_client()
+    connection = NatsConnection("nats://localhost:4222")
+
+    async def scenario():
+        with patch("nats.connect", AsyncMock(return_value=client)) as connect:
+            await connection.connect()
+            client.is_connected = False  # reconnect in progress
+            client.publish = AsyncMock()
+            await connection.publish_raw("subject", b"data")
+            return connect
+
+    connect = asyncio.run(scenario())
+
+    connect.assert_awaited_once()
+    client.publish.assert_awaited_once()
@@ -0,0 +1,128 @@
+"""
+Tests for chunked object storage streaming.
+"""
+import asyncio
+import base64
+from hashlib import sha256
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from nats.errors import TimeoutError as NatsTimeoutError
+from nats.js.errors import BadObjectMetaError, DigestMismatchError
+
+from src.infrastructure.storage.object_storage import LocalObjectStorage, NatsObjectStorage
+
+
+def test_local_storage_streams_files_in_chunks(tmp_path):
+    source = tmp_path / "audio.ogg"
+    source.write_bytes(bytes(range(256)) * 1024)
+    storage = LocalObjectStorage(tmp_path / "store")
+
+    async def scenario():
+        await storage.upload_file(source, "audio.ogg")
+        chunks = [chunk async for chunk in storage.iter_object("audio.ogg")]
+        await storage.download_file("audio.ogg", tmp_path / "copy.ogg")
+        return chunks
+
+    chunks = asyncio.run(scenario())
+
+    assert len(chunks) == 4
+    assert b"".join(chunks) == source.read_bytes()
+    assert (tmp_path / "copy.ogg").read_bytes() == source.read_bytes()
+
+
+def make_info(chunks, digest_of=None, nuid="nuid"):
+    info = MagicMock()
+    info.size = sum(len(chunk) for chunk in chunks)
+    info.nuid = nuid
+    info.digest = "SHA-256=" + base64.urlsafe_b64encode(sha256(digest_of or b"".join(chunks)).digest()).decode()
+    info.is_link.return_value = False
+    return info
+
+
+def make_nats_storage(chunks, digest_of=None):
+    """NATS storage whose object store serves ``chunks`` through a mock subscription."""
+    info = make_info(chunks, digest_of)
+
+    messages = []
+    for index, chunk in enumerate(chunks):
+        msg = MagicMock()
+        msg.data = chunk
+        msg.metadata.num_pending = len(chunks) - index - 1
+        messages.append(msg)
+
+    subscription = MagicMock()
+    subscription.next_msg = AsyncMock(side_effect=messages)
+    subscription.unsubscribe = AsyncMock()
+    js = MagicMock()
+    js.subscribe = AsyncMock(return_value=subscription)
+
+    connection = MagicMock()
+    connection.jetstream = AsyncMock(return_value=js)
+    storage = NatsObjectStorage(connection=connection)
+    storage._object_store = MagicMock()
+    storage._object_store.get_info = AsyncMock(return_value=info)
+    return storage, js, subscription
+
+
+def test_nats_get_object_streams_chunks_into_spool():
+    storage, js, subscription = make_nats_storage([b"a" * 10, b"b" * 10, b"c" * 5])
+
+    file_obj = asyncio.run(storage.get_object("audio.ogg"))
+
+    assert file_obj.read() == b"a" * 10 + b"b" * 10 + b"c" * 5
+    assert js.subscribe.await_args.args[0] == "$O.transcription.C.nuid"
+    subscription.unsubscribe.assert_awaited_once()
+
+
+def test_nats_iter_object_checks_digest():
+    storage, _, _ = make_nats_storage([b"data"], digest_of=b"other")
+
+    async def scenario():
+        return [chunk async for chunk in storage.iter_object("audio.ogg")]
+
+    with pytest.raises(DigestMismatchError):
+        asyncio.run(scenario())
+
+
+def read_all(storage, name="audio.ogg"):
+    async def scenario():
+        return [chunk async for chunk in storage.iter_object(name)]
+
+    return asyncio.run(scenario())
+
+
+def test_nats_iter_object_follows_links():
+    chunks = [b"linked"]
+    storage, js, _ = make_nats_storage(chunks)
+    link = make_info([])
+    link.is_link.return_value = True
+    link.options.link.bucket = "originals"
+    link.options.link.name = "source.ogg"
+    storage._object_store.get_info = AsyncMock(return_value=link)
+    linked_store = MagicMock()
+    linked_store.get_info = AsyncMock(return_value=make_info(chunks, nuid="linked-nuid"))
+    storage.nats.object_store = AsyncMock(return_value=linked_store)
+
+    assert read_all(storage) == chunks
+    storage.nats.object_store.assert_awaited_once_with("originals")
+    linked_store.get_info.assert_awaited_once_with("source.ogg")
+    assert js.subscribe.await_args.args[0] == "$O.originals.C.linked-nuid"
+
+
+def test_nats_iter_object_rejects_objects_without_nuid():
+    storage, js, _ = make_nats_storage([b"data"])
+    storage._object_store.get_info.return_value.nuid = ""
+
+    with pytest.raises(BadObjectMetaError):
+        read_all(storage)
+    js.subscribe.assert_not_awaited()
+
+
+def test_nats_iter_object_gives_up_on_missing_chunks():
+    storage, _, subscription = make_nats_storage([b"data"])
+    subscription.next_msg.side_effect = NatsTimeoutError
+
+    with pytest.raises(NatsTimeoutError):
+        read_all(storage)
+    subscription.unsubscribe.assert_awaited_once()
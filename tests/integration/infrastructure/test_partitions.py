@@ -0,0 +1,108 @@
+"""
+Tests for segment partition naming, month arithmetic and partition maintenance SQL.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from sqlalchemy.exc import OperationalError
+
+from src.infrastructure.database.partitions import (
+    add_months,
+    ensure_partitions,
+    month_start,
+    partition_name,
+)
+
+
+def test_month_arithmetic_crosses_years():
+    assert month_start(datetime(2025, 2, 17, 13, 45)) == datetime(2025, 2, 1)
+    assert add_months(datetime(2025, 11, 1), 3) == datetime(2026, 2, 1)
+    assert add_months(datetime(2025, 1, 1), -1) == datetime(2024, 12, 1)
+
+
+def test_partition_name():
+    assert partition_name("transcription_segments", datetime(2025, 3, 1)) == "transcription_segments_p2025_03"
+
+
+class RecordingConnection:
+    """Stands in for an AsyncConnection and records the SQL it is given.
+
+    ``default_rows`` lists the months (``YYYY-MM``) with rows in the default partition.
+    """
+
+    def __init__(self, partitions, fail_on=None, default_rows=()):
+        self.partitions = partitions
+        self.fail_on = fail_on
+        self.default_rows = default_rows
+        self.statements = []
+
+    @asynccontextmanager
+    async def begin(self):
+        self.statements.append("BEGIN")
+        try:
+            yield
+        except Exception:
+            self.statements.append("ROLLBACK")
+            raise
+        self.statements.append("COMMIT")
+
+    async def execute(self, statement, parameters=None):
+        sql = str(statement)
+        if sql.startswith("SELECT EXISTS"):
+            result = MagicMock()
+            result.scalar.return_value = any(f"'{month}-01'" in sql for month in self.default_rows)
+            return result
+        if sql.startswith("SELECT"):
+            return [(name,) for name in self.partitions]
+        self.statements.append(sql)
+        if self.fail_on and self.fail_on in sql:
+            raise OperationalError(sql, parameters, Exception("lock timeout"))
+
+
+def test_ensure_partitions_creates_missing_months_ahead_under_lock_timeout():
+    connection = RecordingConnection(["speaker_segments_p2025_12"])
+
+    created = asyncio.run(ensure_partitions(connection, "speaker_segments", datetime(2025, 12, 15), months_ahead=1))
+
+    assert created == ["speaker_segments_p2026_01"]
+    assert connection.statements == [
+        "BEGIN",
+        "COMMIT",
+        "BEGIN",
+        "SET LOCAL lock_timeout = 5000",
+        "CREATE TABLE speaker_segments_p2026_01 PARTITION OF speaker_segments "
+        "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')",
+        "COMMIT",
+    ]
+
+
+def test_ensure_partitions_moves_rows_out_of_the_default_partition():
+    connection = RecordingConnection([], default_rows=["2025-12"])
+
+    asyncio.run(ensure_partitions(connection, "speaker_segments", datetime(2025, 12, 15), months_ahead=0))
+
+    assert connection.statements == [
+        "BEGIN",
+        "COMMIT",
+        "BEGIN",
+        "SET LOCAL lock_timeout = 5000",
+        "ALTER TABLE speaker_segments DETACH PARTITION speaker_segments_default",
+        "CREATE TABLE speaker_segments_p2025_12 PARTITION OF speaker_segments "
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')",
+        "WITH moved AS (DELETE FROM speaker_segments_default "
+        "WHERE created_at >= '2025-12-01' AND created_at < '2026-01-01' "
+        "RETURNING *) INSERT INTO speaker_segments_p2025_12 SELECT * FROM moved",
+        "ALTER TABLE speaker_segments ATTACH PARTITION speaker_segments_default DEFAULT",
+        "COMMIT",
+    ]
+
+
+def test_ensure_partitions_skips_a_month_whose_lock_times_out():
+    connection = RecordingConnection([], fail_on="speaker_segments_p2025_12")
+
+    created = asyncio.run(ensure_partitions(connection, "speaker_segments", datetime(2025, 12, 15), months_ahead=1))
+
+    assert created == ["speaker_segments_p2026_01"]
+    assert "ROLLBACK" in connection.statements
@@ -0,0 +1,303 @@
+"""
+Tests for the SQLAlchemy repositories against an aiosqlite database.
+"""
+import asyncio
+from dataclasses import replace
+from datetime import datetime
+
+from sqlalchemy import event, func, select
+
+from src.domains.transcription.entities import (
+    Transcription,
+    TranscriptionModel,
+    TranscriptionSegment,
+    TranscriptionSegments,
+    TranscriptionStatus,
+)
+from src.infrastructure.database import repositories
+from src.infrastructure.database.models import Base, TranscriptionSegment as TranscriptionSegmentRow
+from src.infrastructure.database.repositories import SQLAlchemyAudioRepository, SQLAlchemyTranscriptionRepository
+from src.infrastructure.database.session import Database, create_engine
+
+
+def run(tmp_path, scenario):
+    """Run ``scenario(database)`` against a fresh SQLite database."""
+    async def main():
+        database = Database(create_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"))
+        async with database.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        try:
+            return await scenario(database)
+        finally:
+            await database.dispose()
+
+    return asyncio.run(main())
+
+
+def make_segments(count, offset=0):
+    return [
+        TranscriptionSegment(
+            start_time=float(offset + i), end_time=offset + i + 0.5, text=f"segment {offset + i}", confidence=0.9
+        )
+        for i in range(count)
+    ]
+
+
+def make_transcription(transcription_id, segments):
+    return Transcription(
+        id=transcription_id,
+        audio_file_id="audio",
+        user_id=1,
+        model=TranscriptionModel.WHISPER_TURBO,
+        status=TranscriptionStatus.COMPLETED,
+        language="ru",
+        segments=segments,
+    )
+
+
+async def segment_count(session, transcription_id):
+    return await session.scalar(
+        select(func.count()).select_from(TranscriptionSegmentRow)
+        .where(TranscriptionSegmentRow.transcription_id == transcription_id)
+    )
+
+
+def test_save_bulk_inserts_segments_and_keeps_order(tmp_path):
+    segments = make_segments(12)
+
+    async def scenario(database):
+        async with database.session() as session:
+            await SQLAlchemyTranscriptionRepository(session).save(make_transcription("t1", segments))
+        async with database.session() as session:
+            loaded = await SQLAlchemyTranscriptionRepository(session).get_by_id("t1")
+            return loaded, await segment_count(session, "t1")
+
+    loaded, count = run(tmp_path, scenario)
+
+    assert count == 12
+    assert list(loaded.segments) == segments
+
+
+def test_segment_rows_get_unique_ids(tmp_path):
+    async def scenario(database):
+        async with database.session() as session:
+            await SQLAlchemyTranscriptionRepository(session).save(make_transcription("t1", make_segments(20)))
+            ids = (await session.execute(select(TranscriptionSegmentRow.id))).scalars().all()
+        return ids
+
+    ids = run(tmp_path, scenario)
+
+    assert len(ids) == 20
+    assert len(set(ids)) == 20
+
+
+def test_several_transcriptions_load_with_their_own_segments(tmp_path):
+    async def scenario(database):
+        async with database.session() as session:
+            repository = SQLAlchemyTranscriptionRepository(session)
+            await repository.save(make_transcription("t1", make_segments(3)))
+            await repository.save(make_transcription("t2", make_segments(5, offset=100)))
+            await repository.save(make_transcription("t3", []))
+        async with database.session() as session:
+            statements = []
+            sync_engine = database.engine.sync_engine
+
+            def count(*args):
+                statements.append(args[2])
+
+            event.listen(sync_engine, "before_cursor_execute", count)
+            try:
+                loaded = await SQLAlchemyTranscriptionRepository(session).get_by_user_id(1)
+            finally:
+                event.remove(sync_engine, "before_cursor_execute", count)
+        return loaded, statements
+
+    loaded, statements = run(tmp_path, scenario)
+
+    by_id = {transcription.id: transcription for transcription in loaded}
+    assert list(by_id["t1"].segments) == make_segments(3)
+    assert list(by_id["t2"].segments) == make_segments(5, offset=100)
+    assert len(by_id["t3"].segments) == 0
+    # One query for the transcriptions and one IN (...) query for all their segments
+    assert len(statements) == 2
+
+
+def test_segment_storage_setting_selects_packed_layout(monkeypatch):
+    monkeypatch.setattr(repositories.config, "SEGMENT_STORAGE", "packed", raising=False)
+    assert SQLAlchemyTranscriptionRepository(None).packed_segments is True
+    assert SQLAlchemyTranscriptionRepository(None, packed_segments=False).packed_segments is False
+
+    monkeypatch.setattr(repositories.config, "SEGMENT_STORAGE", "rows", raising=False)
+    assert SQLAlchemyTranscriptionRepository(None).packed_segments is False
+
+
+class StatementLog:
+    """Collects the SQL statements an engine executes."""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, *args):
+        self.statements.append(statement.split()[0].upper())
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self.statements
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+async def stored_rows(session, transcription_id):
+    result = await session.execute(
+        select(TranscriptionSegmentRow.id, TranscriptionSegmentRow.text)
+        .where(TranscriptionSegmentRow.transcription_id == transcription_id)
+        .order_by(TranscriptionSegmentRow.start_time)
+    )
+    return result.all()
+
+
+def edit_segments(tmp_path, edit):
+    """Save ten segments, apply ``edit`` to them and update; return rows before and after."""
+    async def scenario(database):
+        async with database.session() as session:
+            await SQLAlchemyTranscriptionRepository(session).save(make_transcription("t1", make_segments(10)))
+        async with database.session() as session:
+            before = await stored_rows(session, "t1")
+            repository = SQLAlchemyTranscriptionRepository(session)
+            transcription = await repository.get_by_id("t1")
+            segments = list(transcription.segments)
+            edit(segments)
+            transcription.segments = TranscriptionSegments(segments)
+            with StatementLog(database.engine) as statements:
+                await repository.update(transcription)
+            loaded = await repository.get_by_id("t1")
+            return before, await stored_rows(session, "t1"), statements, loaded, segments
+
+    return run(tmp_path, scenario)
+
+
+def test_inserting_a_segment_in_the_middle_inserts_one_row(tmp_path):
+    def edit(segments):
+        segments.insert(5, TranscriptionSegment(start_time=4.5, end_time=4.9, text="inserted", confidence=0.8))
+
+    before, after, statements, loaded, segments = edit_segments(tmp_path, edit)
+
+    assert list(loaded.segments) == segments
+    assert loaded.revision == 1
+    assert [row.id for row in after if row.text != "inserted"] == [row.id for row in before]
+    assert statements.count("INSERT") == 1
+    assert "DELETE" not in statements
+
+
+def test_removing_a_segment_in_the_middle_deletes_one_row(tmp_path):
+    def edit(segments):
+        del segments[4]
+
+    before, after, statements, loaded, segments = edit_segments(tmp_path, edit)
+
+    assert list(loaded.segments) == segments
+    assert [row.id for row in after] == [row.id for i, row in enumerate(before) if i != 4]
+    assert "INSERT" not in statements
+    assert statements.count("DELETE") == 1
+
+
+def test_modifying_a_segment_in_the_middle_updates_one_row(tmp_path):
+    def edit(segments):
+        segments[6] = replace(segments[6], text="corrected")
+
+    before, after, statements, loaded, segments = edit_segments(tmp_path, edit)
+
+    assert list(loaded.segments) == segments
+    assert [row.id for row in after] == [row.id for row in before]
+    assert [row.text for row in after if row.text != dict(before)[row.id]] == ["corrected"]
+    assert "INSERT" not in statements and "DELETE" not in statements
+
+
+def test_status_only_update_does_not_touch_segments(tmp_path):
+    def edit(segments):
+        pass
+
+    _, _, statements, loaded, _ = edit_segments(tmp_path, edit)
+
+    assert loaded.revision == 0
+    assert statements == ["UPDATE"]
+
+
+def test_segment_rows_take_created_at_of_their_transcription(tmp_path):
+    created_at = datetime(2025, 1, 15, 12, 0)
+
+    async def scenario(database):
+        async with database.session() as session:
+            repository = SQLAlchemyTranscriptionRepository(session)
+            transcription = make_transcription("t1", make_segments(3))
+            transcription.created_at = created_at
+            await repository.save(transcription)
+            transcription.segments = TranscriptionSegments(list(transcription.segments) + make_segments(2, offset=3))
+            await repository.update(transcription)
+            result = await session.execute(
+                select(TranscriptionSegmentRow.created_at)
+                .where(TranscriptionSegmentRow.transcription_id == "t1")
+            )
+            return result.scalars().all()
+
+    assert run(tmp_path, scenario) == [created_at] * 5
+
+
+def test_get_by_id_without_segments_skips_the_segment_query(tmp_path):
+    async def scenario(database):
+        async with database.session() as session:
+            await SQLAlchemyTranscriptionRepository(session).save(make_transcription("t1", make_segments(3)))
+        async with database.session() as session:
+            with StatementLog(database.engine) as statements:
+                transcription = await SQLAlchemyTranscriptionRepository(session).get_by_id("t1", include_segments=False)
+            return transcription, statements
+
+    transcription, statements = run(tmp_path, scenario)
+
+    assert transcription.segments is None
+    assert statements == ["SELECT"]
+
+
+def test_update_never_moves_the_revision_backwards(tmp_path):
+    async def scenario(database):
+        async with database.session() as session:
+            await SQLAlchemyTranscriptionRepository(session).save(make_transcription("t1", make_segments(3)))
+        async with database.session() as stale_session:
+            stale_repository = SQLAlchemyTranscriptionRepository(stale_session)
+            stale = await stale_repository.get_by_id("t1")
+            await stale_session.commit()
+            async with database.session() as session:
+                repository = SQLAlchemyTranscriptionRepository(session)
+                edited = await repository.get_by_id("t1")
+                edited.segments = TranscriptionSegments(make_segments(4))
+                await repository.update(edited)
+            # Status-only update of the copy loaded before the segment edit
+            stale.status = TranscriptionStatus.FAILED
+            await stale_repository.update(stale)
+        async with database.session() as session:
+            loaded = await SQLAlchemyTranscriptionRepository(session).get_by_id("t1")
+        return edited.revision, stale.revision, loaded
+
+    edited_revision, stale_revision, loaded = run(tmp_path, scenario)
+
+    assert edited_revision == stale_revision == loaded.revision == 1
+    assert loaded.status == TranscriptionStatus.FAILED
+    assert len(loaded.segments) == 4
+
+
+def test_delete_segments_deletes_at_most_limit_rows_of_the_given_files(tmp_path):
+    async def scenario(database):
+        async with database.session() as session:
+            repository = SQLAlchemyTranscriptionRepository(session)
+            await repository.save(make_transcription("t1", make_segments(5)))
+            await repository.save(replace(make_transcription("t2", make_segments(3)), audio_file_id="other"))
+        deleted = []
+        while not deleted or deleted[-1] == 2:
+            async with database.session() as session:
+                deleted.append(await SQLAlchemyAudioRepository(session).delete_segments(["audio"], 2))
+        async with database.session() as session:
+            return deleted, await segment_count(session, "t1"), await segment_count(session, "t2")
+
+    assert run(tmp_path, scenario) == ([2, 2, 1], 0, 3)
@@ -0,0 +1,117 @@
+"""
+Tests for request/reply RPC.
+"""
+import asyncio
+import itertools
+
+import pytest
+from nats.errors import TimeoutError as NatsTimeoutError
+
+from src.infrastructure.messaging.codecs import JsonCodec
+from src.infrastructure.messaging.rpc import RpcClient, RpcError, RpcServer, RpcTimeoutError, remaining_time
+
+
+class FakeMsg:
+    def __init__(self, data, headers, reply):
+        self.data = data
+        self.headers = headers
+        self.reply = reply
+
+
+class FakeNats:
+    """In-memory stand-in for NatsConnection that delivers each request to one queue member in turn."""
+
+    def __init__(self):
+        self.codec = JsonCodec()
+        self.members = {}
+        self.replies = {}
+        self.inboxes = itertools.count()
+
+    async def subscribe(self, subject, callback, queue=""):
+        self.members.setdefault(subject, []).append(callback)
+        return len(self.members)
+
+    async def unsubscribe(self, sid):
+        pass
+
+    async def publish_raw(self, subject, data, headers=None):
+        self.replies[subject].set_result(FakeMsg(data, headers, None))
+
+    async def request_raw(self, subject, data, timeout=10.0, headers=None):
+        members = self.members[subject]
+        callback = members[0]
+        members.append(members.pop(0))
+        reply = f"_INBOX.{next(self.inboxes)}"
+        self.replies[reply] = asyncio.get_running_loop().create_future()
+        await callback(FakeMsg(data, headers, reply))
+        try:
+            return await asyncio.wait_for(self.replies[reply], timeout)
+        except asyncio.TimeoutError:
+            raise NatsTimeoutError
+
+
+def test_call_returns_result_and_propagates_deadline():
+    nats = FakeNats()
+    seen = []
+
+    async def detect_language(payload):
+        seen.append(remaining_time())
+        return {"language": "ru", "text": payload["text"]}
+
+    async def scenario():
+        server = RpcServer(nats)
+        await server.register("detect_language", detect_language)
+        result = await RpcClient(nats).call("detect_language", {"text": "привет"}, timeout=5)
+        await server.stop()
+        return result
+
+    assert asyncio.run(scenario()) == {"language": "ru", "text": "привет"}
+    assert 0 < seen[0] <= 5
+
+
+def test_timed_out_attempt_is_retried_on_another_worker():
+    nats = FakeNats()
+    served = []
+
+    async def stuck(payload):
+        served.append("stuck")
+        await asyncio.sleep(3600)
+
+    async def healthy(payload):
+        served.append("healthy")
+        return 2
+
+    async def scenario():
+        stuck_server, healthy_server = RpcServer(nats), RpcServer(nats)
+        await stuck_server.register("count_speakers", stuck)
+        await healthy_server.register("count_speakers", healthy)
+        client = RpcClient(nats, timeout=1, attempt_timeout=0.05, retries=1)
+        result = await client.call("count_speakers", {})
+        await healthy_server.stop()
+        return result
+
+    assert asyncio.run(scenario()) == 2
+    assert served == ["stuck", "healthy"]
+
+
+def test_remote_errors_and_exhausted_retries_raise():
+    nats = FakeNats()
+
+    async def failing(payload):
+        raise ValueError("unsupported format")
+
+    async def stuck(payload):
+        await asyncio.sleep(3600)
+
+    async def scenario():
+        server = RpcServer(nats)
+        await server.register("preview", failing)
+        await server.register("slow", stuck)
+        client = RpcClient(nats, timeout=0.2, attempt_timeout=0.05, retries=1)
+        with pytest.raises(RpcError) as error:
+            await client.call("preview", {})
+        assert error.value.error_type == "ValueError"
+        with pytest.raises(RpcTimeoutError):
+            await client.call("slow", {})
+
+    asyncio.run(scenario())
@@ -0,0 +1,210 @@
+"""
+Tests for database sessions and units of work.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine as create_sync_engine, func, select, update
+
+from src.domains.transcription.entities import (
+    Transcription,
+    TranscriptionModel,
+    TranscriptionSegment,
+    TranscriptionSegments,
+    TranscriptionStatus,
+)
+from src.infrastructure.database.models import Base, User
+from src.infrastructure.database.repositories import SQLAlchemyTranscriptionRepository
+from src.infrastructure.database.session import (
+    USE_PRIMARY,
+    WROTE,
+    Database,
+    RoutingSession,
+    after_commit,
+    commit,
+    create_engine,
+)
+
+
+def run(tmp_path, scenario):
+    async def main():
+        database = Database(create_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"))
+        async with database.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            return await scenario(database)
+        finally:
+            await database.dispose()
+
+    return asyncio.run(main())
+
+
+async def user_count(database):
+    async with database.session() as session:
+        return await session.scalar(select(func.count()).select_from(User))
+
+
+def test_commit_outside_unit_of_work_commits(tmp_path):
+    async def scenario(database):
+        async with database.session() as session:
+            session.add(User(id=1, username="user"))
+            await commit(session)
+            assert not session.in_transaction()
+            return await user_count(database)
+
+    assert run(tmp_path, scenario) == 1
+
+
+def test_commit_inside_unit_of_work_only_flushes(tmp_path):
+    async def scenario(database):
+        async with database.unit_of_work() as session:
+            session.add(User(id=1, username="user"))
+            await commit(session)
+            assert session.in_transaction()
+            flushed = await session.scalar(select(func.count()).select_from(User))
+            visible_elsewhere = await user_count(database)
+        return flushed, visible_elsewhere, await user_count(database)
+
+    assert run(tmp_path, scenario) == (1, 0, 1)
+
+
+def test_unit_of_work_rolls_back_on_error(tmp_path):
+    async def scenario(database):
+        with pytest.raises(RuntimeError):
+            async with database.unit_of_work() as session:
+                session.add(User(id=1, username="user"))
+                await commit(session)
+                session.add(User(id=2, username="other"))
+                await commit(session)
+                raise RuntimeError("failed")
+        return await user_count(database)
+
+    assert run(tmp_path, scenario) == 0
+
+
+def test_after_commit_waits_for_the_unit_of_work(tmp_path):
+    async def scenario(database):
+        committed_users = []
+
+        async def callback():
+            committed_users.append(await user_count(database))
+
+        async with database.unit_of_work() as session:
+            session.add(User(id=1, username="user"))
+            await commit(session)
+            await after_commit(session, callback)
+            assert committed_users == []
+        return committed_users
+
+    assert run(tmp_path, scenario) == [1]
+
+
+def test_after_commit_runs_at_once_when_already_committed(tmp_path):
+    calls = []
+
+    async def scenario(database):
+        async with database.session() as session:
+            session.add(User(id=1, username="user"))
+            await commit(session)
+            await after_commit(session, lambda: asyncio.sleep(0, calls.append("run")))
+            return calls
+
+    assert run(tmp_path, scenario) == ["run"]
+
+
+def test_after_commit_is_dropped_on_rollback(tmp_path):
+    calls = []
+
+    async def scenario(database):
+        with pytest.raises(RuntimeError):
+            async with database.unit_of_work() as session:
+                await after_commit(session, lambda: asyncio.sleep(0, calls.append("run")))
+                raise RuntimeError("failed")
+        async with database.unit_of_work() as session:
+            session.add(User(id=1, username="user"))
+        return calls
+
+    assert run(tmp_path, scenario) == []
+
+
+@pytest.fixture
+def routing_session():
+    primary = create_sync_engine("sqlite://")
+    replica = create_sync_engine("sqlite://")
+    Base.metadata.create_all(primary)
+    session = RoutingSession(bind=primary, replica=replica)
+    try:
+        yield session, primary, replica
+    finally:
+        session.close()
+
+
+def test_plain_select_goes_to_the_replica(routing_session):
+    session, primary, replica = routing_session
+    assert session.get_bind(clause=select(User)) is replica
+
+
+def test_locking_select_goes_to_the_primary(routing_session):
+    session, primary, replica = routing_session
+    assert session.get_bind(clause=select(User).with_for_update()) is primary
+    assert session.get_bind(clause=select(User)) is replica
+
+
+def test_dml_goes_to_the_primary_and_sticks(routing_session):
+    session, primary, replica = routing_session
+    assert session.get_bind(clause=update(User).values(username="user")) is primary
+    assert session.info[WROTE]
+    assert session.get_bind(clause=select(User)) is primary
+
+
+def test_reads_after_a_flush_go_to_the_primary(routing_session):
+    session, primary, replica = routing_session
+    session.add(User(id=1, username="user"))
+    session.flush()
+    assert session.get_bind(clause=select(User)) is primary
+
+
+def test_pinned_session_reads_from_the_primary(routing_session):
+    session, primary, replica = routing_session
+    session.info[USE_PRIMARY] = True
+    assert session.get_bind(clause=select(User)) is primary
+
+
+def test_repository_update_reads_from_the_primary(tmp_path):
+    """The replica here has no rows at all, so a read routed to it would fail."""
+    async def scenario(database):
+        async with database.replica_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        transcription = Transcription(
+            id="t1",
+            audio_file_id="audio",
+            user_id=1,
+            model=TranscriptionModel.WHISPER_TURBO,
+            status=TranscriptionStatus.COMPLETED,
+            language="ru",
+            segments=TranscriptionSegments([TranscriptionSegment(start_time=0.0, end_time=1.0, text="one", confidence=0.9)]),
+        )
+        async with database.session() as session:
+            await SQLAlchemyTranscriptionRepository(session).save(transcription)
+        transcription.segments = TranscriptionSegments(
+            list(transcription.segments) + [TranscriptionSegment(start_time=1.0, end_time=2.0, text="two", confidence=0.9)]
+        )
+        async with database.session() as session:
+            await SQLAlchemyTranscriptionRepository(session).update(transcription)
+            assert session.info[USE_PRIMARY]
+        async with database.unit_of_work() as session:
+            return (await SQLAlchemyTranscriptionRepository(session).get_by_id("t1")).segments.texts()
+
+    async def main():
+        database = Database(
+            create_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"),
+            create_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", name="replica"),
+        )
+        async with database.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            return await scenario(database)
+        finally:
+            await database.dispose()
+
+    assert list(asyncio.run(main())) == ["one", "two"]
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+from src.application.services import export
+from src.application.services.export import BatchExportService
+from src.domains.export.entities import ExportFormat
+from src.domains.transcription.entities import (
+    Transcription,
+    TranscriptionModel,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from src.infrastructure.storage.object_storage import LocalObjectStorage
+
+
+def make_transcription():
+    return Transcription(
+        id="t1",
+        audio_file_id="a1",
+        user_id=1,
+        model=TranscriptionModel.WHISPER_TURBO,
+        status=TranscriptionStatus.COMPLETED,
+        segments=[TranscriptionSegment(start_time=0.0, end_time=1.0, text="hello", confidence=0.9)],
+    )
+
+
+def make_service(tmp_path, cached=()):
+    transcriptions = MagicMock()
+    transcriptions.get_by_id = AsyncMock(return_value=make_transcription())
+    exports = MagicMock()
+    exports.get_by_cache_keys = AsyncMock(return_value=list(cached))
+    exports.save_many = AsyncMock()
+    service = BatchExportService(transcriptions, MagicMock(), exports, LocalObjectStorage(tmp_path))
+    return service, transcriptions, exports
+
+
+def test_exports_are_rendered_off_the_event_loop(tmp_path, monkeypatch):
+    service, _, exports = make_service(tmp_path)
+    threads = []
+    render = export.write_many
+
+    def write_many(segments, targets):
+        threads.append(threading.get_ident())
+        render(segments, targets)
+
+    monkeypatch.setattr(export, "write_many", write_many)
+
+    async def scenario():
+        return threading.get_ident(), await service.export_many(1, [ExportFormat.TXT, ExportFormat.SRT], "t1")
+
+    loop_thread, created = asyncio.run(scenario())
+
+    assert threads and threads[0] != loop_thread
+    assert [item.format for item in created] == [ExportFormat.TXT, ExportFormat.SRT]
+    assert (tmp_path / created[0].file_path).read_text().strip().endswith("hello")
+
+
+def test_cached_exports_are_returned_without_loading_segments(tmp_path):
+    service, transcriptions, exports = make_service(tmp_path)
+    asyncio.run(service.export_many(1, [ExportFormat.TXT], "t1"))
+    exports.get_by_cache_keys.return_value = exports.save_many.await_args.args[0]
+    transcriptions.get_by_id.reset_mock()
+
+    cached = asyncio.run(service.export_many(1, [ExportFormat.TXT], "t1"))
+
+    assert cached == exports.save_many.await_args.args[0]
+    transcriptions.get_by_id.assert_awaited_once_with("t1", False)
+    exports.save_many.assert_awaited_once()
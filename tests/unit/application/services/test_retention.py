@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy import func, select
+
+from src.application.services.retention import RetentionService
+from src.domains.transcription.entities import (
+    Transcription,
+    TranscriptionModel,
+    TranscriptionSegment,
+    TranscriptionStatus,
+)
+from src.infrastructure.database.models import AudioFile, Base, TranscriptionSegment as TranscriptionSegmentRow
+from src.infrastructure.database.repositories import SQLAlchemyTranscriptionRepository
+from src.infrastructure.database.session import Database, create_engine
+
+
+def test_failing_partition_maintenance_does_not_stop_the_purge():
+    service = RetentionService(MagicMock(), MagicMock())
+    service.maintain_partitions = AsyncMock(side_effect=RuntimeError("lock timeout"))
+    service.purge_expired_audio = AsyncMock(return_value=0)
+
+    async def scenario():
+        service.start()
+        await asyncio.sleep(0.01)
+        await service.stop()
+
+    asyncio.run(scenario())
+
+    service.maintain_partitions.assert_awaited_once()
+    service.purge_expired_audio.assert_awaited_once()
+
+
+def test_purge_deletes_segments_in_chunks_before_the_files(tmp_path):
+    storage = MagicMock()
+    storage.delete_object = AsyncMock()
+
+    async def scenario():
+        database = Database(create_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"))
+        async with database.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        try:
+            async with database.session() as session:
+                session.add(AudioFile(
+                    id="a1", user_id=1, original_filename="a.ogg", format="ogg", size_bytes=1,
+                    path="a1.ogg", created_at=datetime(2025, 1, 1),
+                ))
+                await session.commit()
+                await SQLAlchemyTranscriptionRepository(session).save(Transcription(
+                    id="t1",
+                    audio_file_id="a1",
+                    user_id=1,
+                    model=TranscriptionModel.WHISPER_TURBO,
+                    status=TranscriptionStatus.COMPLETED,
+                    segments=[TranscriptionSegment(float(i), i + 0.5, f"segment {i}", 0.9) for i in range(5)],
+                ))
+
+            service = RetentionService(database, storage, batch_pause=0, segment_batch_size=2)
+            purged = await service.purge_expired_audio(now=datetime(2025, 2, 1))
+
+            async with database.session() as session:
+                files = await session.scalar(select(func.count()).select_from(AudioFile))
+                segments = await session.scalar(select(func.count()).select_from(TranscriptionSegmentRow))
+            return purged, files, segments
+        finally:
+            await database.dispose()
+
+    assert asyncio.run(scenario()) == (1, 0, 0)
+    storage.delete_object.assert_awaited_once_with("a1.ogg")
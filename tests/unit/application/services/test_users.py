@@ -0,0 +1,180 @@
+import asyncio
+
+from src.application.services.users import UserUpsertBuffer
+from src.domains.user.entities import User
+
+
+class RecordingWriter:
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, users):
+        if self.fail:
+            raise RuntimeError("database is down")
+        self.batches.append(sorted(user.id for user in users))
+
+
+def test_coalesces_updates_by_user():
+    writer = RecordingWriter()
+    buffer = UserUpsertBuffer(writer, interval=60, max_batch=100)
+
+    buffer.add(User(id=1, username="old"))
+    buffer.add(User(id=1, username="new"))
+    buffer.add(User(id=2))
+    asyncio.run(buffer.flush())
+
+    assert writer.batches == [[1, 2]]
+
+
+def test_skips_unchanged_profiles():
+    writer = RecordingWriter()
+    buffer = UserUpsertBuffer(writer, interval=60, max_batch=100)
+
+    buffer.add(User(id=1, username="a"))
+    asyncio.run(buffer.flush())
+    buffer.add(User(id=1, username="a"))
+    asyncio.run(buffer.flush())
+    buffer.add(User(id=1, username="b"))
+    asyncio.run(buffer.flush())
+
+    assert writer.batches == [[1], [1]]
+
+
+def test_reverting_to_the_written_profile_drops_the_pending_change():
+    written = []
+
+    async def writer(users):
+        written.extend(user.username for user in users)
+
+    buffer = UserUpsertBuffer(writer, interval=60, max_batch=100)
+
+    buffer.add(User(id=1, username="a"))
+    asyncio.run(buffer.flush())
+    buffer.add(User(id=1, username="b"))
+    buffer.add(User(id=1, username="a"))
+    asyncio.run(buffer.flush())
+
+    assert written == ["a"]
+
+
+def test_reverting_during_a_write_is_not_lost():
+    written = []
+
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_writer(users):
+            if len(written) == 1:
+                started.set()
+                await release.wait()
+            written.extend(user.username for user in users)
+
+        buffer = UserUpsertBuffer(slow_writer, interval=60, max_batch=100)
+        buffer.add(User(id=1, username="a"))
+        await buffer.flush()
+        buffer.add(User(id=1, username="b"))
+        flushing = asyncio.create_task(buffer.flush())
+        await started.wait()
+        buffer.add(User(id=1, username="a"))
+        release.set()
+        await flushing
+        await buffer.flush()
+
+    asyncio.run(scenario())
+    assert written == ["a", "b", "a"]
+
+
+def test_failed_flush_is_retried():
+    writer = RecordingWriter(fail=True)
+    buffer = UserUpsertBuffer(writer, interval=60, max_batch=100)
+
+    buffer.add(User(id=1))
+    asyncio.run(buffer.flush())
+    writer.fail = False
+    asyncio.run(buffer.flush())
+
+    assert writer.batches == [[1]]
+
+
+def test_full_batch_flushes_early_and_stop_drains():
+    writer = RecordingWriter()
+
+    async def scenario():
+        buffer = UserUpsertBuffer(writer, interval=60, max_batch=2)
+        buffer.start()
+        buffer.add(User(id=1))
+        buffer.add(User(id=2))
+        await asyncio.sleep(0.01)
+        buffer.add(User(id=3))
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert writer.batches == [[1, 2], [3]]
+
+
+def test_flush_writes_in_batches_of_max_batch():
+    writer = RecordingWriter()
+    buffer = UserUpsertBuffer(writer, interval=60, max_batch=2)
+
+    for user_id in range(1, 6):
+        buffer.add(User(id=user_id))
+    asyncio.run(buffer.flush())
+
+    assert writer.batches == [[1, 2], [3, 4], [5]]
+
+
+def test_failed_flush_keeps_at_most_max_pending():
+    writer = RecordingWriter(fail=True)
+    buffer = UserUpsertBuffer(writer, interval=60, max_batch=100, max_pending=3)
+
+    for user_id in range(1, 6):
+        buffer.add(User(id=user_id))
+    asyncio.run(buffer.flush())
+    writer.fail = False
+    asyncio.run(buffer.flush())
+
+    assert writer.batches == [[3, 4, 5]]
+
+
+def test_stop_finishes_the_flush_in_progress():
+    writer = RecordingWriter()
+
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_writer(users):
+            started.set()
+            await release.wait()
+            await writer(users)
+
+        buffer = UserUpsertBuffer(slow_writer, interval=60, max_batch=1)
+        buffer.start()
+        buffer.add(User(id=1))
+        await started.wait()
+        stopping = asyncio.create_task(buffer.stop())
+        await asyncio.sleep(0.01)
+        release.set()
+        await stopping
+
+    asyncio.run(scenario())
+    assert writer.batches == [[1]]
+
+
+def test_cancelled_flush_keeps_its_batch():
+    writer = RecordingWriter()
+
+    async def scenario():
+        buffer = UserUpsertBuffer(writer, interval=60, max_batch=100)
+        hang = asyncio.Event()
+        buffer.writer = lambda users: hang.wait()
+        buffer.add(User(id=1))
+        flushing = asyncio.create_task(buffer.flush())
+        await asyncio.sleep(0.01)
+        flushing.cancel()
+        await asyncio.gather(flushing, return_exceptions=True)
+        buffer.writer = writer
+        await buffer.flush()
+
+    asyncio.run(scenario())
+    assert writer.batches == [[1]]
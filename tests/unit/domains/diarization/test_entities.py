@@ -0,0 +1,63 @@
+"""
+Tests for diarization domain entities.
+"""
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from src.domains.diarization.entities import (
+    Diarization,
+    DiarizationStatus,
+    SpeakerSegment,
+    SpeakerSegments,
+)
+
+
+def make_segments():
+    return [
+        SpeakerSegment(speaker_id=0, start_time=0.0, end_time=2.0, confidence=0.9),
+        SpeakerSegment(speaker_id=1, start_time=2.0, end_time=5.5, confidence=0.8),
+    ]
+
+
+def test_speaker_segments_roundtrip():
+    """Test that the columnar container iterates as segment objects."""
+    segments = SpeakerSegments(make_segments())
+
+    assert len(segments) == 2
+    assert list(segments) == make_segments()
+    assert segments[1].speaker_id == 1
+    assert list(segments[:1]) == make_segments()[:1]
+
+
+def test_speaker_segments_set_item_and_read_only_copies():
+    """Test that segments are changed by assignment, not through materialized copies."""
+    segments = SpeakerSegments(make_segments())
+
+    segments[0] = SpeakerSegment(speaker_id=2, start_time=0.0, end_time=1.0, confidence=0.7)
+
+    assert segments[0] == SpeakerSegment(speaker_id=2, start_time=0.0, end_time=1.0, confidence=0.7)
+    assert segments[1] == make_segments()[1]
+    with pytest.raises(FrozenInstanceError):
+        segments[1].speaker_id = 3
+
+
+def test_speaker_segments_from_columns_length_mismatch():
+    """Test that columns of different lengths are rejected."""
+    with pytest.raises(ValueError):
+        SpeakerSegments.from_columns([0, 1], [0.0], [1.0], [0.5])
+
+
+def test_diarization_packs_segment_list():
+    """Test that Diarization converts a segment list into the columnar container."""
+    diarization = Diarization(
+        id="d1",
+        audio_file_id="a1",
+        user_id=123456789,
+        status=DiarizationStatus.COMPLETED,
+        segments=make_segments(),
+    )
+
+    assert isinstance(diarization.segments, SpeakerSegments)
+    assert diarization.segments == make_segments()
+    assert not hasattr(diarization, "__dict__")
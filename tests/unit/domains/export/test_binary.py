@@ -0,0 +1,97 @@
+"""
+Tests for the binary segment encoding.
+"""
+import io
+import json
+from array import array
+
+import pytest
+
+from src.domains.diarization.entities import SpeakerSegment, SpeakerSegments
+from src.domains.export.binary import (
+    NO_SPEAKER,
+    decode_segments,
+    decode_speaker_segments,
+    encode_segments,
+    encode_speaker_segments,
+)
+from src.domains.export.entities import ExportFormat
+from src.domains.export.writers import ExportSegment, get_writer, payload_segments
+from src.domains.transcription.entities import TranscriptionSegment, TranscriptionSegments
+
+
+def make_segments(count=3):
+    return TranscriptionSegments(
+        TranscriptionSegment(start_time=i * 1.25, end_time=i * 1.25 + 1.0, text=f"сегмент {i}", confidence=0.5 + i / 100)
+        for i in range(count)
+    )
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_roundtrip(compress):
+    """Test that segments, speakers, names and metadata survive encoding."""
+    segments = make_segments()
+    data = encode_segments(
+        segments,
+        speaker_ids=array("i", [0, NO_SPEAKER, 1]),
+        speaker_names={0: "Анна"},
+        metadata={"language": "ru"},
+        compress=compress,
+    )
+    payload = decode_segments(data)
+
+    assert payload.segments == segments
+    assert [payload.speaker_at(i) for i in range(3)] == [0, None, 1]
+    assert payload.speaker_names == {0: "Анна"}
+    assert payload.metadata == {"language": "ru"}
+
+
+def test_roundtrip_empty():
+    """Test that an empty transcript can be encoded."""
+    payload = decode_segments(encode_segments(TranscriptionSegments()))
+    assert len(payload.segments) == 0
+    assert payload.speaker_ids is None
+
+
+def test_decode_rejects_garbage():
+    """Test that invalid payloads raise ValueError."""
+    with pytest.raises(ValueError):
+        decode_segments(b"nope")
+    with pytest.raises(ValueError):
+        decode_segments(b"XXXX\x01\x00\x00\x00")
+    data = encode_segments(make_segments(), compress=False)
+    with pytest.raises(ValueError):
+        decode_segments(data[:-5])
+
+
+def test_binary_writer_matches_json_content():
+    """Test that the binary writer carries the same segments as the JSON export and is smaller."""
+    segments = [
+        ExportSegment(i * 2.0, i * 2.0 + 1.5, "Сегодня мы обсуждаем бюджет", 0.9, speaker_id=i % 2)
+        for i in range(500)
+    ]
+    binary = b"".join(get_writer(ExportFormat.BINARY).iter_chunks(segments))
+    as_json = b"".join(get_writer(ExportFormat.JSON).iter_chunks(segments))
+
+    assert list(payload_segments(decode_segments(binary))) == segments
+    assert len(json.loads(as_json)["segments"]) == 500
+    assert len(binary) * 3 < len(as_json)
+
+
+def test_binary_writer_without_speakers():
+    """Test that unattributed segments do not produce a speaker section."""
+    sink = io.BytesIO()
+    get_writer(ExportFormat.BINARY).write_all([ExportSegment(0.0, 1.0, "a", 1.0)], sink)
+    assert decode_segments(sink.getvalue()).speaker_ids is None
+
+
+def test_speaker_segments_roundtrip():
+    """Test that diarization segments survive encoding."""
+    segments = SpeakerSegments([
+        SpeakerSegment(speaker_id=0, start_time=0.0, end_time=1.5, confidence=0.9),
+        SpeakerSegment(speaker_id=3, start_time=1.5, end_time=2.25, confidence=0.4),
+    ])
+    assert decode_speaker_segments(encode_speaker_segments(segments)) == segments
+
+    with pytest.raises(ValueError):
+        decode_speaker_segments(encode_segments(make_segments()))
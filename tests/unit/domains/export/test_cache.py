@@ -0,0 +1,44 @@
+"""
+Tests for export cache keys.
+"""
+from src.domains.diarization.entities import Diarization, DiarizationStatus
+from src.domains.export.cache import export_cache_key
+from src.domains.export.entities import ExportFormat
+from src.domains.transcription.entities import Transcription, TranscriptionModel, TranscriptionStatus
+
+
+def make_transcription(revision=0):
+    return Transcription(
+        id="t1",
+        audio_file_id="a1",
+        user_id=123456789,
+        model=TranscriptionModel.WHISPER_LARGE_V3,
+        status=TranscriptionStatus.COMPLETED,
+        revision=revision,
+    )
+
+
+def test_cache_key_ignores_option_order():
+    """Test that equal options in different order produce the same key."""
+    transcription = make_transcription()
+    key_a = export_cache_key(transcription, ExportFormat.TXT, options={"a": 1, "b": {"x": 1, "y": 2}})
+    key_b = export_cache_key(transcription, ExportFormat.TXT, options={"b": {"y": 2, "x": 1}, "a": 1})
+    assert key_a == key_b
+    assert export_cache_key(transcription, ExportFormat.TXT) == export_cache_key(transcription, ExportFormat.TXT, options={})
+
+
+def test_cache_key_changes_with_revision_and_format():
+    """Test that segment edits and format changes produce new keys."""
+    base = export_cache_key(make_transcription(), ExportFormat.SRT)
+    assert export_cache_key(make_transcription(revision=1), ExportFormat.SRT) != base
+    assert export_cache_key(make_transcription(), ExportFormat.VTT) != base
+
+
+def test_cache_key_includes_diarization_revision():
+    """Test that the diarization revision is part of the key."""
+    transcription = make_transcription()
+    diarization = Diarization(id="d1", audio_file_id="a1", user_id=123456789, status=DiarizationStatus.COMPLETED)
+    edited = Diarization(id="d1", audio_file_id="a1", user_id=123456789, status=DiarizationStatus.COMPLETED, revision=2)
+
+    assert export_cache_key(transcription, ExportFormat.TXT, diarization) != export_cache_key(transcription, ExportFormat.TXT)
+    assert export_cache_key(transcription, ExportFormat.TXT, diarization) != export_cache_key(transcription, ExportFormat.TXT, edited)
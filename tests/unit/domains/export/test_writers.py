@@ -0,0 +1,153 @@
+"""
+Tests for streaming export writers.
+"""
+import io
+import json
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+
+from src.domains.diarization.entities import SpeakerSegment
+from src.domains.export.entities import ExportFormat
+from src.domains.export.exceptions import ExportFormatGenerationError
+from src.domains.export.writers import (
+    ExportSegment,
+    SrtWriter,
+    TxtWriter,
+    format_clock,
+    get_writer,
+    label_segments,
+    write_many,
+)
+from src.domains.transcription.entities import TranscriptionSegment
+
+
+def make_transcription_segments():
+    return [
+        TranscriptionSegment(start_time=0.0, end_time=2.0, text="Привет", confidence=0.9),
+        TranscriptionSegment(start_time=2.0, end_time=4.5, text="Hello", confidence=0.8),
+        TranscriptionSegment(start_time=10.0, end_time=11.0, text="Silence", confidence=0.7),
+    ]
+
+
+def make_speaker_segments():
+    return [
+        SpeakerSegment(speaker_id=0, start_time=0.0, end_time=2.2, confidence=0.9),
+        SpeakerSegment(speaker_id=1, start_time=2.2, end_time=5.0, confidence=0.9),
+    ]
+
+
+def test_label_segments_picks_largest_overlap():
+    """Test that each segment gets the speaker with the largest overlap."""
+    labeled = list(label_segments(make_transcription_segments(), make_speaker_segments()))
+    assert [s.speaker_id for s in labeled] == [0, 1, None]
+
+
+def test_label_segments_without_diarization():
+    """Test that segments are unlabeled without speaker segments."""
+    labeled = list(label_segments(make_transcription_segments()))
+    assert all(s.speaker_id is None for s in labeled)
+
+
+def test_format_clock():
+    """Test SRT and VTT timestamp formatting."""
+    assert format_clock(3723.456) == "01:02:03,456"
+    assert format_clock(0.5, ".") == "00:00:00.500"
+
+
+def test_srt_writer():
+    """Test that the SRT writer numbers cues and labels speakers."""
+    segments = label_segments(make_transcription_segments()[:2], make_speaker_segments())
+    output = b"".join(SrtWriter().iter_chunks(segments)).decode("utf-8")
+    assert output == (
+        "1\n00:00:00,000 --> 00:00:02,000\nСпикер 1: Привет\n\n"
+        "2\n00:00:02,000 --> 00:00:04,500\nСпикер 2: Hello\n\n"
+    )
+
+
+def test_txt_writer_options():
+    """Test that TXT options control timestamps and speaker names."""
+    writer = TxtWriter({"include_timestamps": False, "speaker_names": {"0": "Анна"}})
+    sink = io.BytesIO()
+    writer.write_all([ExportSegment(0.0, 1.0, "Текст", 1.0, speaker_id=0)], sink)
+    assert sink.getvalue().decode("utf-8") == "Анна: Текст\n"
+
+
+def test_json_writer_is_valid_json():
+    """Test that the streamed JSON document parses."""
+    writer = get_writer(ExportFormat.JSON, {"metadata": {"language": "ru"}})
+    segments = label_segments(make_transcription_segments(), make_speaker_segments())
+    document = json.loads(b"".join(writer.iter_chunks(segments, chunk_size=16)))
+    assert document["metadata"] == {"language": "ru"}
+    assert [s["speaker"] for s in document["segments"]] == [0, 1, None]
+
+
+def test_json_writer_empty():
+    """Test that an empty transcript still produces valid JSON."""
+    document = json.loads(b"".join(get_writer(ExportFormat.JSON).iter_chunks([])))
+    assert document["segments"] == []
+
+
+def test_vtt_writer_header():
+    """Test that VTT output starts with the WEBVTT header."""
+    output = b"".join(get_writer(ExportFormat.VTT).iter_chunks(label_segments(make_transcription_segments())))
+    assert output.startswith(b"WEBVTT\n\n00:00:00.000 --> 00:00:02.000\n")
+
+
+def test_iter_chunks_respects_chunk_size():
+    """Test that chunks are emitted incrementally."""
+    segments = (ExportSegment(float(i), i + 1.0, "x" * 100, 1.0) for i in range(100))
+    chunks = list(TxtWriter().iter_chunks(segments, chunk_size=1024))
+    assert len(chunks) > 1
+    assert all(len(chunk) < 2048 for chunk in chunks)
+
+
+def test_write_many_single_pass():
+    """Test that several formats are rendered from one segment iterator."""
+    segments = label_segments(iter(make_transcription_segments()), make_speaker_segments())
+    txt_sink, srt_sink = io.BytesIO(), io.BytesIO()
+    write_many(segments, [(TxtWriter(), txt_sink), (SrtWriter(), srt_sink)])
+
+    assert txt_sink.getvalue().decode("utf-8").count("\n") == 3
+    assert srt_sink.getvalue().decode("utf-8").startswith("1\n00:00:00,000 --> 00:00:02,000\n")
+
+
+def test_docx_writer_produces_valid_package():
+    """Test that the DOCX writer emits a well-formed WordprocessingML package."""
+    segments = label_segments(make_transcription_segments(), make_speaker_segments())
+    writer = get_writer(ExportFormat.DOCX, {"title": "Встреча <1>", "speaker_names": {1: "Борис & Co"}})
+    data = b"".join(writer.iter_chunks(segments, chunk_size=256))
+
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        assert set(package.namelist()) == {
+            "[Content_Types].xml",
+            "_rels/.rels",
+            "word/_rels/document.xml.rels",
+            "word/styles.xml",
+            "word/document.xml",
+        }
+        ElementTree.fromstring(package.read("word/styles.xml"))
+        document = ElementTree.fromstring(package.read("word/document.xml"))
+
+    ns = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
+    paragraphs = document.findall("w:body/w:p", ns)
+    texts = ["".join(t.text or "" for t in p.iterfind(".//w:t", ns)) for p in paragraphs]
+    assert texts[0] == "Встреча <1>"
+    assert texts[1] == "[00:00 - 00:02] Спикер 1: Привет"
+    assert texts[2] == "[00:02 - 00:04] Борис & Co: Hello"
+    assert texts[3] == "[00:10 - 00:11] Silence"
+
+
+def test_docx_writer_to_seekable_sink():
+    """Test that the DOCX writer also works with a regular file object."""
+    sink = io.BytesIO()
+    get_writer(ExportFormat.DOCX).write_all([ExportSegment(0.0, 1.0, "a\x01b", 1.0)], sink)
+    with zipfile.ZipFile(sink) as package:
+        assert b"ab" in package.read("word/document.xml")
+
+
+def test_get_writer_unsupported_format():
+    """Test that formats without a streaming writer are rejected."""
+    with pytest.raises(ExportFormatGenerationError):
+        get_writer("pdf")
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+import pytest
+
+from src.domains.pagination import Cursor, Page
+
+
+def test_cursor_roundtrip():
+    cursor = Cursor(created_at=datetime(2025, 3, 1, 12, 30, 15, 123456), id="0f6a|weird-id")
+
+    token = cursor.encode()
+
+    assert "=" not in token
+    assert Cursor.decode(token) == cursor
+
+
+@pytest.mark.parametrize("token", ["", "not base64!", Cursor(datetime(2025, 1, 1), "x").encode()[:-3]])
+def test_cursor_rejects_garbage(token):
+    with pytest.raises(ValueError):
+        Cursor.decode(token)
+
+
+def test_page_has_next():
+    assert not Page(items=[1, 2]).has_next
+    assert Page(items=[1, 2], next_cursor="abc").has_next
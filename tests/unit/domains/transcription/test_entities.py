@@ -0,0 +1,111 @@
+"""
+Tests for transcription domain entities.
+"""
+from dataclasses import FrozenInstanceError, replace
+
+import pytest
+
+from src.domains.transcription.entities import (
+    Transcription,
+    TranscriptionModel,
+    TranscriptionSegment,
+    TranscriptionSegments,
+    TranscriptionStatus,
+)
+
+
+def make_segments():
+    return [
+        TranscriptionSegment(start_time=0.0, end_time=1.5, text="Привет", confidence=0.9),
+        TranscriptionSegment(start_time=1.5, end_time=3.0, text="", confidence=0.5),
+        TranscriptionSegment(start_time=3.0, end_time=4.25, text="hello world", confidence=0.75),
+    ]
+
+
+def test_transcription_segment_has_no_dict():
+    """Test that TranscriptionSegment uses __slots__."""
+    segment = TranscriptionSegment(start_time=0.0, end_time=1.0, text="test", confidence=1.0)
+    assert not hasattr(segment, "__dict__")
+
+
+def test_segments_roundtrip():
+    """Test that the columnar container iterates as segment objects."""
+    segments = TranscriptionSegments(make_segments())
+
+    assert len(segments) == 3
+    assert list(segments) == make_segments()
+    assert segments[0].text == "Привет"
+    assert segments[-1] == make_segments()[-1]
+    assert segments.text_at(1) == ""
+    assert list(segments[1:]) == make_segments()[1:]
+
+
+def test_segments_set_item_replaces_one_segment():
+    """Test that assigning a segment rewrites it and keeps the texts after it intact."""
+    segments = TranscriptionSegments(make_segments())
+    replacement = TranscriptionSegment(start_time=1.5, end_time=3.0, text="эхо", confidence=0.6)
+
+    segments[1] = replacement
+    segments[0] = replace(segments[0], text="Hi")
+
+    expected = make_segments()
+    expected[0] = replace(expected[0], text="Hi")
+    expected[1] = replacement
+    assert list(segments) == expected
+    assert segments == TranscriptionSegments(expected)
+
+
+def test_materialized_segments_are_read_only():
+    """Test that editing a materialized copy raises instead of being lost."""
+    segments = TranscriptionSegments(make_segments())
+    with pytest.raises(FrozenInstanceError):
+        segments[0].text = "lost"
+
+
+def test_segments_index_out_of_range():
+    """Test that indexing past the end raises IndexError."""
+    segments = TranscriptionSegments(make_segments())
+    with pytest.raises(IndexError):
+        segments[3]
+
+
+def test_segments_from_columns():
+    """Test building the container from column values."""
+    source = make_segments()
+    segments = TranscriptionSegments.from_columns(
+        [s.start_time for s in source],
+        [s.end_time for s in source],
+        [s.confidence for s in source],
+        [s.text for s in source],
+    )
+    assert segments == TranscriptionSegments(source)
+
+    with pytest.raises(ValueError):
+        TranscriptionSegments.from_columns([0.0], [1.0], [], ["a"])
+
+
+def test_transcription_packs_segment_list():
+    """Test that Transcription converts a segment list into the columnar container."""
+    transcription = Transcription(
+        id="t1",
+        audio_file_id="a1",
+        user_id=123456789,
+        model=TranscriptionModel.WHISPER_TURBO,
+        status=TranscriptionStatus.COMPLETED,
+        segments=make_segments(),
+    )
+
+    assert isinstance(transcription.segments, TranscriptionSegments)
+    assert transcription.segments == make_segments()
+
+
+def test_transcription_without_segments():
+    """Test that Transcription keeps segments as None by default."""
+    transcription = Transcription(
+        id="t1",
+        audio_file_id="a1",
+        user_id=123456789,
+        model=TranscriptionModel.WHISPER_LARGE_V3,
+        status=TranscriptionStatus.PENDING,
+    )
+    assert transcription.segments is None
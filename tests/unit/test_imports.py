@@ -0,0 +1,27 @@
+"""
+Import smoke tests for entrypoints, run the way the Docker image does (PYTHONPATH=/app).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.mark.parametrize("module", [
+    "src.infrastructure.telegram.bot",
+    "src.infrastructure.database.repositories",
+])
+def test_module_imports_with_project_root_on_path(module):
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {module}"],
+        cwd=ROOT / "tests",
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr